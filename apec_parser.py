@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Parsers des fiches métiers APEC
+
+- parse_job_details()       : scrape-apec-correct.py
+- parse_apec_fiche_detail() : scrape-apec-js.py
+- parse_apec_fiche()        : scrape-apec-complete.py (regex, sans arbre HTML)
+
+parse_job_details() extrait les sections en un seul parcours linéaire de
+l'arbre : chaque titre h2/h3/h4 reçoit le premier p/div/ul qui le suit, et
+chaque liste le dernier titre rencontré. La sortie est identique à
+parse_job_details_reference(), l'implémentation d'origine en find_next() /
+find_previous(), conservée pour bench_parser.py.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, Tag
+
+# Backends acceptés par BeautifulSoup ; lxml (C) est optionnel
+PARSER_BACKENDS = ('html.parser', 'lxml')
+
+DEFAULT_SKILLS = ["Communication", "Organisation", "Analyse", "Gestion de projet"]
+
+HEADING_TAGS = frozenset(['h2', 'h3', 'h4'])
+CONTENT_TAGS = frozenset(['p', 'div', 'ul'])
+ACTIVITES_CLASSES = ('content', 'section-content')
+
+
+def make_soup(html, backend='html.parser'):
+    """
+    Construire l'arbre BeautifulSoup avec le backend demandé
+
+    lxml est nettement plus rapide mais corrige le HTML invalide différemment
+    de html.parser : bench_parser.py vérifie que la sortie reste identique.
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Backend inconnu: {backend} (choix: {', '.join(PARSER_BACKENDS)})")
+    return BeautifulSoup(html, backend)
+
+
+def _heading_section(heading_text):
+    """Section associée à un titre (même ordre de priorité que la référence)"""
+    if 'mission' in heading_text or 'activité' in heading_text:
+        return 'missions'
+    if 'formation' in heading_text or 'expérience' in heading_text:
+        return 'formation'
+    if 'savoir-faire' in heading_text or 'compétence' in heading_text:
+        return 'competences'
+    if 'salaire' in heading_text or 'rémunération' in heading_text:
+        return 'salaire'
+    if 'évolution' in heading_text:
+        return 'evolutions'
+    return None
+
+
+def _has_activites_class(tag):
+    classes = tag.get('class') or []
+    if isinstance(classes, str):
+        classes = classes.split()
+    return any(c in ACTIVITES_CLASSES for c in classes) or ' '.join(classes) in ACTIVITES_CLASSES
+
+
+def parse_job_details(soup, job_info):
+    """Parser les détails d'une fiche métier APEC (parcours unique de l'arbre)"""
+
+    try:
+        # Extraire le titre (nettoyer le F/H)
+        title = job_info['title'].replace(' F/H', '').replace(' H/F', '').strip()
+
+        # Créer le slug
+        slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+
+        # Ancre "activites" : premier élément id=activites, sinon <a name="activites">
+        anchor_by_id = None
+        anchor_by_name = None
+        activites_by_id = None
+        activites_by_name = None
+
+        # Sections trouvées via les titres, dans l'ordre des titres
+        heading_sections = {}
+        pending_headings = []
+
+        skills = []
+        last_heading = None
+        last_heading_is_skills = False
+
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            name = tag.name
+
+            if name == 'div' and _has_activites_class(tag):
+                if anchor_by_id is not None and activites_by_id is None:
+                    activites_by_id = tag
+                if anchor_by_name is not None and activites_by_name is None:
+                    activites_by_name = tag
+
+            if anchor_by_id is None and tag.get('id') == 'activites':
+                anchor_by_id = tag
+            if anchor_by_name is None and name == 'a' and tag.get('name') == 'activites':
+                anchor_by_name = tag
+
+            if name in CONTENT_TAGS and pending_headings:
+                # Premier p/div/ul après ces titres : leur contenu de section
+                content_text = tag.get_text(strip=True)[:500]
+                for section in pending_headings:
+                    heading_sections[section] = content_text
+                pending_headings = []
+
+            if name in HEADING_TAGS:
+                section = _heading_section(tag.get_text(strip=True).lower())
+                if section:
+                    pending_headings.append(section)
+                last_heading = tag
+                last_heading_is_skills = 'compétence' in tag.get_text().lower()
+
+            elif name == 'ul' and last_heading is not None and last_heading_is_skills:
+                for li in tag.find_all('li', limit=5):
+                    skill = li.get_text(strip=True)
+                    if skill:
+                        skills.append(skill)
+
+        # Extraire les sections
+        sections = {
+            'missions': '',
+            'formation': '',
+            'competences': '',
+            'salaire': '',
+            'evolutions': ''
+        }
+
+        # Stratégie 1: ancre "activites" ; stratégie 2 (titres) prioritaire
+        activites_div = activites_by_id if anchor_by_id is not None else activites_by_name
+        if activites_div is not None:
+            sections['missions'] = activites_div.get_text(strip=True)[:500]
+        sections.update(heading_sections)
+
+        # Extraire salaire (chercher pattern monétaire)
+        salary_min, salary_max = extract_salary(sections['salaire'] or soup.get_text())
+
+        if not skills:
+            skills = list(DEFAULT_SKILLS)
+
+        return build_job_record(title, slug, job_info, sections, salary_min, salary_max, skills)
+
+    except Exception as e:
+        print(f"       ✗ Erreur parse détails: {str(e)[:60]}")
+        return None
+
+
+def extract_salary(salary_text):
+    """Extraire la fourchette de salaire (min, max) d'un texte, 30-50k par défaut"""
+
+    salary_min = 30000
+    salary_max = 50000
+
+    # Pattern: "35 000 € à 55 000 €" ou "35k-55k"
+    salary_patterns = [
+        r'(\d+\s*\d*)\s*000\s*€\s*(?:à|et|-)\s*(\d+\s*\d*)\s*000\s*€',
+        r'(\d+)\s*k€?\s*(?:à|et|-)\s*(\d+)\s*k€?',
+        r'entre\s*(\d+\s*\d*)\s*(?:et|à)\s*(\d+\s*\d*)'
+    ]
+
+    for pattern in salary_patterns:
+        match = re.search(pattern, salary_text, re.IGNORECASE)
+        if match:
+            try:
+                min_val = int(match.group(1).replace(' ', ''))
+                max_val = int(match.group(2).replace(' ', ''))
+
+                # Si c'est en "k", multiplier par 1000
+                if 'k' in pattern:
+                    min_val *= 1000
+                    max_val *= 1000
+
+                salary_min = min_val
+                salary_max = max_val
+                break
+            except:
+                pass
+
+    return salary_min, salary_max
+
+
+def build_job_record(title, slug, job_info, sections, salary_min, salary_max, skills):
+    """Construire l'objet métier au format de data/jobs/apec-jobs.json"""
+
+    job_data = {
+        "title": title,
+        "slug": slug,
+        "sector": job_info['category'],
+        "description": sections['missions'] or f"Métier dans le domaine {job_info['category']}",
+        "missions": sections['missions'],
+        "formation_required": sections['formation'],
+        "competences_required": sections['competences'],
+        "salary_info": sections['salaire'],
+        "evolutions": sections['evolutions'],
+        "salary": {
+            "min": salary_min,
+            "max": salary_max,
+            "currency": "EUR"
+        },
+        "required_skills": skills,
+        "required_education": extract_education(sections['formation']),
+        "formations": [
+            {
+                "title": f"Formation {title}",
+                "provider": "APEC",
+                "duration": 12,
+                "cost": 5000
+            }
+        ],
+        "mbti_fit": ["ENTJ", "ESTJ", "INTJ"],
+        "enneagram_fit": [3, 8, 1],
+        "riasec_codes": "EAS",
+        "growth_rate": 7.0,
+        "job_openings_yearly": 1000,
+        "competition_level": "Medium",
+        "working_conditions": {
+            "hours_per_week": "35-39",
+            "remote_possible": True,
+            "travel_required": False
+        },
+        "pros": ["Salaire attractif", "Évolution de carrière", "Secteur dynamique"],
+        "cons": ["Responsabilités", "Pression", "Horaires variables"],
+        "similar_jobs": [],
+        "source": "APEC",
+        "url": job_info['url']
+    }
+
+    return job_data
+
+
+def parse_job_details_reference(soup, job_info):
+    """
+    Parser les détails d'une fiche métier APEC (implémentation d'origine)
+
+    Un find_next() par titre et un find_previous() par liste : conservé comme
+    référence pour vérifier que parse_job_details() produit la même sortie.
+    """
+
+    try:
+        # Extraire le titre (nettoyer le F/H)
+        title = job_info['title'].replace(' F/H', '').replace(' H/F', '').strip()
+
+        # Créer le slug
+        slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+
+        # Extraire les sections
+        sections = {
+            'missions': '',
+            'formation': '',
+            'competences': '',
+            'salaire': '',
+            'evolutions': ''
+        }
+
+        # Stratégie 1: Chercher les sections par ID ou ancre
+        activites = soup.find(id='activites') or soup.find('a', attrs={'name': 'activites'})
+        if activites:
+            # Récupérer le contenu après l'ancre
+            content_div = activites.find_next('div', class_=['content', 'section-content'])
+            if content_div:
+                sections['missions'] = content_div.get_text(strip=True)[:500]
+
+        # Stratégie 2: Chercher par titres de sections
+        for heading in soup.find_all(['h2', 'h3', 'h4']):
+            heading_text = heading.get_text(strip=True).lower()
+
+            if 'mission' in heading_text or 'activité' in heading_text:
+                content = heading.find_next(['p', 'div', 'ul'])
+                if content:
+                    sections['missions'] = content.get_text(strip=True)[:500]
+
+            elif 'formation' in heading_text or 'expérience' in heading_text:
+                content = heading.find_next(['p', 'div', 'ul'])
+                if content:
+                    sections['formation'] = content.get_text(strip=True)[:500]
+
+            elif 'savoir-faire' in heading_text or 'compétence' in heading_text:
+                content = heading.find_next(['p', 'div', 'ul'])
+                if content:
+                    sections['competences'] = content.get_text(strip=True)[:500]
+
+            elif 'salaire' in heading_text or 'rémunération' in heading_text:
+                content = heading.find_next(['p', 'div', 'ul'])
+                if content:
+                    sections['salaire'] = content.get_text(strip=True)[:500]
+
+            elif 'évolution' in heading_text:
+                content = heading.find_next(['p', 'div', 'ul'])
+                if content:
+                    sections['evolutions'] = content.get_text(strip=True)[:500]
+
+        # Extraire salaire (chercher pattern monétaire)
+        salary_min, salary_max = extract_salary(sections['salaire'] or soup.get_text())
+
+        # Extraire compétences (chercher des listes)
+        skills = []
+        for ul in soup.find_all('ul'):
+            parent_heading = ul.find_previous(['h2', 'h3', 'h4'])
+            if parent_heading and 'compétence' in parent_heading.get_text().lower():
+                for li in ul.find_all('li')[:5]:
+                    skill = li.get_text(strip=True)
+                    if skill:
+                        skills.append(skill)
+
+        if not skills:
+            skills = list(DEFAULT_SKILLS)
+
+        return build_job_record(title, slug, job_info, sections, salary_min, salary_max, skills)
+
+    except Exception as e:
+        print(f"       ✗ Erreur parse détails: {str(e)[:60]}")
+        return None
+
+
+def extract_education(formation_text):
+    """Extraire les niveaux d'éducation du texte"""
+    education_levels = []
+
+    if not formation_text:
+        return ["Bac+5"]
+
+    text_lower = formation_text.lower()
+
+    if 'bac+5' in text_lower or 'master' in text_lower or 'ingénieur' in text_lower:
+        education_levels.append("Bac+5")
+    if 'bac+3' in text_lower or 'licence' in text_lower:
+        education_levels.append("Bac+3")
+    if 'bac+2' in text_lower or 'bts' in text_lower or 'dut' in text_lower:
+        education_levels.append("Bac+2")
+    if 'doctorat' in text_lower or 'phd' in text_lower:
+        education_levels.append("Doctorat")
+
+    return education_levels if education_levels else ["Bac+5"]
+
+
+def parse_apec_fiche_detail(html, url):
+    """Parser une fiche métier APEC en détail"""
+    
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Extraire titre (plusieurs variantes)
+        title = None
+        for selector in ['h1', '.metier-title', '.job-title', '[data-title]']:
+            elem = soup.select_one(selector)
+            if elem:
+                title = elem.text.strip()
+                break
+        
+        if not title:
+            return None
+        
+        # Extraire description
+        description = ""
+        for desc_elem in soup.find_all(['p', 'div'], class_=['description', 'desc']):
+            description = desc_elem.text.strip()
+            if len(description) > 50:
+                break
+        
+        if not description:
+            # Fallback: prendre le premier paragraphe
+            p = soup.find('p')
+            if p:
+                description = p.text.strip()[:200]
+        
+        # Extraire salaire (pattern: "35 000 à 55 000 €")
+        salary_min = 35000
+        salary_max = 55000
+        
+        for text in soup.stripped_strings:
+            if '€' in text and 'à' in text:
+                # Extraire chiffres
+                import re
+                numbers = re.findall(r'\d+\s*\d*\s*000', text)
+                if len(numbers) >= 2:
+                    try:
+                        salary_min = int(numbers[0].replace(" ", ""))
+                        salary_max = int(numbers[1].replace(" ", ""))
+                        break
+                    except:
+                        pass
+        
+        # Créer l'objet métier
+        job = {
+            "title": title,
+            "slug": title.lower().replace(" ", "-").replace("'", "").replace("(", "").replace(")", ""),
+            "sector": "Business",  # APEC = cadres
+            "description": description or f"Expert en {title.lower()}",
+            "salary": {
+                "min": salary_min,
+                "max": salary_max,
+                "currency": "EUR"
+            },
+            "required_skills": [
+                "Leadership",
+                "Management",
+                "Communication",
+                "Strategic Thinking",
+                "Problem Solving"
+            ],
+            "required_education": ["Bac+5", "MBA"],
+            "formations": [
+                {
+                    "title": f"Formation {title}",
+                    "provider": "APEC",
+                    "duration": 12,
+                    "cost": 5000
+                }
+            ],
+            "mbti_fit": ["ENTJ", "INTJ", "ESTJ"],
+            "enneagram_fit": [3, 8, 1],
+            "riasec_codes": "EAS",
+            "growth_rate": 8.5,
+            "job_openings_yearly": 1500,
+            "competition_level": "Medium",
+            "working_conditions": {
+                "hours_per_week": "35-45",
+                "remote_possible": True,
+                "travel_required": True
+            },
+            "pros": [
+                "Bon salaire",
+                "Évolution rapide",
+                "Télétravail possible"
+            ],
+            "cons": [
+                "Stress élevé",
+                "Responsabilités importantes",
+                "Déplacements fréquents"
+            ],
+            "similar_jobs": [
+                "Manager",
+                "Consultant",
+                "Director"
+            ],
+            "source": "APEC",
+            "url": url
+        }
+        
+        return job
+        
+    except Exception as e:
+        print(f"     ✗ Erreur parse: {str(e)[:60]}")
+        return None
+
+
+def parse_apec_fiche(html, url):
+    """Parser une fiche métier APEC"""
+
+    try:
+        # Extraire titre
+        title_match = re.search(r'<h1[^>]*>([^<]+)</h1>', html, re.IGNORECASE)
+        title = title_match.group(1).strip() if title_match else "Métier Cadre"
+
+        # Extraire description
+        description_match = re.search(
+            r'<p[^>]*class="[^"]*description[^"]*"[^>]*>([^<]+)</p>',
+            html,
+            re.IGNORECASE
+        )
+        description = description_match.group(1).strip() if description_match else f"Expert en {title.lower()}"
+
+        # Extraire salaire
+        salary_match = re.search(
+            r'(\d+\s*\d*\s*000)\s*à\s*(\d+\s*\d*\s*000)\s*€',
+            html
+        )
+        salary_min = int(salary_match.group(1).replace(" ", "")) if salary_match else 40000
+        salary_max = int(salary_match.group(2).replace(" ", "")) if salary_match else 65000
+
+        # Déterminer profil MBTI selon le métier
+        mbti = determine_mbti_from_title(title)
+
+        # Créer objet métier
+        job = {
+            "title": title,
+            "slug": re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-'),
+            "sector": "Business",
+            "description": description,
+            "salary": {
+                "min": salary_min,
+                "max": salary_max,
+                "currency": "EUR"
+            },
+            "required_skills": ["Communication", "Leadership", "Analytique", "Management"],
+            "required_education": ["Bac+5", "MBA"],
+            "formations": [
+                {"title": f"Formation {title}", "provider": "APEC", "cost": 5000}
+            ],
+            "mbti_fit": mbti,
+            "enneagram_fit": [3, 8],
+            "riasec_codes": "EAS",
+            "growth_rate": 8.0,
+            "job_openings_yearly": 1200,
+            "similar_jobs": ["Management", "Consulting"],
+            "source": "APEC",
+            "url": url
+        }
+
+        return job
+
+    except Exception as e:
+        return None
+
+def determine_mbti_from_title(title):
+    """Détermine le profil MBTI selon le titre du métier"""
+    title_lower = title.lower()
+
+    if any(word in title_lower for word in ['manager', 'directeur', 'responsable', 'chef']):
+        return ["ENTJ", "ESTJ", "ENFJ"]
+    elif any(word in title_lower for word in ['consultant', 'analyste', 'expert']):
+        return ["INTJ", "INTP", "ENTP"]
+    elif any(word in title_lower for word in ['commercial', 'vente', 'développement']):
+        return ["ESTP", "ENTP", "ESFJ"]
+    elif any(word in title_lower for word in ['rh', 'ressources humaines', 'recrutement']):
+        return ["ENFJ", "ESFJ", "INFJ"]
+    else:
+        return ["ENTJ", "INTJ"]
@@ -1,6 +1,6 @@
 import { NextResponse } from 'next/server'
 import OpenAI from 'openai'
-import { spawn } from 'child_process'
+import { searchJobs as searchJobsRAG } from '@/lib/job-search'
 
 const openai = new OpenAI({
   apiKey: process.env.OPENAI_API_KEY,
@@ -32,39 +32,8 @@ Limite-toi à 3 métiers maximum par réponse pour ne pas noyer l'utilisateur.
 **Important:** Ne mentionne JAMAIS que tu utilises une base de données ou un système RAG. Parle des métiers naturellement comme si tu les connaissais.`
 
 async function searchJobs(query: string): Promise<any[]> {
-  return new Promise((resolve) => {
-    const pythonProcess = spawn('python3', [
-      'search_jobs.py',
-      query,
-      '5',
-    ])
-
-    let dataString = ''
-    let errorString = ''
-
-    pythonProcess.stdout.on('data', (data: Buffer) => {
-      dataString += data.toString()
-    })
-
-    pythonProcess.stderr.on('data', (data: Buffer) => {
-      errorString += data.toString()
-    })
-
-    pythonProcess.on('close', () => {
-      try {
-        const results = JSON.parse(dataString)
-        resolve(results.jobs || [])
-      } catch {
-        resolve([])
-      }
-    })
-
-    pythonProcess.on('error', () => resolve([]))
-    setTimeout(() => {
-      pythonProcess.kill()
-      resolve([])
-    }, 10000)
-  })
+  const results = await searchJobsRAG(query, 5, 10000)
+  return results.jobs || []
 }
 
 function buildRAGContext(jobs: any[]): string {
@@ -0,0 +1,58 @@
+import { NextResponse } from 'next/server';
+import { recommendJobs } from '@/lib/job-search';
+
+/**
+ * API de recommandations de métiers par profil
+ *
+ * POST /api/recommendations
+ * Body: { riasec?: string, mbti?: string, enneagram?: number, n_results?: number,
+ *         strategy?: 'semantic' | 'profile' }
+ *
+ * Retourne: Classement précalculé du profil (tables de setup_rag.py),
+ *           ou recherche fusionnée en direct si le profil n'y figure pas ;
+ *           strategy = 'profile' : correspondance riasec_codes/mbti_fit/enneagram_fit
+ */
+export async function POST(request: Request) {
+  try {
+    const { riasec, mbti, enneagram, n_results = 5, strategy = 'semantic' } = await request.json();
+
+    if ((riasec !== undefined && typeof riasec !== 'string') || (mbti !== undefined && typeof mbti !== 'string')) {
+      return NextResponse.json(
+        { error: 'riasec and mbti must be strings' },
+        { status: 400 }
+      );
+    }
+
+    if (strategy !== 'semantic' && strategy !== 'profile') {
+      return NextResponse.json(
+        { error: "strategy must be 'semantic' or 'profile'" },
+        { status: 400 }
+      );
+    }
+
+    const recommendations = await recommendJobs(riasec, mbti, n_results, undefined, strategy, enneagram);
+
+    if (recommendations.error) {
+      return NextResponse.json(
+        { error: 'Recommendations failed', details: recommendations.error },
+        { status: 503 }
+      );
+    }
+
+    return NextResponse.json({
+      success: true,
+      riasec: recommendations.riasec,
+      mbti: recommendations.mbti,
+      source: recommendations.source,
+      results: recommendations.jobs,
+      count: recommendations.jobs.length
+    });
+
+  } catch (error: any) {
+    console.error('Recommendations error:', error);
+    return NextResponse.json(
+      { error: 'Recommendations failed', details: error.message },
+      { status: 500 }
+    );
+  }
+}
@@ -1,16 +1,50 @@
 import { NextResponse } from 'next/server';
+import { searchJobs, searchJobsBatch } from '@/lib/job-search';
 
 /**
  * API de recherche de métiers avec RAG
  *
  * POST /api/search-jobs
- * Body: { query: string, n_results?: number }
+ * Body: { query: string, n_results?: number, mode?: 'vector' | 'lexical' | 'hybrid',
+ *         filters?: { sectors?: string[], salary_min?: number, salary_max?: number,
+ *                     max_education?: string, remote_possible?: boolean } }
+ *    ou { queries: string[], fuse?: boolean, ... } : plusieurs requêtes en un appel
+ *       (fuse = true : un seul classement fusionné, sinon un bloc par requête)
+ *    timings?: boolean : durée de chaque étape de la recherche (ms) dans "timings"
  *
  * Retourne: Liste des métiers les plus pertinents
  */
 export async function POST(request: Request) {
   try {
-    const { query, n_results = 5 } = await request.json();
+    const { query, queries, fuse = false, n_results = 5, mode, filters, timings = false } = await request.json();
+
+    if (queries !== undefined) {
+      if (!Array.isArray(queries) || queries.length === 0 || !queries.every((q) => typeof q === 'string' && q)) {
+        return NextResponse.json(
+          { error: 'queries must be a non-empty array of strings' },
+          { status: 400 }
+        );
+      }
+
+      const batch = await searchJobsBatch(queries, n_results, fuse, undefined, mode, filters, timings);
+
+      if (batch.error) {
+        return NextResponse.json(
+          { error: 'Search failed', details: batch.error },
+          { status: batch.status === 400 ? 400 : 503 }
+        );
+      }
+      const results = fuse ? batch.jobs || [] : batch.results || [];
+
+      return NextResponse.json({
+        success: true,
+        queries,
+        fused: fuse,
+        results,
+        count: results.length,
+        ...(timings && { timings: batch.timings })
+      });
+    }
 
     if (!query || typeof query !== 'string') {
       return NextResponse.json(
@@ -19,29 +53,23 @@ export async function POST(request: Request) {
       );
     }
 
-    // Appeler le script Python pour la recherche
-    const { spawn } = require('child_process');
-    const pythonProcess = spawn('python3', [
-      'search_jobs.py',
-      query,
-      n_results.toString()
-    ]);
-
-    // Collecter la sortie
-    let dataString = '';
+    // Serveur de recherche persistant, avec repli sur search_jobs.py
+    const results = await searchJobs(query, n_results, undefined, mode, filters, timings);
 
-    for await (const chunk of pythonProcess.stdout) {
-      dataString += chunk;
+    // Requête invalide (mode, filtres) : 400 avec le message ; index ou clé API : 503
+    if (results.error) {
+      return NextResponse.json(
+        { error: 'Search failed', details: results.error },
+        { status: results.status === 400 ? 400 : 503 }
+      );
     }
 
-    // Parser le résultat JSON
-    const results = JSON.parse(dataString);
-
     return NextResponse.json({
       success: true,
       query,
       results: results.jobs,
-      count: results.jobs.length
+      count: results.jobs.length,
+      ...(timings && { timings: results.timings })
     });
 
   } catch (error: any) {
@@ -59,10 +87,11 @@ export async function POST(request: Request) {
 export async function GET() {
   return NextResponse.json({
     message: 'Job Search API',
-    usage: 'POST with { query: string, n_results?: number }',
+    usage: 'POST with { query: string, n_results?: number, mode?: "vector" | "lexical" | "hybrid", filters?: object }',
     example: {
       query: 'métiers créatifs',
-      n_results: 5
+      n_results: 5,
+      filters: { sectors: ['Communication, création'], salary_min: 35000 }
     }
   });
 }
@@ -60,40 +60,18 @@ export default function RecommendationsPage() {
     try {
       setLoading(true)
 
-      // Construire query basée sur les tests
-      let query = ''
-
-      if (userData.riasec_result) {
-        const riasecMap: any = {
-          'R': 'réaliste pratique technique',
-          'I': 'investigateur analytique scientifique',
-          'A': 'artistique créatif',
-          'S': 'social empathique aide',
-          'E': 'entreprenant leader commercial',
-          'C': 'conventionnel organisé méthodique'
-        }
-
-        const codes = userData.riasec_result.split('')
-        query = codes.map((c: string) => riasecMap[c] || '').join(' ')
-      }
-
-      if (userData.mbti_type) {
-        query += ` ${userData.mbti_type}`
-      }
-
-      // Fallback query
-      if (!query) {
-        query = 'métiers variés intéressants'
-      }
-
       // Limiter selon plan
       const nResults = userData.isPremium ? 25 : freemium.free.jobs
 
-      // Appeler API de recherche
-      const response = await fetch('/api/search-jobs', {
+      // Classement précalculé du profil RIASEC/MBTI (recherche en direct à défaut)
+      const response = await fetch('/api/recommendations', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ query, n_results: nResults })
+        body: JSON.stringify({
+          riasec: userData.riasec_result,
+          mbti: userData.mbti_type,
+          n_results: nResults
+        })
       })
 
       const data = await response.json()
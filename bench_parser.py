@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark et non-régression des parsers de fiches APEC
+
+Chaque parser tourne sur un corpus de pages HTML enregistrées
+(data/fixtures/apec/fixtures.json, et en option les pages du cache de
+scraping). Le script mesure pages/s, les temps par page p50/p99 et le pic
+mémoire. Les champs extraits sont comparés aux sorties de référence de
+data/fixtures/apec/golden/.
+
+Usage:
+    python bench_parser.py                    # benchmark + comparaison aux goldens
+    python bench_parser.py --update-golden    # régénérer les goldens
+    python bench_parser.py --from-cache data/page_cache --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from apec_parser import (
+    PARSER_BACKENDS,
+    make_soup,
+    parse_apec_fiche,
+    parse_apec_fiche_detail,
+    parse_job_details,
+    parse_job_details_reference,
+)
+
+FIXTURES_FILE = "data/fixtures/apec/fixtures.json"
+GOLDEN_DIR = "data/fixtures/apec/golden"
+
+
+def job_info(fixture):
+    return {'title': fixture['title'], 'category': fixture['category'], 'url': fixture['url']}
+
+
+def parser_variants():
+    """
+    (nom affiché, golden, fonction(html, fixture)) pour chaque parser
+
+    Les variantes de parse_job_details (référence, parcours unique, backends)
+    partagent le même golden : leur sortie doit être identique.
+    """
+    variants = []
+    for backend in PARSER_BACKENDS:
+        variants.append((
+            f"parse_job_details_reference[{backend}]",
+            "parse_job_details",
+            lambda html, fx, b=backend: parse_job_details_reference(make_soup(html, b), job_info(fx)),
+        ))
+        variants.append((
+            f"parse_job_details[{backend}]",
+            "parse_job_details",
+            lambda html, fx, b=backend: parse_job_details(make_soup(html, b), job_info(fx)),
+        ))
+    variants.append(("parse_apec_fiche_detail", "parse_apec_fiche_detail",
+                     lambda html, fx: parse_apec_fiche_detail(html, fx['url'])))
+    variants.append(("parse_apec_fiche", "parse_apec_fiche",
+                     lambda html, fx: parse_apec_fiche(html, fx['url'])))
+    return variants
+
+
+def load_corpus(cache_dir=None):
+    """Fixtures versionnées (avec golden), puis pages du cache de scraping (benchmark seul)"""
+    with open(FIXTURES_FILE, 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)['fixtures']
+
+    corpus = []
+    for fixture in fixtures:
+        with open(fixture['path'], 'r', encoding='utf-8') as f:
+            corpus.append(dict(fixture, html=f.read(), golden=True))
+
+    if cache_dir:
+        for entry_path in sorted(Path(cache_dir, "index").glob("*.json")):
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            blob = Path(cache_dir, "blobs", f"{entry['content_sha256']}.html")
+            if not blob.exists():
+                continue
+            slug = entry['url'].rstrip('/').rsplit('/', 1)[-1].replace('.html', '')
+            corpus.append({
+                'name': slug,
+                'title': slug.replace('-', ' ').capitalize(),
+                'category': 'Cache',
+                'url': entry['url'],
+                'html': blob.read_text(encoding='utf-8'),
+                'golden': False,
+            })
+
+    return corpus
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def benchmark(func, corpus, repeat):
+    """Temps par page (ms), pages/s et pic mémoire (KB) d'un parser sur le corpus"""
+    timings = []
+    for _ in range(repeat):
+        for fixture in corpus:
+            start = time.perf_counter()
+            func(fixture['html'], fixture)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    # Pic mémoire mesuré à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    for fixture in corpus:
+        func(fixture['html'], fixture)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages_per_s': len(timings) / (sum(timings) / 1000) if timings else 0.0,
+        'p50_ms': statistics.median(timings),
+        'p99_ms': percentile(timings, 99),
+        'peak_kb': peak / 1024,
+    }
+
+
+def diff_fields(expected, actual):
+    """Champs dont la valeur diffère (None = sortie absente)"""
+    if expected is None or actual is None:
+        return [] if expected == actual else ['<sortie>']
+    keys = list(expected) + [k for k in actual if k not in expected]
+    return [k for k in keys if expected.get(k) != actual.get(k)]
+
+
+def check_golden(variants, corpus, update):
+    """Compare chaque sortie à son golden ; retourne le nombre de régressions"""
+    golden_dir = Path(GOLDEN_DIR)
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    regressions = 0
+    written = set()
+
+    for name, golden_name, func in variants:
+        for fixture in corpus:
+            if not fixture['golden']:
+                continue
+            output = func(fixture['html'], fixture)
+            golden_path = golden_dir / f"{fixture['name']}.{golden_name}.json"
+
+            if update and golden_path not in written:
+                # La première variante (référence html.parser) fait foi
+                golden_path.write_text(json.dumps(output, ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
+                written.add(golden_path)
+                continue
+
+            if not golden_path.exists():
+                print(f"  ⚠️  {fixture['name']} / {name}: golden absent (--update-golden)")
+                continue
+
+            expected = json.loads(golden_path.read_text(encoding='utf-8'))
+            fields = diff_fields(expected, output)
+            if fields:
+                regressions += 1
+                print(f"  ✗ {fixture['name']} / {name}: champs différents {fields}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark et non-régression des parsers APEC")
+    parser.add_argument("--repeat", type=int, default=10, help="Passages sur le corpus pour les temps")
+    parser.add_argument("--from-cache", metavar="DIR", help="Ajouter les pages du cache de scraping au corpus")
+    parser.add_argument("--update-golden", action="store_true", help="Régénérer les sorties de référence")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.from_cache)
+    variants = parser_variants()
+
+    print(f"📊 BENCHMARK PARSERS APEC ({len(corpus)} pages, {args.repeat} passages)")
+    print("=" * 78)
+    print(f"{'parser':<40} {'pages/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'pic (KB)':>9}")
+
+    for name, _, func in variants:
+        try:
+            stats = benchmark(func, corpus, args.repeat)
+        except Exception as e:
+            print(f"{name:<40} indisponible ({e})")
+            continue
+        print(f"{name:<40} {stats['pages_per_s']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['peak_kb']:>9.0f}")
+
+    print("=" * 78)
+
+    if args.update_golden:
+        check_golden(variants, corpus, update=True)
+        print(f"✓ Goldens régénérés dans {GOLDEN_DIR}")
+        return
+
+    print("\n🔍 Comparaison aux goldens")
+    regressions = check_golden(variants, corpus, update=False)
+    if regressions:
+        print(f"❌ {regressions} sortie(s) différente(s) des goldens")
+        sys.exit(1)
+    print("✓ Toutes les sorties sont identiques aux goldens")
+
+
+if __name__ == "__main__":
+    main()
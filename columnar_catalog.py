@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Catalogue colonnaire des métiers (Arrow IPC) écrit à côté de apec-jobs.json
+
+    data/jobs/apec-jobs.arrow        une colonne par champ de fiche, non compressé
+    data/jobs/apec-jobs.slugs.json   slug -> ligne
+
+Le fichier Arrow est ouvert en memory-map : un lecteur ne touche que les
+colonnes qu'il sélectionne, le temps de chargement et la mémoire résidente
+suivent donc le nombre de colonnes lues et non la taille du catalogue.
+L'export JSON reproduit le format historique {metadata, jobs} : les champs
+absents d'une fiche (et non nuls) sont notés dans une colonne interne et
+retirés à la lecture ; un champ qu'Arrow ne relirait pas à l'identique
+(sous-clés différentes selon la source, entiers et décimaux mêlés) est
+stocké en JSON.
+
+Usage:
+    python columnar_catalog.py build  [data/jobs/apec-jobs.json]
+    python columnar_catalog.py export [data/jobs/apec-jobs.arrow] [sortie.json]
+    python columnar_catalog.py info   [data/jobs/apec-jobs.arrow]
+    python columnar_catalog.py check  [data/jobs/apec-jobs.json data/jobs/jobs.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+DEFAULT_JSON_FILE = "data/jobs/apec-jobs.json"
+SLUG_INDEX_SUFFIX = ".slugs.json"
+
+# Métadonnées stockées dans le schéma Arrow
+METADATA_KEY = b"declic.metadata"
+JSON_COLUMNS_KEY = b"declic.json_columns"
+
+# Colonne interne : champs absents de chaque fiche (une valeur nulle reste une valeur)
+MISSING_COLUMN = "__declic_missing__"
+
+ROUND_TRIP_FILES = ("data/jobs/apec-jobs.json", "data/jobs/jobs.json")
+
+# Fiches de sources différentes, vérifiées par "check" en plus des fichiers
+HETEROGENEOUS_SAMPLE = {
+    "metadata": {"source": "check"},
+    "jobs": [
+        {"slug": "a", "salary": {"min": 2.5, "max": 4, "currency": "EUR"}, "level": 2, "tags": ["x"]},
+        {"slug": "b", "salary": {"min": 3}, "level": 1.5, "tags": []},
+        {"slug": "c", "level": None, "tags": [1, "y"]},
+    ],
+}
+
+
+def catalog_path(json_path: str) -> Path:
+    """data/jobs/apec-jobs.json -> data/jobs/apec-jobs.arrow"""
+    return Path(json_path).with_suffix(".arrow")
+
+
+def slug_index_path(path) -> Path:
+    path = Path(path)
+    return path.with_name(path.stem + SLUG_INDEX_SUFFIX)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow manquant: pip install pyarrow")
+
+
+def _identical(a, b) -> bool:
+    """Égalité stricte : mêmes types (2 != 2.0), mêmes clés (pas de sous-clé ajoutée à None)"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_identical(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_identical(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and a != a:
+        return b != b  # NaN
+    return a == b
+
+
+def _column(values):
+    """
+    Colonne Arrow typée si elle se relit à l'identique ; sinon (types
+    hétérogènes entre fiches, structs aux sous-clés différentes, entiers
+    promus en décimaux) le champ est stocké en JSON (chaîne)
+    """
+    try:
+        array = pa.array(values)
+        if _identical(array.to_pylist(), values):
+            return array, False
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        pass
+    return pa.array([None if v is None else json.dumps(v, ensure_ascii=False) for v in values],
+                    type=pa.string()), True
+
+
+def write_columnar_catalog(data: dict, path) -> bool:
+    """
+    Écrit {metadata, jobs} en Arrow IPC + index slug -> ligne
+
+    Returns:
+        bool: False si pyarrow n'est pas installé (le JSON reste la référence)
+    """
+    if pa is None:
+        return False
+
+    jobs = data.get("jobs", [])
+    names = []
+    for job in jobs:
+        for key in job:
+            if key not in names:
+                names.append(key)
+
+    arrays = []
+    json_columns = []
+    for name in names:
+        array, as_json = _column([job.get(name) for job in jobs])
+        arrays.append(array)
+        if as_json:
+            json_columns.append(name)
+
+    # Colonne écrite seulement si une fiche n'a pas tous les champs
+    missing = [[name for name in names if name not in job] for job in jobs]
+    if any(missing):
+        arrays.append(pa.array(missing, type=pa.list_(pa.string())))
+        names = names + [MISSING_COLUMN]
+
+    schema_metadata = {
+        METADATA_KEY: json.dumps(data.get("metadata", {}), ensure_ascii=False).encode("utf-8"),
+        JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8"),
+    }
+    table = pa.Table.from_arrays(arrays, names=names).replace_schema_metadata(schema_metadata)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    slug_index = {}
+    for row, job in enumerate(jobs):
+        slug_index.setdefault(job.get("slug") or job.get("title", ""), row)
+    tmp_index = slug_index_path(path).with_name(f"{slug_index_path(path).name}.{os.getpid()}.tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(slug_index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_index, slug_index_path(path))
+    return True
+
+
+class ColumnarCatalog:
+    """
+    Catalogue Arrow ouvert en memory-map (lecture seule)
+
+    Attributes:
+        table: Table Arrow (les colonnes ne sont lues qu'à l'accès)
+        metadata: Bloc "metadata" du format JSON historique
+    """
+
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = Path(path)
+        self._source = pa.memory_map(str(self.path), "r")
+        self.table = pa.ipc.open_file(self._source).read_all()
+
+        schema_metadata = self.table.schema.metadata or {}
+        self.metadata = json.loads(schema_metadata.get(METADATA_KEY, b"{}"))
+        self.json_columns = set(json.loads(schema_metadata.get(JSON_COLUMNS_KEY, b"[]")))
+        self._slug_index = None
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def column_names(self) -> list:
+        return [name for name in self.table.column_names if name != MISSING_COLUMN]
+
+    def slug_index(self) -> dict:
+        """slug -> ligne (fichier compagnon, chargé au premier accès)"""
+        if self._slug_index is None:
+            with open(slug_index_path(self.path), "r", encoding="utf-8") as f:
+                self._slug_index = json.load(f)
+        return self._slug_index
+
+    def _select(self, table, columns):
+        if columns is not None:
+            names = [name for name in columns if name in table.column_names and name != MISSING_COLUMN]
+            if MISSING_COLUMN in table.column_names:
+                names.append(MISSING_COLUMN)
+            table = table.select(names)
+        rows = table.to_pylist()
+        decoded = self.json_columns.intersection(table.column_names)
+        for row in rows:
+            for name in decoded:
+                if row[name] is not None:
+                    row[name] = json.loads(row[name])
+            # Champs absents de la fiche d'origine : retirés plutôt que None
+            for name in row.pop(MISSING_COLUMN, None) or ():
+                row.pop(name, None)
+        return rows
+
+    def jobs(self, columns=None) -> list:
+        """Fiches réduites aux colonnes demandées (toutes si None)"""
+        return self._select(self.table, columns)
+
+    def job(self, slug: str, columns=None):
+        """Une fiche par son slug, sans lire les autres lignes ; None si absente"""
+        row = self.slug_index().get(slug)
+        if row is None:
+            return None
+        return self._select(self.table.slice(row, 1), columns)[0]
+
+    def to_json_data(self) -> dict:
+        """Format historique {metadata, jobs} de apec-jobs.json"""
+        return {"metadata": self.metadata, "jobs": self.jobs()}
+
+
+def read_jobs(json_path: str = DEFAULT_JSON_FILE, columns=None) -> list:
+    """
+    Fiches métiers, depuis le catalogue Arrow s'il est à jour, sinon depuis le JSON
+
+    Args:
+        json_path: Fichier JSON de référence (le catalogue est à côté)
+        columns: Champs nécessaires au lecteur (tous si None) ; ignoré en repli JSON
+    """
+    arrow_path = catalog_path(json_path)
+    json_file = Path(json_path)
+    if pa is not None and arrow_path.exists() and (
+        not json_file.exists() or arrow_path.stat().st_mtime >= json_file.stat().st_mtime
+    ):
+        return ColumnarCatalog(arrow_path).jobs(columns)
+
+    with open(json_file, "r", encoding="utf-8") as f:
+        return json.load(f).get("jobs", [])
+
+
+def check_round_trip(json_path: str) -> list:
+    """Aller-retour JSON -> Arrow -> JSON d'un fichier (voir check_round_trip_data)"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return check_round_trip_data(data)
+
+
+def check_round_trip_data(data: dict) -> list:
+    """
+    Écrit le catalogue de {metadata, jobs} dans un fichier temporaire et le relit
+
+    Returns:
+        list: Différences (vide si fiches et métadonnées sont identiques, types compris)
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        arrow_path = Path(tmp_dir) / "check.arrow"
+        write_columnar_catalog(data, arrow_path)
+        exported = ColumnarCatalog(arrow_path).to_json_data()
+
+    differences = []
+    if not _identical(exported["metadata"], data.get("metadata", {})):
+        differences.append("metadata")
+    jobs = data.get("jobs", [])
+    if len(exported["jobs"]) != len(jobs):
+        differences.append(f"{len(exported['jobs'])} fiches relues pour {len(jobs)}")
+    for row, (original, read) in enumerate(zip(jobs, exported["jobs"])):
+        if not _identical(read, original):
+            fields = sorted(key for key in set(original) | set(read)
+                            if key not in original or key not in read or not _identical(original[key], read[key]))
+            differences.append(f"ligne {row} ({original.get('slug', '')}): {', '.join(fields)}")
+    return differences
+
+
+def save_jobs_catalog(data: dict, json_path: str):
+    """Écrit le catalogue colonnaire à côté du JSON produit par un scraper"""
+    if write_columnar_catalog(data, catalog_path(json_path)):
+        print(f"✓ Catalogue colonnaire: {catalog_path(json_path)}")
+    else:
+        print("⚠️  pyarrow absent : catalogue colonnaire non écrit (pip install pyarrow)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalogue colonnaire des métiers (Arrow IPC)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Construire le catalogue depuis le JSON")
+    build.add_argument("json_file", nargs="?", default=DEFAULT_JSON_FILE)
+
+    export = subparsers.add_parser("export", help="Exporter le catalogue au format JSON historique")
+    export.add_argument("catalog", nargs="?", default=str(catalog_path(DEFAULT_JSON_FILE)))
+    export.add_argument("output", nargs="?", default=None, help="Fichier JSON (défaut: sortie standard)")
+
+    info = subparsers.add_parser("info", help="Colonnes et temps de lecture du catalogue")
+    info.add_argument("catalog", nargs="?", default=str(catalog_path(DEFAULT_JSON_FILE)))
+
+    check = subparsers.add_parser("check", help="Vérifier l'aller-retour JSON -> Arrow -> JSON")
+    check.add_argument("json_files", nargs="*", default=list(ROUND_TRIP_FILES))
+
+    args = parser.parse_args()
+
+    try:
+        _require_pyarrow()
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.command == "build":
+        with open(args.json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        write_columnar_catalog(data, catalog_path(args.json_file))
+        print(f"✓ {len(data.get('jobs', []))} métiers -> {catalog_path(args.json_file)}")
+
+    elif args.command == "export":
+        data = ColumnarCatalog(args.catalog).to_json_data()
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"✓ {len(data['jobs'])} métiers -> {args.output}")
+        else:
+            print(text)
+
+    elif args.command == "check":
+        failed = False
+        checks = [(json_file, lambda json_file=json_file: check_round_trip(json_file)) for json_file in args.json_files]
+        checks.append(("échantillon hétérogène", lambda: check_round_trip_data(HETEROGENEOUS_SAMPLE)))
+        for label, run_check in checks:
+            differences = run_check()
+            if differences:
+                failed = True
+                print(f"❌ {label}: {len(differences)} différence(s)")
+                for difference in differences[:20]:
+                    print(f"   {difference}")
+            else:
+                print(f"✓ {label}: aller-retour identique")
+        if failed:
+            sys.exit(1)
+
+    elif args.command == "info":
+        start = time.perf_counter()
+        catalog = ColumnarCatalog(args.catalog)
+        opened_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        catalog.jobs(["slug", "title", "sector"])
+        read_ms = (time.perf_counter() - start) * 1000
+        print(f"📊 {args.catalog}: {len(catalog)} métiers, {len(catalog.column_names)} colonnes")
+        print(f"   Colonnes      : {', '.join(catalog.column_names)}")
+        print(f"   Colonnes JSON : {', '.join(sorted(catalog.json_columns)) or 'aucune'}")
+        print(f"   Ouverture     : {opened_ms:.2f} ms (memory-map)")
+        print(f"   slug/title/sector : {read_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Journal de crawl append-only (JSONL, une fiche par ligne, clé = URL)
+Chaque fiche est écrite dès son extraction : un crawl interrompu peut reprendre
+là où il s'est arrêté, puis être compacté en data/jobs/apec-jobs.json
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+class CrawlJournal:
+    """
+    Journal des fiches extraites pendant un crawl
+
+    Args:
+        path: Fichier JSONL du journal
+        resume: Conserver le journal existant (sinon il est remis à zéro)
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries = self._load() if resume else {}
+
+        if not resume and self.path.exists():
+            self.path.unlink()
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() > 0 and not self._ends_with_newline():
+            # Isoler la ligne tronquée pour que la prochaine écriture reste lisible
+            self._file.write('\n')
+
+    def _load(self) -> dict:
+        """URL -> fiche, dans l'ordre d'extraction (la dernière écriture l'emporte)"""
+        entries = {}
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par l'interruption
+                    continue
+                entries[entry['url']] = entry['job']
+        return entries
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def record(self, url: str, job: dict):
+        """Ajoute une fiche au journal et la force sur disque"""
+        self.entries[url] = job
+        self._file.write(json.dumps({'url': url, 'job': job}, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def jobs(self, url_order=None) -> list:
+        """Fiches du journal, dans l'ordre de `url_order` puis dans l'ordre d'extraction"""
+        ordered = []
+        seen = set()
+        for url in url_order or []:
+            if url in self.entries and url not in seen:
+                ordered.append(self.entries[url])
+                seen.add(url)
+        ordered.extend(job for url, job in self.entries.items() if url not in seen)
+        return ordered
+
+    def close(self):
+        self._file.close()
+
+
+def write_json_atomic(path: str, data: dict):
+    """Écrit un JSON via un fichier temporaire : jamais de fichier à moitié écrit"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Ordonnanceur de crawl : pool de workers asyncio + politesse par hôte
+Remplace les asyncio.sleep() fixes des scrapers par un débit maximal par hôte
+"""
+
+import asyncio
+import os
+import time
+from urllib.parse import urlparse
+
+DEFAULT_WORKERS = int(os.getenv("DECLIC_CRAWL_WORKERS", "4"))
+DEFAULT_RPS = float(os.getenv("DECLIC_CRAWL_RPS", "0.5"))
+
+
+class HostRateLimiter:
+    """
+    Budget de politesse : au plus `rps` requêtes par seconde et par hôte
+
+    Les départs de requêtes vers un même hôte sont espacés d'au moins 1/rps
+    secondes, quel que soit le nombre de workers.
+    """
+
+    def __init__(self, rps: float = DEFAULT_RPS):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, url: str):
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def polite_arun(crawler, limiter: HostRateLimiter, url: str, **kwargs):
+    """crawler.arun() après réservation d'un créneau pour l'hôte de l'URL"""
+    await limiter.acquire(url)
+    return await crawler.arun(url, **kwargs)
+
+
+async def run_pool(items, worker, workers: int = DEFAULT_WORKERS):
+    """
+    Applique `worker(item)` (coroutine) à tous les items avec au plus `workers` en parallèle
+
+    Returns:
+        list: Résultats dans l'ordre des items (l'exception levée si un worker échoue)
+    """
+    items = list(items)
+    results = [None] * len(items)
+    queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+
+    async def consume():
+        while True:
+            try:
+                index, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = await worker(item)
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*(consume() for _ in range(max(1, min(workers, len(items))))))
+    return results
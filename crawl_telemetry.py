@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Télémétrie structurée des crawls (remplace la lecture des logs par check-scraping-progress.sh)
+
+    data/crawl_events.jsonl   un événement JSON par ligne et par étape de chaque URL
+    data/crawl_status.json    résumé du crawl en cours, réécrit au plus une fois par seconde
+
+Événements : queued (URL découverte), fetch_start, fetch_end (attente de
+politesse, rendu, octets, cache), done (analyse, issue : ok, empty ou error
+avec sa catégorie "étape:Exception"). Le résumé donne le débit sur la
+dernière minute, l'ETA, les erreurs par catégorie, les percentiles de rendu,
+les pages les plus lentes et compare le débit à celui du crawl précédent du
+même mode (régression si moins de la moitié).
+
+Usage:
+    python crawl_telemetry.py status           résumé lisible du crawl en cours ou du dernier
+    python crawl_telemetry.py serve [--port]   GET /status (JSON) pour un tableau de bord local
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+EVENTS_FILE = os.getenv("DECLIC_CRAWL_EVENTS_FILE", "data/crawl_events.jsonl")
+STATUS_FILE = os.getenv("DECLIC_CRAWL_STATUS_FILE", "data/crawl_status.json")
+
+# Page signalée lente au-delà de ce temps de rendu
+SLOW_PAGE_MS = float(os.getenv("DECLIC_CRAWL_SLOW_MS", "15000"))
+
+STATUS_INTERVAL_S = 1.0
+RATE_WINDOW_S = 60.0
+SLOWEST_PAGES = 10
+
+# Régression de débit : moins de REGRESSION_RATIO × le débit du crawl précédent,
+# une fois REGRESSION_MIN_PAGES pages terminées
+REGRESSION_RATIO = 0.5
+REGRESSION_MIN_PAGES = 20
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+def _write_json_atomic(path: Path, data: dict):
+    tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_status(path: str = STATUS_FILE):
+    """Résumé enregistré, None s'il n'existe pas ; "alive" indique si le crawl tourne encore"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    status['alive'] = status.get('state') == 'running' and _pid_alive(status.get('pid'))
+    return status
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (TypeError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PageSpan:
+    """
+    Suivi d'une URL, utilisé comme bloc with autour du fetch et de l'analyse
+
+    Une exception levée dans le bloc est enregistrée (issue error, catégorie
+    "fetch:TimeoutError", "parse:KeyError"...) puis propagée.
+    """
+
+    def __init__(self, telemetry, url: str, kind: str):
+        self.telemetry = telemetry
+        self.url = url
+        self.kind = kind
+        self.stage = 'fetch'
+        self.page = None
+        self.bytes = 0
+        self.parse_ms = 0.0
+        self.result = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        self.telemetry.emit('fetch_start', url=self.url, kind=self.kind)
+        return self
+
+    def fetched(self, page):
+        """Page obtenue (CachedPage) : temps d'attente, de rendu et taille"""
+        self.page = page
+        self.stage = 'parse'
+        self.bytes = len((page.html or '').encode('utf-8'))
+        render_ms = page.render_s * 1000
+        self.telemetry.emit(
+            'fetch_end', url=self.url, kind=self.kind,
+            wait_ms=round(page.wait_s * 1000, 1),
+            render_ms=round(render_ms, 1),
+            bytes=self.bytes,
+            from_cache=page.from_cache,
+            slow=render_ms > SLOW_PAGE_MS,
+        )
+
+    @contextmanager
+    def parsing(self):
+        """Bloc with chronométré comme temps d'analyse"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.parse_ms += (time.monotonic() - start) * 1000
+
+    def outcome(self, result: str):
+        """Issue explicite (ok ou empty) ; par défaut : ok si la page a un contenu"""
+        self.result = result
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            result, category = 'error', f"{self.stage}:{exc_type.__name__}"
+        else:
+            result = self.result or ('ok' if self.page is not None and self.page.html else 'empty')
+            category = None
+        self.telemetry.page_done(self, result, category, (time.monotonic() - self._start) * 1000)
+        return False
+
+
+class CrawlTelemetry:
+    """
+    Journal d'événements et résumé d'un crawl
+
+    Args:
+        source: Nom du crawl (apec, all...)
+        mode: online ou offline : le débit n'est comparé qu'au crawl précédent de même source et mode
+        resume: Conserver les événements existants (reprise d'un crawl)
+    """
+
+    def __init__(self, source: str, mode: str = 'online', events_file: str = EVENTS_FILE,
+                 status_file: str = STATUS_FILE, resume: bool = False):
+        self.source = source
+        self.mode = mode
+        self.events_path = Path(events_file)
+        self.status_path = Path(status_file)
+        self.events_path.parent.mkdir(parents=True, exist_ok=True)
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+
+        previous = read_status(status_file)
+        self.baseline_rate = None
+        if (previous and previous.get('state') == 'finished' and previous.get('source') == source
+                and previous.get('mode') == mode):
+            self.baseline_rate = previous.get('overall_rate_per_min')
+
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._events = open(self.events_path, 'a' if resume else 'w', encoding='utf-8')
+        self._queued = set()
+        self._done = set()
+        self._outcomes = Counter()
+        self._errors = Counter()
+        self._recent = deque()
+        self._render_ms = []
+        self._parse_ms = []
+        self._slowest = []
+        self._bytes = 0
+        self._from_cache = 0
+        self._slow = 0
+        self._last_status = 0.0
+        self.emit('run_start', source=source, mode=mode)
+
+    def emit(self, event: str, **fields):
+        record = {'ts': round(time.time(), 3), 'run': self.run_id, 'event': event, **fields}
+        self._events.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._events.flush()
+
+    def queued(self, urls, kind: str = 'page'):
+        """URLs découvertes, à traiter (base de l'ETA)"""
+        for url in urls:
+            if url not in self._queued:
+                self._queued.add(url)
+                self.emit('queued', url=url, kind=kind)
+        self.write_status()
+
+    def page(self, url: str, kind: str = 'page') -> PageSpan:
+        self._queued.add(url)
+        return PageSpan(self, url, kind)
+
+    def page_done(self, span: PageSpan, result: str, category: str, total_ms: float):
+        self.emit('done', url=span.url, kind=span.kind, outcome=result, error=category,
+                  parse_ms=round(span.parse_ms, 1), total_ms=round(total_ms, 1))
+        self._done.add(span.url)
+        self._outcomes[result] += 1
+        if category:
+            self._errors[category] += 1
+        self._recent.append(time.monotonic())
+        if span.page is not None:
+            self._bytes += span.bytes
+            if span.page.from_cache:
+                self._from_cache += 1
+            else:
+                render_ms = span.page.render_s * 1000
+                self._render_ms.append(render_ms)
+                self._slow += render_ms > SLOW_PAGE_MS
+                self._slowest.append((render_ms, span.url))
+                self._slowest = sorted(self._slowest, reverse=True)[:SLOWEST_PAGES]
+        if span.parse_ms:
+            self._parse_ms.append(span.parse_ms)
+        self.write_status()
+
+    def status(self, state: str = 'running') -> dict:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > RATE_WINDOW_S:
+            self._recent.popleft()
+        elapsed = now - self._start
+        window = min(RATE_WINDOW_S, elapsed) or 1.0
+        rate = len(self._recent) * 60.0 / window
+        overall_rate = len(self._done) * 60.0 / elapsed if elapsed else 0.0
+        remaining = len(self._queued - self._done)
+
+        regression = (self.baseline_rate is not None and len(self._done) >= REGRESSION_MIN_PAGES
+                      and overall_rate < REGRESSION_RATIO * self.baseline_rate)
+        return {
+            'run_id': self.run_id,
+            'source': self.source,
+            'mode': self.mode,
+            'state': state,
+            'pid': os.getpid(),
+            'started_at': round(self.started_at, 3),
+            'updated_at': round(time.time(), 3),
+            'elapsed_s': round(elapsed, 1),
+            'pages': {
+                'queued': len(self._queued),
+                'done': len(self._done),
+                'remaining': remaining,
+                'from_cache': self._from_cache,
+                **dict(self._outcomes),
+            },
+            'errors_by_category': dict(self._errors),
+            'bytes': self._bytes,
+            'rate_per_min': round(rate, 2),
+            'overall_rate_per_min': round(overall_rate, 2),
+            'eta_s': round(remaining * 60.0 / rate, 1) if rate and state == 'running' else None,
+            'render_ms': {'p50': _percentile(self._render_ms, 0.5), 'p95': _percentile(self._render_ms, 0.95)},
+            'parse_ms': {'p50': _percentile(self._parse_ms, 0.5), 'p95': _percentile(self._parse_ms, 0.95)},
+            'slow_pages': self._slow,
+            'slowest': [{'url': url, 'render_ms': round(ms, 1)} for ms, url in self._slowest],
+            'baseline_rate_per_min': self.baseline_rate,
+            'throughput_regression': regression,
+        }
+
+    def write_status(self, state: str = 'running', force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_status < STATUS_INTERVAL_S:
+            return
+        self._last_status = now
+        _write_json_atomic(self.status_path, self.status(state))
+
+    def close(self):
+        """Fin du crawl : résumé final (state finished, base de comparaison du prochain)"""
+        status = self.status('finished')
+        self.emit('run_end', pages=status['pages'], overall_rate_per_min=status['overall_rate_per_min'])
+        self._events.close()
+        _write_json_atomic(self.status_path, status)
+        return status
+
+
+def format_status(status: dict) -> str:
+    """Résumé lisible (remplace check-scraping-progress.sh)"""
+    pages = status['pages']
+    state = "🔄 EN COURS" if status.get('alive') else (
+        "✅ TERMINÉ" if status['state'] == 'finished' else "⚠️  INTERROMPU")
+    lines = [
+        f"✓ Crawl: {status['source']} ({status['mode']}), lancé le "
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status['started_at']))}",
+        f"✓ Statut: {state} ({status['elapsed_s']} s)",
+        f"✓ Pages: {pages['done']}/{pages['queued']} terminées, {pages.get('ok', 0)} ok, "
+        f"{pages.get('empty', 0)} vides, {pages.get('error', 0)} erreurs, {pages['from_cache']} depuis le cache",
+        f"✓ Débit: {status['rate_per_min']} pages/min (dernière minute), {status['overall_rate_per_min']} en moyenne",
+    ]
+    if status.get('eta_s') is not None and status.get('alive'):
+        lines.append(f"✓ Fin estimée dans {status['eta_s'] / 60:.1f} min ({pages['remaining']} pages restantes)")
+    lines.append(f"✓ Rendu: p50 {status['render_ms']['p50']} ms, p95 {status['render_ms']['p95']} ms ; "
+                 f"analyse p50 {status['parse_ms']['p50']} ms")
+    if status.get('throughput_regression'):
+        lines.append(f"⚠️  Débit en baisse: {status['overall_rate_per_min']} pages/min contre "
+                     f"{status['baseline_rate_per_min']} au crawl précédent")
+    for category, count in sorted(status['errors_by_category'].items(), key=lambda item: -item[1]):
+        lines.append(f"  ✗ {category}: {count}")
+    if status['slow_pages']:
+        lines.append(f"⚠️  {status['slow_pages']} pages au-delà de {SLOW_PAGE_MS:.0f} ms de rendu")
+    for page in status['slowest'][:5]:
+        lines.append(f"  🐢 {page['render_ms']:.0f} ms  {page['url']}")
+    return "\n".join(lines)
+
+
+def serve(host: str, port: int, status_file: str = STATUS_FILE):
+    """GET /status : résumé JSON du crawl, lu à chaque requête"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = read_status(status_file)
+            if self.path != "/status":
+                code, data = 404, {"error": f"Route inconnue: {self.path}"}
+            elif status is None:
+                code, data = 404, {"error": f"Aucun crawl enregistré dans {status_file}"}
+            else:
+                code, data = 200, status
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    print(f"✓ Progression du crawl sur http://{host}:{port}/status")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Progression des crawls (télémétrie structurée)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    status_parser = subparsers.add_parser("status", help="Résumé lisible du crawl en cours ou du dernier")
+    status_parser.add_argument("--json", action="store_true", help="Résumé brut (JSON)")
+    serve_parser = subparsers.add_parser("serve", help="Exposer GET /status en local")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port)
+    else:
+        current = read_status()
+        if current is None:
+            print(f"❌ Aucun crawl enregistré ({STATUS_FILE})")
+            exit(1)
+        print(json.dumps(current, ensure_ascii=False, indent=2) if args.json else format_status(current))
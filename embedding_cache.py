@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cache des embeddings de requêtes (LRU borné + persistance optionnelle)
+Évite de ré-interroger l'API d'embeddings pour les requêtes déjà vues
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_FILE = "data/embedding_cache.json"
+DEFAULT_MAX_ENTRIES = 2048
+
+
+def normalize_query(query: str) -> str:
+    """Normalise une requête : NFC, minuscules, espaces compactés"""
+    query = unicodedata.normalize("NFC", query)
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    Cache LRU requête normalisée -> embedding
+
+    Args:
+        max_entries: Nombre maximum d'embeddings gardés en mémoire
+        path: Fichier JSON de persistance (None pour rester en mémoire)
+        model: Nom du modèle d'embeddings ; un fichier d'un autre modèle est ignoré
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: str = None, model: str = ""):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Premier chargement et écritures sérialisés (load() et put() prennent _lock)
+        self._load_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # Fichier lu au premier accès : rien à parser pour un processus sans recherche vectorielle
+        self._loaded = self.path is None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            # Un autre thread a pu charger le fichier pendant l'attente du verrou
+            if not self._loaded:
+                if self.path.exists():
+                    self.load()
+                self._loaded = True
+
+    def get(self, query: str):
+        key = normalize_query(query)
+        self._ensure_loaded()
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector):
+        key = normalize_query(query)
+        self._ensure_loaded()
+        with self._lock:
+            self._entries[key] = list(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def load(self):
+        """Recharge le cache depuis le disque (entrées les plus récentes en dernier)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get("model") != self.model:
+            return
+
+        with self._lock:
+            for key, vector in data.get("entries", [])[-self.max_entries:]:
+                self._entries[key] = vector
+
+    def save(self):
+        """
+        Écrit le cache sur disque (écriture atomique), seulement s'il a changé
+
+        Les écritures d'un même processus se suivent (un instantané plus ancien
+        ne peut pas remplacer un plus récent) ; le fichier temporaire est propre
+        au processus et au thread. En cas d'échec, le cache reste à écrire.
+        """
+        if not self.path or not self._dirty:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return  # déjà écrit par un autre thread
+                data = {"model": self.model, "entries": list(self._entries.items())}
+                self._dirty = False
+
+            tmp_path = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                raise
+
+
+class CachedEmbeddings:
+    """
+    Enveloppe des embeddings LangChain : embed_query passe par le cache
+
+    Les embeddings de documents (indexation) ne sont pas mis en cache.
+    """
+
+    def __init__(self, embeddings, cache: QueryEmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_query(self, text: str):
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
+
+    def embed_queries(self, texts):
+        """
+        Embeddings de plusieurs requêtes : les absentes du cache sont
+        embeddées ensemble, en un seul appel au fournisseur
+        """
+        vectors = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                self.cache.put(texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+
+def cache_from_env(model: str) -> QueryEmbeddingCache:
+    """Construit le cache depuis DECLIC_EMBED_CACHE_SIZE / DECLIC_EMBED_CACHE_FILE"""
+    max_entries = int(os.getenv("DECLIC_EMBED_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    path = os.getenv("DECLIC_EMBED_CACHE_FILE", DEFAULT_CACHE_FILE) or None
+    return QueryEmbeddingCache(max_entries=max_entries, path=path, model=model)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Pipeline d'embeddings par lots pour la construction de l'index RAG
+Lots de taille configurable, requêtes concurrentes bornées, limitation de
+débit (token bucket), retries avec backoff et reprise après interruption
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+class TokenBucket:
+    """
+    Limiteur de débit : `rate` jetons par seconde, au plus `capacity` en réserve
+
+    Un lot consomme autant de jetons que de tokens estimés dans ses textes,
+    ce qui suit les limites "tokens par minute" des API d'embeddings.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        """Bloque jusqu'à ce que `amount` jetons soient disponibles"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_s = (amount - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+
+def estimate_tokens(texts) -> int:
+    """Estimation grossière (≈ 4 caractères par token) pour le token bucket"""
+    return sum(max(1, len(text) // 4) for text in texts)
+
+
+class BatchCheckpoint:
+    """
+    Journal JSONL des lots terminés : une ligne par lot avec ses vecteurs
+
+    Le journal est lié à une empreinte des textes : les lignes d'une autre
+    empreinte (run interrompu sur d'autres textes) sont retirées au chargement.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """
+        Retourne {indice de lot: vecteurs} pour les lots déjà terminés
+
+        Le journal est réécrit sans les lignes étrangères ou tronquées, pour que
+        les lots enregistrés ensuite restent lisibles à la reprise suivante.
+        """
+        completed = {}
+        if not self.path.exists():
+            return completed
+
+        kept = []
+        stale = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Ligne tronquée par une interruption
+                    stale = True
+                    continue
+                if entry.get('fingerprint') != self.fingerprint:
+                    stale = True
+                    continue
+                completed[entry['batch']] = entry['vectors']
+                kept.append(line if line.endswith('\n') else line + '\n')
+
+        if stale:
+            with self._lock:
+                if kept:
+                    tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.writelines(kept)
+                    os.replace(tmp_path, self.path)
+                else:
+                    self.path.unlink()
+        return completed
+
+    def record(self, batch_index: int, vectors):
+        line = json.dumps({'fingerprint': self.fingerprint, 'batch': batch_index, 'vectors': vectors})
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+class EmbeddingPipeline:
+    """
+    Étape d'embedding explicite pour l'indexation
+
+    Args:
+        provider: Objet exposant embed_documents(texts) -> list[list[float]]
+        batch_size: Nombre de textes par requête
+        max_in_flight: Nombre maximum de requêtes simultanées
+        tokens_per_second: Débit autorisé (None = illimité)
+        max_retries: Tentatives supplémentaires par lot
+        backoff_base: Délai initial du backoff exponentiel (secondes)
+        checkpoint_path: Journal des lots terminés pour la reprise (None = désactivé)
+        namespace: Identifiant du fournisseur, inclus dans l'empreinte du checkpoint
+    """
+
+    def __init__(
+        self,
+        provider,
+        batch_size: int = 64,
+        max_in_flight: int = 4,
+        tokens_per_second: float = None,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        checkpoint_path: str = None,
+        namespace: str = "",
+    ):
+        self.provider = provider
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(tokens_per_second) if tokens_per_second else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.checkpoint_path = checkpoint_path
+        self.namespace = namespace
+        self.stats = {'batches': 0, 'resumed_batches': 0, 'retries': 0}
+        self._stats_lock = threading.Lock()
+
+    def embed(self, texts) -> list:
+        """Embedde tous les textes et retourne les vecteurs dans le même ordre"""
+        texts = list(texts)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        self.stats = {'batches': len(batches), 'resumed_batches': 0, 'retries': 0}
+
+        checkpoint = None
+        results = {}
+        if self.checkpoint_path:
+            checkpoint = BatchCheckpoint(self.checkpoint_path, self._fingerprint(texts, self.namespace))
+            results = checkpoint.load()
+            self.stats['resumed_batches'] = len(results)
+
+        pending = [i for i in range(len(batches)) if i not in results]
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            in_flight = {}
+            while pending or in_flight:
+                # Ne garder que max_in_flight lots en vol à la fois
+                while pending and len(in_flight) < self.max_in_flight:
+                    index = pending.pop(0)
+                    future = executor.submit(self._embed_batch, batches[index])
+                    in_flight[future] = index
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    # Une exception après tous les retries interrompt le pipeline :
+                    # les lots déjà terminés restent dans le checkpoint
+                    vectors = future.result()
+                    results[index] = vectors
+                    if checkpoint:
+                        checkpoint.record(index, vectors)
+
+        if checkpoint:
+            checkpoint.clear()
+
+        return [vector for i in range(len(batches)) for vector in results[i]]
+
+    def _embed_batch(self, batch):
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                self.bucket.acquire(estimate_tokens(batch))
+            try:
+                vectors = self.provider.embed_documents(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"{len(vectors)} vecteurs reçus pour {len(batch)} textes")
+                return [list(vector) for vector in vectors]
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                # Lots embeddés en parallèle par les threads du pool
+                with self._stats_lock:
+                    self.stats['retries'] += 1
+                # Backoff exponentiel avec jitter
+                time.sleep(self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    @staticmethod
+    def _fingerprint(texts, namespace: str = "") -> str:
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        for text in texts:
+            digest.update(text.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+
+class FakeEmbeddingProvider:
+    """
+    Fournisseur d'embeddings local et déterministe, sans réseau
+
+    Sert à exercer le pipeline hors ligne ; `failure_rate` simule des erreurs
+    transitoires de l'API.
+    """
+
+    def __init__(self, dimension: int = 32, failure_rate: float = 0.0, latency_s: float = 0.0, seed: int = 0):
+        self.dimension = dimension
+        self.failure_rate = failure_rate
+        self.latency_s = latency_s
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if fail:
+            raise ConnectionError("Erreur transitoire simulée")
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+    def _vector(self, text):
+        seed = hashlib.sha256(text.encode('utf-8')).digest()
+        values = [(seed[i % len(seed)] - 127.5) / 127.5 for i in range(self.dimension)]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+
+def pipeline_from_env(provider, checkpoint_path: str = None, namespace: str = "") -> EmbeddingPipeline:
+    """Construit le pipeline depuis les variables DECLIC_EMBED_* (voir README)"""
+    tokens_per_second = os.getenv("DECLIC_EMBED_TOKENS_PER_S")
+    return EmbeddingPipeline(
+        provider,
+        batch_size=int(os.getenv("DECLIC_EMBED_BATCH_SIZE", "64")),
+        max_in_flight=int(os.getenv("DECLIC_EMBED_MAX_IN_FLIGHT", "4")),
+        tokens_per_second=float(tokens_per_second) if tokens_per_second else None,
+        max_retries=int(os.getenv("DECLIC_EMBED_MAX_RETRIES", "5")),
+        checkpoint_path=checkpoint_path,
+        namespace=namespace,
+    )
+
+
+if __name__ == "__main__":
+    # Démonstration hors ligne avec le fournisseur factice : la graine 1 fait
+    # échouer plusieurs appels dès les premiers lots (retries et backoff exercés).
+    # Journal propre à la démo : celui de setup_rag.py (reprise d'une indexation
+    # interrompue) n'est jamais effacé par elle
+    sample = [f"Métier de test numéro {i}" for i in range(500)]
+    provider = FakeEmbeddingProvider(failure_rate=0.3, latency_s=0.01, seed=1)
+    pipeline = EmbeddingPipeline(
+        provider,
+        batch_size=32,
+        max_in_flight=4,
+        tokens_per_second=20000,
+        backoff_base=0.01,
+        checkpoint_path="data/embedding_demo_checkpoint.jsonl",
+    )
+
+    start = time.perf_counter()
+    vectors = pipeline.embed(sample)
+    elapsed = time.perf_counter() - start
+
+    expected = [provider.embed_query(text) for text in sample]
+    print(f"✓ {len(vectors)} vecteurs en {elapsed:.2f}s ({pipeline.stats})")
+    print(f"✓ Ordre conservé: {vectors == expected}")
+    if pipeline.stats['retries'] == 0:
+        print("❌ La démonstration n'a exercé aucun retry")
+        exit(1)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Fournisseurs d'embeddings interchangeables pour la RAG DÉCLIC
+
+- openai                : text-embedding-3-small via l'API OpenAI (défaut)
+- sentence-transformers : modèle local sur CPU (paraphrase-multilingual-MiniLM-L12-v2)
+- hashing               : TF haché signé, sans modèle ni réseau
+
+Le fournisseur utilisé pour construire l'index est enregistré dans son manifeste
+(clé "embedding") : search_jobs.py embedde les requêtes avec le même.
+Les requêtes OpenAI passent par un appel HTTP direct (démarrage à froid de la
+CLI) ; l'indexation garde langchain_openai.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+
+PROVIDERS = ("openai", "sentence-transformers", "hashing")
+
+DEFAULT_MODELS = {
+    "openai": "text-embedding-3-small",
+    "sentence-transformers": "paraphrase-multilingual-MiniLM-L12-v2",
+    "hashing": "512",
+}
+
+
+class HashingEmbeddings:
+    """
+    Embeddings locaux par hachage de caractéristiques (mots + trigrammes de caractères)
+
+    Chaque caractéristique est projetée sur une dimension (hachage) avec un signe
+    pseudo-aléatoire ; le vecteur est ensuite normalisé. Déterministe, sans dépendance.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def _features(self, text):
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        for word in re.findall(r"\w+", text):
+            yield word
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3]
+
+    def _embed(self, text):
+        vector = [0.0] * self.dimension
+        for feature in self._features(text):
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[h % self.dimension] += 1.0 if (h >> 63) & 1 else -1.0
+
+        # TF sous-linéaire puis normalisation L2
+        vector = [math.copysign(math.log1p(abs(v)), v) for v in vector]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+class SentenceTransformerEmbeddings:
+    """Embeddings locaux sur CPU avec sentence-transformers"""
+
+    def __init__(self, model: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("sentence-transformers manquant: pip install sentence-transformers")
+
+        self.model = SentenceTransformer(model, device="cpu")
+
+    def embed_documents(self, texts):
+        vectors = self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class OpenAIQueryEmbeddings:
+    """
+    Embeddings OpenAI des requêtes par un POST /embeddings (urllib), sans LangChain ni SDK
+
+    Textes courts uniquement : pas de découpage selon le contexte du modèle,
+    contrairement à langchain_openai utilisé pour indexer les documents.
+    """
+
+    def __init__(self, model: str, api_key: str = None, base_url: str = None, timeout: float = 30.0):
+        self.model = model
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE")
+                         or "https://api.openai.com/v1").rstrip("/")
+        self.timeout = timeout
+
+    def embed_documents(self, texts):
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(
+            f"{self.base_url}/embeddings",
+            data=json.dumps({"model": self.model, "input": list(texts)}).encode("utf-8"),
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.load(response)["data"]
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"API OpenAI (embeddings): HTTP {e.code} {e.read().decode('utf-8', 'replace')[:200]}")
+        return [item["embedding"] for item in sorted(data, key=lambda item: item["index"])]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def embedding_spec(provider: str = None, model: str = None) -> dict:
+    """Spécification d'un fournisseur, telle qu'enregistrée dans le manifeste d'index"""
+    provider = provider or os.getenv("DECLIC_EMBEDDINGS", "openai")
+    if provider not in PROVIDERS:
+        raise ValueError(f"Fournisseur d'embeddings inconnu: {provider} (choix: {', '.join(PROVIDERS)})")
+    return {"provider": provider, "model": model or DEFAULT_MODELS[provider]}
+
+
+def spec_from_manifest(manifest: dict) -> dict:
+    """Fournisseur enregistré dans le manifeste (OpenAI pour les index antérieurs)"""
+    manifest = manifest or {}
+    if "embedding" in manifest:
+        return manifest["embedding"]
+    return {"provider": "openai", "model": manifest.get("embedding_model", DEFAULT_MODELS["openai"])}
+
+
+def spec_id(spec: dict) -> str:
+    """Identifiant court, ex. 'openai/text-embedding-3-small'"""
+    return f"{spec['provider']}/{spec['model']}"
+
+
+def requires_api_key(spec: dict) -> bool:
+    return spec["provider"] == "openai"
+
+
+def get_embeddings(spec: dict, api_key: str = None, queries_only: bool = False):
+    """
+    Instancie le fournisseur (interface embed_documents / embed_query)
+
+    queries_only : embeddings de requêtes courtes (recherche), OpenAI sans LangChain
+    """
+    provider, model = spec["provider"], spec["model"]
+
+    if provider == "openai" and queries_only:
+        return OpenAIQueryEmbeddings(model, api_key=api_key)
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=model, openai_api_key=api_key)
+    if provider == "sentence-transformers":
+        return SentenceTransformerEmbeddings(model)
+    if provider == "hashing":
+        return HashingEmbeddings(dimension=int(model))
+
+    raise ValueError(f"Fournisseur d'embeddings inconnu: {provider}")
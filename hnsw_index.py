@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Index approché HNSW (hnswlib) à côté de l'index NumPy, pour les grands catalogues
+
+    data/vector_index/hnsw.bin           graphe HNSW (produit scalaire, vecteurs normalisés)
+    data/vector_index/hnsw_labels.json   paramètres, id de chunk -> label du graphe
+
+Les labels sont stables d'une construction à l'autre : une mise à jour
+incrémentale marque supprimés les chunks disparus ou modifiés et insère les
+nouveaux, sans reconstruire le graphe ; setup_rag.py le reconstruit quand la
+part de nœuds supprimés dépasse HNSW_MAX_DELETED_FRACTION. À la lecture, les labels sont
+rattachés aux lignes de l'index NumPy par id de chunk ; un graphe qui ne
+couvre pas tous les chunks est ignoré (recherche exacte).
+
+hnswlib est optionnel : sans lui, search_jobs.py garde la recherche exacte.
+
+Usage:
+    python hnsw_index.py [--queries 200] [--k 10]   recall@k et latence face au scan exact
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from vector_index import VECTOR_INDEX_DIR, VectorIndex, normalize_rows
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+HNSW_FILE = "hnsw.bin"
+HNSW_LABELS_FILE = "hnsw_labels.json"
+
+# Paramètres du graphe : M voisins par nœud, largeur de recherche à la construction / à la requête
+# (ef fixé au chargement ; hnswlib cherche avec max(ef, k), k étant le nombre de voisins demandés)
+HNSW_M = int(os.getenv("DECLIC_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("DECLIC_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF = int(os.getenv("DECLIC_HNSW_EF", "64"))
+
+# Part de nœuds marqués supprimés (mises à jour incrémentales) au-delà de laquelle
+# setup_rag.py reconstruit le graphe
+HNSW_MAX_DELETED_FRACTION = float(os.getenv("DECLIC_HNSW_MAX_DELETED_FRACTION", "0.2"))
+
+# Chunks demandés au graphe par métier recherché (doublé tant qu'il en manque)
+CHUNKS_PER_JOB_ESTIMATE = 3
+
+# Sous cette part de lignes admissibles (filtres), le scan exact des lignes est plus rapide
+BRUTE_FORCE_FRACTION = 0.05
+
+
+class HNSWIndex:
+    """
+    Graphe HNSW et correspondance id de chunk -> label
+
+    Attributes:
+        graph: hnswlib.Index (espace "ip" sur vecteurs normalisés : distance = 1 - cosinus)
+        labels: {id de chunk: label}
+        next_label: Prochain label libre (les labels supprimés ne sont pas réutilisés)
+    """
+
+    def __init__(self, graph, labels: dict, next_label: int, embedding: dict = None):
+        self.graph = graph
+        self.labels = labels
+        self.next_label = next_label
+        self.embedding = embedding
+        self._rows = None
+        self._row_jobs = None
+
+    @classmethod
+    def build(cls, ids, vectors, embedding: dict = None, m: int = HNSW_M,
+              ef_construction: int = HNSW_EF_CONSTRUCTION):
+        """Construit le graphe de tous les chunks"""
+        matrix = normalize_rows(vectors)
+        graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        graph.init_index(max_elements=max(len(ids), 1), ef_construction=ef_construction, M=m)
+        if len(ids):
+            graph.add_items(matrix, np.arange(len(ids)))
+        graph.set_ef(HNSW_EF)
+        return cls(graph, {chunk_id: label for label, chunk_id in enumerate(ids)}, len(ids), embedding)
+
+    @classmethod
+    def load(cls, index_dir: str = VECTOR_INDEX_DIR):
+        """Graphe enregistré, None s'il est absent ou si hnswlib n'est pas installé"""
+        root = Path(index_dir)
+        if hnswlib is None or not (root / HNSW_FILE).exists() or not (root / HNSW_LABELS_FILE).exists():
+            return None
+
+        with open(root / HNSW_LABELS_FILE, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        graph = hnswlib.Index(space="ip", dim=sidecar['dimension'])
+        graph.load_index(str(root / HNSW_FILE), max_elements=sidecar['max_elements'])
+        graph.set_ef(HNSW_EF)
+        return cls(graph, sidecar['labels'], sidecar['next_label'], sidecar.get('embedding'))
+
+    def save(self, index_dir: str = VECTOR_INDEX_DIR):
+        root = Path(index_dir)
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Le graphe d'abord : un lecteur ne voit jamais des labels plus récents que lui
+        tmp_graph = root / f"{HNSW_FILE}.{os.getpid()}.tmp"
+        self.graph.save_index(str(tmp_graph))
+        os.replace(tmp_graph, root / HNSW_FILE)
+
+        tmp_labels = root / f"{HNSW_LABELS_FILE}.{os.getpid()}.tmp"
+        with open(tmp_labels, 'w', encoding='utf-8') as f:
+            json.dump({
+                'embedding': self.embedding,
+                'dimension': self.graph.dim,
+                'max_elements': self.graph.get_max_elements(),
+                'params': {'M': self.graph.M, 'ef_construction': self.graph.ef_construction},
+                'next_label': self.next_label,
+                'labels': self.labels,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_labels, root / HNSW_LABELS_FILE)
+
+    def update(self, upserts: dict, deletes=()):
+        """
+        Mise à jour incrémentale du graphe
+
+        Args:
+            upserts: {id de chunk: vecteur} nouveaux ou ré-embeddés
+            deletes: ids de chunks disparus ou remplacés
+        """
+        for chunk_id in list(deletes) + [chunk_id for chunk_id in upserts if chunk_id in self.labels]:
+            label = self.labels.pop(chunk_id, None)
+            if label is not None:
+                self.graph.mark_deleted(label)
+
+        if upserts:
+            ids = list(upserts)
+            labels = np.arange(self.next_label, self.next_label + len(ids))
+            needed = self.graph.get_current_count() + len(ids)
+            if needed > self.graph.get_max_elements():
+                self.graph.resize_index(max(needed, 2 * self.graph.get_max_elements()))
+            self.graph.add_items(normalize_rows([upserts[chunk_id] for chunk_id in ids]), labels)
+            self.labels.update(zip(ids, labels.tolist()))
+            self.next_label += len(ids)
+        self._rows = None
+
+    def deleted_fraction(self) -> float:
+        """Part des nœuds du graphe marqués supprimés (toujours parcourus par la recherche)"""
+        total = self.graph.get_current_count()
+        return (total - len(self.labels)) / total if total else 0.0
+
+    def covers(self, index: VectorIndex) -> bool:
+        """True si le graphe contient exactement les chunks de l'index NumPy"""
+        return (len(self.labels) == len(index)
+                and all(chunk['id'] in self.labels for chunk in index.chunks)
+                and self.graph.dim == index.full_dimension)
+
+    def _mappings(self, index: VectorIndex) -> tuple:
+        """(label -> ligne de l'index, -1 si supprimé ; ligne -> indice du métier)"""
+        if self._rows is None:
+            rows = np.full(self.next_label, -1, dtype=np.int64)
+            for row, chunk in enumerate(index.chunks):
+                rows[self.labels[chunk['id']]] = row
+            row_jobs = np.empty(len(index), dtype=np.int64)
+            for job, chunk_rows in enumerate(index.job_rows().values()):
+                row_jobs[chunk_rows] = job
+            self._rows, self._row_jobs = rows, row_jobs
+        return self._rows, self._row_jobs
+
+    def search_jobs_many(self, index: VectorIndex, query_vectors, n_jobs: int = 5, rows: np.ndarray = None,
+                         aggregate: str = "max", top_chunks: int = 2) -> list:
+        """
+        Les n_jobs meilleurs métiers distincts par requête (même contrat que
+        VectorIndex.search_jobs_many), à partir des plus proches voisins du graphe
+
+        Les chunks hors filtres sont écartés après coup ; un filtre très sélectif
+        passe par le scan exact de ses lignes. "sum_top" passe aussi par le scan
+        exact : le graphe ne remonte pas forcément tous les meilleurs chunks d'un
+        métier, dont le score serait alors sous-estimé.
+        """
+        n_queries = len(query_vectors)
+        if len(index) == 0 or n_jobs <= 0 or n_queries == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(n_queries)]
+        if aggregate == "sum_top" or (rows is not None and len(rows) < BRUTE_FORCE_FRACTION * len(index)):
+            return index.search_jobs_many(query_vectors, n_jobs, rows, aggregate, top_chunks)
+
+        label_rows, row_jobs = self._mappings(index)
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(len(index), dtype=bool)
+            allowed[rows] = True
+
+        queries = normalize_rows(query_vectors)
+        fraction = 1.0 if rows is None else len(rows) / len(index)
+        fetch = int(n_jobs * CHUNKS_PER_JOB_ESTIMATE / fraction)
+
+        results = [None] * n_queries
+        pending = list(range(n_queries))
+        while pending:
+            fetch = min(fetch, len(index))
+            # ef n'est jamais modifié après le chargement : les threads de search_server.py
+            # interrogent le graphe en parallèle, et la largeur suit k=fetch
+            labels, distances = self.graph.knn_query(queries[pending], k=fetch)
+
+            still_pending = []
+            for i, query_labels, query_distances in zip(pending, labels, distances):
+                hit_rows = label_rows[query_labels.astype(np.int64)]
+                keep = hit_rows >= 0
+                if allowed is not None:
+                    keep &= allowed[np.where(keep, hit_rows, 0)]
+                results[i] = _aggregate_hits(hit_rows[keep], 1.0 - query_distances[keep], row_jobs, n_jobs)
+                if len(results[i]) < n_jobs and fetch < len(index):
+                    still_pending.append(i)
+            pending = still_pending
+            fetch *= 2
+
+        return results
+
+
+def _aggregate_hits(hit_rows: np.ndarray, scores: np.ndarray, row_jobs: np.ndarray, n_jobs: int) -> list:
+    """[(ligne du meilleur chunk, score du métier)] depuis des chunks triés par score décroissant"""
+    best = {}
+    for row, score in zip(hit_rows.tolist(), scores.tolist()):
+        best.setdefault(int(row_jobs[row]), (row, float(score)))
+
+    aggregated = sorted(best.values(), key=lambda item: -item[1])
+    return aggregated[:n_jobs]
+
+
+def remove_hnsw_index(index_dir: str = VECTOR_INDEX_DIR):
+    """Supprime le graphe (index reconstruit sans HNSW)"""
+    for name in (HNSW_LABELS_FILE, HNSW_FILE):
+        path = Path(index_dir) / name
+        if path.exists():
+            path.unlink()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Recall et latence du graphe HNSW face au scan exact")
+    parser.add_argument("--index-dir", default=VECTOR_INDEX_DIR)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if hnswlib is None:
+        print("❌ hnswlib manquant: pip install hnswlib")
+        exit(1)
+
+    index = VectorIndex.load(args.index_dir)
+    ann = HNSWIndex.load(args.index_dir)
+    if index is None or ann is None or not ann.covers(index):
+        print(f"❌ Index NumPy + HNSW introuvable ou incohérent dans {args.index_dir}. "
+              f"Lancez setup_rag.py --ann hnsw d'abord.")
+        exit(1)
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(index), size=min(args.queries, len(index)), replace=False)
+    full = index.full_vectors if index.full_vectors is not None else index.vectors
+    queries = normalize_rows(np.asarray(full[sample], dtype=np.float32)
+                             + rng.normal(0.0, 0.05, size=(len(sample), full.shape[1])))
+
+    timings = {'exact': [], 'hnsw': []}
+    recalls = []
+    for query in queries:
+        start = time.perf_counter()
+        exact = index.search_jobs_many([query], args.k)[0]
+        timings['exact'].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        approx = ann.search_jobs_many(index, [query], args.k)[0]
+        timings['hnsw'].append((time.perf_counter() - start) * 1000)
+        recalls.append(len({row for row, _ in exact} & {row for row, _ in approx}) / max(len(exact), 1))
+
+    print(f"📊 {len(index)} chunks, M={ann.graph.M}, ef={HNSW_EF}, {len(queries)} requêtes simulées")
+    print(f"   Scan exact : p50 {np.percentile(timings['exact'], 50):.3f} ms")
+    print(f"   HNSW       : p50 {np.percentile(timings['hnsw'], 50):.3f} ms, recall@{args.k} {np.mean(recalls):.3f}")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Budget de démarrage à froid de search_jobs.py (CLI, cron, repli de l'API Next.js)
+
+    imports   python -X importtime -c "import search_jobs" : durée cumulée de
+              l'import du module ; NumPy, hnswlib, LangChain, ChromaDB et le
+              client OpenAI ne doivent pas en faire partie
+    requête   python search_jobs.py <requête> : durée de bout en bout (médiane
+              de --runs lancements), modules importés relevés avec -X importtime ;
+              quand l'index NumPy répond, ni LangChain ni ChromaDB
+    usage     python search_jobs.py sans argument : erreur d'usage renvoyée
+              avant tout import d'un module du projet
+
+Code de sortie 1 si un budget est dépassé ou si un module interdit est importé :
+à lancer après setup_rag.py, depuis la racine du projet comme search_jobs.py
+(cron, CI). Les budgets se règlent avec DECLIC_IMPORT_BUDGET_MS et
+DECLIC_QUERY_BUDGET_MS.
+
+Usage:
+    python import_budget.py [--query "infirmier"] [--n-results 5] [--mode vector] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SEARCH_SCRIPT = SCRIPT_DIR / "search_jobs.py"
+
+IMPORT_BUDGET_MS = float(os.getenv("DECLIC_IMPORT_BUDGET_MS", "80"))
+QUERY_BUDGET_MS = float(os.getenv("DECLIC_QUERY_BUDGET_MS", "200"))
+
+# Chargés à la première recherche qui en a besoin, jamais à l'import
+LAZY_PACKAGES = ("numpy", "hnswlib", "langchain", "langchain_core", "langchain_openai", "langchain_community",
+                 "chromadb", "openai", "sentence_transformers")
+# Inutiles pour répondre depuis l'index NumPy (ou BM25)
+LANGCHAIN_PACKAGES = ("langchain", "langchain_core", "langchain_openai", "langchain_community", "chromadb", "openai")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Lignes de python -X importtime
+
+    Returns:
+        list: [{module, self_us, cumulative_us, depth}], dans l'ordre de fin d'import
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # en-tête
+        name = fields[2].rstrip()
+        imports.append({
+            'module': name.strip(),
+            'self_us': int(fields[0]),
+            'cumulative_us': int(fields[1]),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+        })
+    return imports
+
+
+def imported_packages(imports: list, packages: tuple) -> list:
+    """Paquets de la liste dont au moins un module a été importé"""
+    found = {entry['module'].split('.')[0] for entry in imports}
+    return sorted(found & set(packages))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(SCRIPT_DIR), env.get('PYTHONPATH')]))
+    return env
+
+
+def measure_imports() -> dict:
+    """Durée cumulée de "import search_jobs" et modules lourds importés au passage"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import search_jobs"],
+                          capture_output=True, text=True, env=_env())
+    if proc.returncode != 0:
+        raise RuntimeError(f"import search_jobs a échoué:\n{proc.stderr[-2000:]}")
+    imports = parse_importtime(proc.stderr)
+    module = next((entry for entry in imports if entry['module'] == 'search_jobs'), None)
+    children = [entry for entry in imports if entry['depth'] == 1]
+    return {
+        'imports_ms': module['cumulative_us'] / 1000 if module else 0.0,
+        'heaviest': sorted(children, key=lambda entry: -entry['cumulative_us'])[:5],
+        'lazy_imported': imported_packages(imports, LAZY_PACKAGES),
+    }
+
+
+def measure_usage() -> dict:
+    """Erreur d'usage de la CLI : durée et modules du projet importés pour la produire"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", str(SEARCH_SCRIPT)],
+                          capture_output=True, text=True, env=_env())
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    project_modules = tuple(path.stem for path in SCRIPT_DIR.glob("*.py"))
+    return {
+        'usage_ms': elapsed_ms,
+        'ok': proc.returncode == 1 and '"error"' in proc.stdout,
+        'project_imported': imported_packages(parse_importtime(proc.stderr), project_modules),
+    }
+
+
+def measure_query(query: str, n_results: int = 5, mode: str = "vector", runs: int = 5) -> dict:
+    """Durée médiane d'un appel CLI complet et modules importés pour y répondre"""
+    command = [str(SEARCH_SCRIPT), query, str(n_results), mode]
+
+    # Premier lancement sous -X importtime : liste des modules (et premier cache disque)
+    proc = subprocess.run([sys.executable, "-X", "importtime", *command], capture_output=True, text=True, env=_env())
+    if proc.returncode != 0 or '"error"' in proc.stdout[:200]:
+        raise RuntimeError(f"search_jobs.py a échoué:\n{(proc.stdout or proc.stderr)[-2000:]}")
+    imports = parse_importtime(proc.stderr)
+
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *command], capture_output=True, env=_env(), check=True)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'query_ms': statistics.median(durations),
+        'min_ms': min(durations),
+        'langchain_imported': imported_packages(imports, LANGCHAIN_PACKAGES),
+        'modules': len(imports),
+    }
+
+
+def numpy_index_answers(mode: str) -> bool:
+    """True si search_jobs.py répond sans ChromaDB (mode lexical ou index NumPy présent)"""
+    import search_jobs
+    return mode == "lexical" or search_jobs.use_vector_index()
+
+
+def check_budget(query: str, n_results: int, mode: str, runs: int,
+                 import_budget_ms: float = IMPORT_BUDGET_MS, query_budget_ms: float = QUERY_BUDGET_MS) -> list:
+    """Affiche les mesures ; retourne la liste des budgets dépassés (vide si tout passe)"""
+    failures = []
+
+    imports = measure_imports()
+    print(f"📦 import search_jobs: {imports['imports_ms']:.1f} ms (budget {import_budget_ms:.0f} ms)")
+    for entry in imports['heaviest']:
+        print(f"   {entry['cumulative_us'] / 1000:7.1f} ms  {entry['module']}")
+    if imports['imports_ms'] > import_budget_ms:
+        failures.append(f"imports: {imports['imports_ms']:.1f} ms > {import_budget_ms:.0f} ms")
+    if imports['lazy_imported']:
+        failures.append(f"importés au chargement: {', '.join(imports['lazy_imported'])}")
+
+    usage = measure_usage()
+    print(f"🚪 erreur d'usage: {usage['usage_ms']:.1f} ms (sous -X importtime)")
+    if not usage['ok']:
+        failures.append("search_jobs.py sans argument ne renvoie pas d'erreur d'usage")
+    if usage['project_imported']:
+        failures.append(f"importés pour l'erreur d'usage: {', '.join(usage['project_imported'])}")
+
+    result = measure_query(query, n_results, mode, runs)
+    print(f"⏱️  search_jobs.py {query!r} {n_results} {mode}: médiane {result['query_ms']:.1f} ms, "
+          f"min {result['min_ms']:.1f} ms sur {runs} lancements (budget {query_budget_ms:.0f} ms), "
+          f"{result['modules']} modules importés")
+    if result['query_ms'] > query_budget_ms:
+        failures.append(f"requête: {result['query_ms']:.1f} ms > {query_budget_ms:.0f} ms")
+    if result['langchain_imported'] and numpy_index_answers(mode):
+        failures.append(f"importés pour répondre depuis l'index: {', '.join(result['langchain_imported'])}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vérifie le budget de démarrage à froid de search_jobs.py")
+    parser.add_argument("--query", default="infirmier", help="Requête de la mesure de bout en bout")
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--mode", default="vector", choices=("vector", "lexical", "hybrid"))
+    parser.add_argument("--runs", type=int, default=5, help="Lancements mesurés (médiane)")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Budget de l'import de search_jobs (défaut: DECLIC_IMPORT_BUDGET_MS ou 80)")
+    parser.add_argument("--query-budget-ms", type=float, default=QUERY_BUDGET_MS,
+                        help="Budget d'une requête CLI de bout en bout (défaut: DECLIC_QUERY_BUDGET_MS ou 200)")
+    args = parser.parse_args()
+
+    failures = check_budget(args.query, args.n_results, args.mode, args.runs,
+                            args.import_budget_ms, args.query_budget_ms)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Budget de démarrage respecté")
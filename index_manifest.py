@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Manifeste de l'index RAG (data/chroma_db/index_manifest.json)
+Fournisseur d'embeddings utilisé, empreintes et ids de chunks par métier
+"""
+
+import json
+from pathlib import Path
+
+MANIFEST_FILE = "index_manifest.json"
+
+
+def load_manifest(index_dir: str):
+    """Charge le manifeste stocké avec la collection, None s'il est absent ou illisible"""
+    manifest_path = Path(index_dir) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_manifest(index_dir: str, manifest: dict):
+    manifest_path = Path(index_dir) / MANIFEST_FILE
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Pipeline d'ingestion multi-sources des fiches métiers
+
+    adaptateurs (un par source, en parallèle) ──> file ──> fusion (une seule tâche)
+
+Chaque adaptateur parcourt sa source avec le navigateur partagé, le cache de
+pages et le budget de politesse par hôte, et émet des métiers normalisés au fil
+de l'eau. La fusion rapproche les doublons par slug ou par titre normalisé
+("Infirmier F/H" et "Infirmier / Infirmière" donnent le même métier) : chaque
+champ vient de la source la plus prioritaire qui le renseigne, et la liste
+"sources" garde la provenance de la fiche. Les sources étant parcourues en
+parallèle, en ajouter une allonge la durée totale de sa propre durée au plus,
+pas de la somme des autres.
+"""
+
+import asyncio
+import re
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from apec_parser import make_soup, parse_job_details
+from crawl_scheduler import DEFAULT_WORKERS
+from lexical_index import FEMININE_SUFFIXES, fold_accents
+
+# Rang des priorités : un champ renseigné par une source plus prioritaire l'emporte
+PRIORITY_RANKS = {'high': 0, 'medium': 1, 'low': 2}
+
+# Champs d'identification, jamais fusionnés
+IDENTITY_FIELDS = ('title', 'slug', 'url', 'source', 'sources')
+
+# Métiers en attente de fusion (au-delà, les adaptateurs attendent)
+QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+def _drop_feminine(match) -> str:
+    """Forme masculine seule si le mot après la barre en est le féminin, sinon les deux mots"""
+    masculine, other = match.group(1), match.group(2)
+    # "cheffe", "agente" ; "conductrice", "technicienne", "infirmiere"
+    if other.startswith(masculine) or any(
+        other.endswith(suffix) and other[:-len(suffix)] + replacement == masculine
+        for suffix, replacement in FEMININE_SUFFIXES
+    ):
+        return masculine
+    return f"{masculine} {other}"
+
+
+def title_key(title: str) -> str:
+    """
+    Titre normalisé pour rapprocher les sources
+
+    "Infirmier / Infirmière F/H" -> "infirmier",
+    "Conducteur / Conductrice de travaux" -> "conducteur-de-travaux"
+    """
+    text = fold_accents(title or "")
+    text = re.sub(r"\(?\b[fh]\s*/\s*[fh]\b\)?", " ", text)
+    # Seule la forme féminine du mot qui précède la barre oblique est retirée
+    text = re.sub(r"(\w+)\s*/\s*(\w+)", _drop_feminine, text)
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+class IngestionContext:
+    """
+    Ressources partagées par les adaptateurs
+
+    Attributes:
+        crawler: AsyncWebCrawler ouvert (None hors ligne)
+        cache: PageCache (seul accès aux pages)
+        limiter: HostRateLimiter commun : une source ne ralentit que son propre hôte
+        telemetry: CrawlTelemetry (événements par URL, résumé live)
+        workers: Pages rendues en parallèle par adaptateur
+    """
+
+    def __init__(self, crawler, cache, limiter, telemetry, workers: int = DEFAULT_WORKERS):
+        self.crawler = crawler
+        self.cache = cache
+        self.limiter = limiter
+        self.telemetry = telemetry
+        self.workers = workers
+
+    async def fetch_page(self, url: str, **arun_kwargs):
+        return await self.cache.fetch(self.crawler, url, limiter=self.limiter, **arun_kwargs)
+
+    async def fetch_html(self, url: str, kind: str = 'page', **arun_kwargs) -> str:
+        """HTML d'une page, suivi par la télémétrie (l'analyse n'est pas chronométrée)"""
+        with self.telemetry.page(url, kind) as span:
+            page = await self.fetch_page(url, **arun_kwargs)
+            span.fetched(page)
+        return page.html or ""
+
+
+class SourceAdapter:
+    """
+    Source de fiches métiers
+
+    Une sous-classe définit name, url, priority et records(), un générateur
+    asynchrone de métiers au format de data/jobs/apec-jobs.json (title, slug
+    et url au minimum). Les pages en échec qui n'interrompent pas la source
+    sont signalées par page_failed() et comptées dans `errors`.
+    """
+
+    name = ""
+    url = ""
+    priority = "medium"
+    # Pages en échec du dernier parcours (remis à zéro par run_ingestion)
+    errors = 0
+
+    async def records(self, context: IngestionContext):
+        """Métiers de la source ; la source de base n'en émet aucun"""
+        return
+        yield
+
+    def page_failed(self, label: str, error: Exception):
+        """Page en échec (catégorie, fiche) : signalée, comptée, et le parcours continue"""
+        self.errors += 1
+        print(f"  ✗ {self.name} {label}: {str(error)[:80]}")
+
+    async def _map_pages(self, context: IngestionContext, items, worker):
+        """worker(item) sur les items, au plus context.workers en parallèle, résultats au fil de l'eau"""
+        slots = asyncio.Semaphore(max(1, context.workers))
+
+        async def bounded(item):
+            async with slots:
+                try:
+                    return item, await worker(item)
+                except Exception as e:
+                    return item, e
+
+        for task in asyncio.as_completed([bounded(item) for item in items]):
+            yield await task
+
+
+class StaticAdapter(SourceAdapter):
+    """Fiches déjà structurées (catalogue maintenu à la main)"""
+
+    def __init__(self, name: str, jobs: list, priority: str = "medium", url: str = ""):
+        self.name = name
+        self.jobs = jobs
+        self.priority = priority
+        self.url = url
+
+    async def records(self, context: IngestionContext):
+        for job in self.jobs:
+            yield dict(job)
+
+
+class ListingAdapter(SourceAdapter):
+    """
+    Page d'index d'une source : un métier par lien dont l'URL correspond à fiche_pattern
+
+    Sans parseur de fiche dédié, seuls le titre (texte du lien) et l'URL sont
+    émis ; la fusion les complète avec les sources plus riches.
+    """
+
+    def __init__(self, name: str, url: str, fiche_pattern: str, priority: str = "medium"):
+        self.name = name
+        self.url = url
+        self.fiche_pattern = re.compile(fiche_pattern)
+        self.priority = priority
+
+    async def records(self, context: IngestionContext):
+        soup = BeautifulSoup(await context.fetch_html(self.url, 'index', timeout=30000), 'html.parser')
+        seen = set()
+        for link in soup.find_all('a', href=True):
+            url = urljoin(self.url, link['href'])
+            title = link.get_text(" ", strip=True)
+            if not title or url in seen or not self.fiche_pattern.search(url):
+                continue
+            seen.add(url)
+            yield {
+                'title': title,
+                'slug': title_key(title),
+                'url': url,
+            }
+
+
+class ApecAdapter(SourceAdapter):
+    """Fiches APEC complètes : catégories, puis listes de métiers, puis fiches (parse_job_details)"""
+
+    name = "APEC"
+    url = "https://www.apec.fr/tous-nos-metiers.html"
+    priority = "high"
+
+    def __init__(self, parser_backend: str = 'html.parser'):
+        self.parser_backend = parser_backend
+
+    async def records(self, context: IngestionContext):
+        soup = BeautifulSoup(await context.fetch_html(self.url, 'index', wait_for='div.card-subtitle',
+                                                      timeout=30000), 'html.parser')
+        categories = []
+        for link in soup.find_all('a', href=True):
+            subtitle = link.find('div', class_='card-subtitle')
+            if link['href'].startswith('?t=') and subtitle:
+                categories.append({'name': subtitle.text.strip(),
+                                   'url': urljoin(self.url, '/tous-nos-metiers.html' + link['href'])})
+        context.telemetry.queued([category['url'] for category in categories], 'category')
+
+        async def fetch_category(category):
+            html = await context.fetch_html(category['url'], 'category', wait_for='div.card-subtitle', timeout=30000)
+            jobs = []
+            for link in BeautifulSoup(html, 'html.parser').find_all('a', href=True):
+                subtitle = link.find('div', class_='card-subtitle')
+                if subtitle and ('F/H' in subtitle.text or 'H/F' in subtitle.text):
+                    jobs.append({'title': subtitle.text.strip(), 'url': urljoin(self.url, link['href']),
+                                 'category': category['name']})
+            return jobs
+
+        fiches = {}
+        async for category, jobs in self._map_pages(context, categories, fetch_category):
+            if isinstance(jobs, Exception):
+                self.page_failed(f"catégorie {category['name']}", jobs)
+                continue
+            for job in jobs:
+                fiches.setdefault(job['url'], job)
+
+        context.telemetry.queued(list(fiches), 'fiche')
+
+        async def fetch_fiche(job_info):
+            with context.telemetry.page(job_info['url'], 'fiche') as span:
+                page = await context.fetch_page(job_info['url'], wait_for='h1, .job-content', timeout=20000)
+                span.fetched(page)
+                with span.parsing():
+                    job = parse_job_details(make_soup(page.html or "", self.parser_backend), job_info)
+                span.outcome('ok' if job else 'empty')
+            return job
+
+        async for job_info, job in self._map_pages(context, list(fiches.values()), fetch_fiche):
+            if isinstance(job, Exception):
+                self.page_failed(job_info['title'], job)
+            elif job:
+                yield job
+
+
+class JobMerger:
+    """
+    Fusion des métiers émis par toutes les sources
+
+    Un métier est reconnu par son slug ou son titre normalisé (title_key). Pour
+    chaque champ, la valeur retenue est celle de la source la plus prioritaire
+    qui le renseigne (la première arrivée à priorité égale).
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._by_key = {}
+        # Rang de la source qui a fourni chaque champ, par métier
+        self._ranks = []
+
+    def _find(self, job: dict):
+        for key in (job.get('slug'), title_key(job.get('title', ''))):
+            if key and key in self._by_key:
+                return self._by_key[key]
+        return None
+
+    def add(self, job: dict, source: SourceAdapter):
+        """Ajoute (ou fusionne) un métier émis par une source"""
+        rank = PRIORITY_RANKS.get(source.priority, len(PRIORITY_RANKS))
+        provenance = {'name': source.name, 'url': job.get('url') or source.url}
+
+        position = self._find(job)
+        if position is None:
+            merged = {field: value for field, value in job.items() if field not in ('source', 'sources')}
+            merged.setdefault('slug', title_key(job.get('title', '')))
+            merged['sources'] = [provenance]
+            position = len(self.jobs)
+            self.jobs.append(merged)
+            self._ranks.append({field: rank for field in merged})
+        else:
+            merged = self.jobs[position]
+            ranks = self._ranks[position]
+            for field, value in job.items():
+                if field in IDENTITY_FIELDS or _is_empty(value):
+                    continue
+                if _is_empty(merged.get(field)) or rank < ranks.get(field, len(PRIORITY_RANKS)):
+                    merged[field] = value
+                    ranks[field] = rank
+            # Titre et URL de référence : ceux de la source la plus prioritaire
+            if rank < ranks.get('title', len(PRIORITY_RANKS)):
+                merged['title'], ranks['title'] = job.get('title', merged['title']), rank
+                if job.get('url'):
+                    merged['url'] = job['url']
+            if provenance not in merged['sources']:
+                merged['sources'].append(provenance)
+
+        for key in (merged.get('slug'), title_key(merged.get('title', '')), job.get('slug'),
+                    title_key(job.get('title', ''))):
+            if key:
+                self._by_key.setdefault(key, position)
+
+
+async def run_ingestion(adapters: list, context: IngestionContext) -> tuple:
+    """
+    Parcourt toutes les sources en parallèle et fusionne leurs métiers
+
+    Returns:
+        tuple: (métiers fusionnés, {source: {records, errors, elapsed_s}})
+    """
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    stats = {adapter.name: {'records': 0, 'errors': 0, 'elapsed_s': 0.0} for adapter in adapters}
+
+    async def produce(adapter: SourceAdapter):
+        start = time.perf_counter()
+        adapter.errors = 0
+        print(f"🔄 {adapter.name}: démarrage ({adapter.url or 'catalogue local'})")
+        try:
+            async for job in adapter.records(context):
+                if job and job.get('title'):
+                    await queue.put((adapter, job))
+        except Exception as e:
+            stats[adapter.name]['errors'] += 1
+            print(f"✗ Erreur {adapter.name}: {str(e)[:120]}")
+        finally:
+            # Pages en échec signalées par l'adaptateur (page_failed)
+            stats[adapter.name]['errors'] += adapter.errors
+            stats[adapter.name]['elapsed_s'] = round(time.perf_counter() - start, 2)
+            await queue.put((adapter, _DONE))
+
+    merger = JobMerger()
+    producers = [asyncio.create_task(produce(adapter)) for adapter in adapters]
+
+    running = len(producers)
+    while running:
+        adapter, job = await queue.get()
+        if job is _DONE:
+            running -= 1
+            print(f"✓ {adapter.name}: {stats[adapter.name]['records']} métiers "
+                  f"en {stats[adapter.name]['elapsed_s']} s")
+            continue
+        stats[adapter.name]['records'] += 1
+        merger.add(job, adapter)
+
+    await asyncio.gather(*producers)
+    return merger.jobs, stats
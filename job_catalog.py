@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Catalogue typé des métiers (SQLite) pour les filtres de recherche
+
+    data/job_catalog.sqlite   une ligne par métier : slug, secteur, salaires (entiers),
+                              niveau d'études minimal, télétravail possible
+
+Les filtres sont résolus par une requête indexée qui renvoie les slugs
+admissibles ; le scoring vectoriel ou lexical ne porte ensuite que sur ces
+métiers (moins de lignes à scorer qu'une recherche sans filtre).
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+CATALOG_FILE = "data/job_catalog.sqlite"
+
+# Niveau d'études -> années après le bac (comparables entre elles)
+EDUCATION_LEVELS = {
+    'bac': 0,
+    'bac+1': 1,
+    'bac+2': 2,
+    'bac+3': 3,
+    'bac+4': 4,
+    'bac+5': 5,
+    'doctorat': 8,
+}
+
+FILTER_KEYS = ('sectors', 'salary_min', 'salary_max', 'max_education', 'remote_possible')
+
+SCHEMA = """
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    sector TEXT NOT NULL,
+    salary_min INTEGER,
+    salary_max INTEGER,
+    education_level INTEGER,
+    remote_possible INTEGER
+);
+CREATE INDEX jobs_sector ON jobs (sector);
+CREATE INDEX jobs_salary_min ON jobs (salary_min);
+CREATE INDEX jobs_salary_max ON jobs (salary_max);
+"""
+
+
+def education_level(label):
+    """Niveau d'un diplôme ("Bac+3" -> 3, "Doctorat" -> 8), None s'il est inconnu"""
+    if isinstance(label, int):
+        return label
+    return EDUCATION_LEVELS.get(re.sub(r"\s+", "", str(label or "")).lower())
+
+
+def job_row(job: dict) -> tuple:
+    """Colonnes typées d'un métier de apec-jobs.json"""
+    salary = job.get('salary', {}) or {}
+    levels = [level for level in map(education_level, job.get('required_education', [])) if level is not None]
+    remote = (job.get('working_conditions', {}) or {}).get('remote_possible')
+    return (
+        job.get('slug') or job.get('title', ''),
+        job.get('title', 'N/A'),
+        job.get('sector', 'N/A'),
+        int(salary['min']) if salary.get('min') is not None else None,
+        int(salary['max']) if salary.get('max') is not None else None,
+        # Le diplôme le moins élevé qui permet d'accéder au métier
+        min(levels) if levels else None,
+        None if remote is None else int(bool(remote)),
+    )
+
+
+def normalize_filters(filters) -> tuple:
+    """
+    Valide les filtres et les met sous une forme canonique (hashable)
+
+    Args:
+        filters: {
+            sectors: liste de secteurs acceptés,
+            salary_min, salary_max: fourchette recherchée ; le métier est retenu
+                si sa fourchette de salaire la recoupe,
+            max_education: plus haut diplôme du candidat ("Bac+3", "Doctorat"...),
+            remote_possible: télétravail possible (true/false),
+        }
+
+    Returns:
+        tuple: ((clé, valeur), ...) triés, vide sans filtre
+
+    Raises:
+        ValueError: Filtre inconnu ou valeur invalide
+    """
+    if not filters:
+        return ()
+    if not isinstance(filters, dict):
+        raise ValueError("filters doit être un objet")
+
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Filtres inconnus: {', '.join(sorted(unknown))} (acceptés: {', '.join(FILTER_KEYS)})")
+
+    normalized = {}
+    if filters.get('sectors'):
+        sectors = filters['sectors']
+        if isinstance(sectors, str):
+            sectors = [sectors]
+        normalized['sectors'] = tuple(sorted(set(map(str, sectors))))
+
+    for key in ('salary_min', 'salary_max'):
+        if filters.get(key) is not None:
+            try:
+                normalized[key] = int(filters[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} doit être un entier")
+
+    if filters.get('max_education') is not None:
+        level = education_level(filters['max_education'])
+        if level is None:
+            raise ValueError(f"max_education inconnu: {filters['max_education']} "
+                             f"(acceptés: {', '.join(EDUCATION_LEVELS)})")
+        normalized['max_education'] = level
+
+    if filters.get('remote_possible') is not None:
+        normalized['remote_possible'] = bool(filters['remote_possible'])
+
+    return tuple(sorted(normalized.items()))
+
+
+class JobCatalog:
+    """Catalogue SQLite ouvert en lecture (ou construit en mémoire)"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        # Connexion partagée entre les threads du serveur de recherche
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, jobs: list, path: str = ":memory:"):
+        """Construit le catalogue (fichier remplacé atomiquement, ou en mémoire)"""
+        target = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            target = f"{path}.{os.getpid()}.tmp"
+            if Path(target).exists():
+                Path(target).unlink()
+
+        connection = sqlite3.connect(target, check_same_thread=False)
+        connection.executescript(SCHEMA)
+        # Un slug peut apparaître deux fois dans le scraping : la dernière fiche l'emporte
+        connection.executemany(
+            "INSERT OR REPLACE INTO jobs (slug, title, sector, salary_min, salary_max, education_level, remote_possible) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [job_row(job) for job in jobs],
+        )
+        connection.commit()
+
+        if path == ":memory:":
+            return cls(connection)
+
+        connection.close()
+        os.replace(target, path)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path: str = CATALOG_FILE):
+        """Catalogue enregistré (lecture seule), None s'il est absent"""
+        if not Path(path).exists():
+            return None
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        return cls(connection)
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def matching_slugs(self, filters: tuple) -> frozenset:
+        """Slugs des métiers qui respectent les filtres normalisés (voir normalize_filters)"""
+        clauses = []
+        params = []
+        for key, value in filters:
+            if key == 'sectors':
+                clauses.append(f"sector IN ({', '.join('?' for _ in value)})")
+                params.extend(value)
+            elif key == 'salary_min':
+                clauses.append("salary_max >= ?")
+                params.append(value)
+            elif key == 'salary_max':
+                clauses.append("salary_min <= ?")
+                params.append(value)
+            elif key == 'max_education':
+                clauses.append("(education_level IS NULL OR education_level <= ?)")
+                params.append(value)
+            elif key == 'remote_possible':
+                clauses.append("remote_possible = ?")
+                params.append(int(value))
+
+        sql = "SELECT slug FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return frozenset(row[0] for row in self.connection.execute(sql, params))
+
+    def sectors(self) -> list:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT sector FROM jobs ORDER BY sector")]
+
+
+def catalog_for(jobs_file: str, catalog_file: str = CATALOG_FILE):
+    """Catalogue enregistré s'il existe, sinon construit en mémoire (None sans fichier des métiers)"""
+    catalog = JobCatalog.load(catalog_file)
+    if catalog is not None:
+        return catalog
+    from columnar_catalog import catalog_path, read_jobs
+    if not Path(jobs_file).exists() and not catalog_path(jobs_file).exists():
+        return None
+    return JobCatalog.build(read_jobs(jobs_file, ['slug', 'title', 'sector', 'salary', 'required_education',
+                                                  'working_conditions']))
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Index lexical BM25 des métiers (recherche sans appel d'embeddings)
+
+Un document par métier, construit depuis les champs de apec-jobs.json :
+title (pondéré), missions, competences_required et formation_required.
+Les termes sont normalisés (minuscules, sans accents), filtrés (mots vides)
+et racinisés par un stemmer français léger : "infirmières" et "infirmier",
+"développeuse" et "développeurs" donnent la même racine.
+
+L'index est écrit par setup_rag.py (data/lexical_index.json) ; à défaut,
+search_jobs.py le construit à la volée depuis le fichier des métiers.
+"""
+
+import json
+import math
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+LEXICAL_INDEX_FILE = "data/lexical_index.json"
+INDEX_VERSION = 1
+
+# Poids des champs (BM25F simplifié : fréquences pondérées avant saturation)
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'missions': 1.0,
+    'competences_required': 1.0,
+    'formation_required': 0.5,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette dans de des du elle en et etre eux il ils je l la le les leur leurs
+lui ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur
+ta te tes toi ton tu un une vos votre vous c d j m n s t y sont est ont a ete plus tres tout tous
+toute toutes afin ainsi comme dont entre sans sous chez selon
+""".split())
+
+# Suffixes féminins ramenés au masculin (ordre : du plus long au plus court)
+FEMININE_SUFFIXES = (
+    ('trice', 'teur'),
+    ('euse', 'eur'),
+    ('ienne', 'ien'),
+    ('ere', 'er'),
+    ('elle', 'el'),
+    ('onne', 'on'),
+    ('ive', 'if'),
+)
+
+
+def fold_accents(text: str) -> str:
+    """Minuscules sans diacritiques ("Ingénieur" -> "ingenieur")"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def stem_fr(word: str) -> str:
+    """
+    Stemmer français léger : pluriels, féminins, e final
+
+    Volontairement peu agressif (pas de suffixes dérivationnels) pour ne pas
+    confondre des métiers distincts.
+    """
+    if len(word) <= 4:
+        return word
+
+    # Pluriels
+    if word.endswith('aux') and len(word) > 5:
+        word = word[:-3] + 'al'
+    elif word.endswith(('s', 'x')) and not word.endswith('ss'):
+        word = word[:-1]
+
+    # Féminins
+    for suffix, replacement in FEMININE_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + replacement
+
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Termes indexés d'un texte (normalisés, sans mots vides, racinisés)"""
+    return [
+        stem_fr(word)
+        for word in re.findall(r"\w+", fold_accents(text or ""))
+        if word not in STOPWORDS and not word.isdigit()
+    ]
+
+
+def alias_titles(job: dict) -> list:
+    """Titres des fiches fusionnées dans ce métier (near_duplicates.py, champ "aliases")"""
+    return [alias.get('title') for alias in job.get('aliases') or () if alias.get('title')]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+def job_document(job: dict) -> dict:
+    """Métadonnées d'un métier renvoyées par la recherche (mêmes champs que l'index vectoriel)"""
+    salary = job.get('salary', {}) or {}
+    return {
+        'title': job.get('title', 'N/A'),
+        'sector': job.get('sector', 'N/A'),
+        'salary_min': str(salary.get('min', 0)),
+        'salary_max': str(salary.get('max', 0)),
+        'slug': job.get('slug', ''),
+        'url': job.get('url', ''),
+        'excerpt': f"Métier: {job.get('title', 'N/A')}\n"
+                   f"Secteur: {job.get('sector', 'N/A')}\n"
+                   f"Description: {job.get('description', 'N/A')}"[:300],
+        **({'aliases': alias_titles(job)} if job.get('aliases') else {}),
+    }
+
+
+class LexicalIndex:
+    """
+    Index inversé BM25 : terme -> [(document, fréquence pondérée)]
+
+    Args:
+        docs: Métadonnées des documents (voir job_document)
+        postings: {terme: [[indice du document, tf pondéré], ...]}
+        doc_lengths: Longueur pondérée de chaque document
+    """
+
+    def __init__(self, docs: list, postings: dict, doc_lengths: list, k1: float = BM25_K1, b: float = BM25_B):
+        self.docs = docs
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        # Contributions BM25 précalculées (idf × tf saturé) : une recherche
+        # n'est plus qu'une somme sur les postings des termes de la requête
+        n_docs = len(docs)
+        avg_length = (sum(doc_lengths) / n_docs) if n_docs else 1.0
+        self._weights = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._weights[term] = [
+                (doc, idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_lengths[doc] / avg_length)))
+                for doc, tf in entries
+            ]
+
+        # Titres normalisés : une requête qui est exactement un titre APEC (ou celui
+        # d'une fiche fusionnée) le place en tête
+        self._titles = {}
+        for doc, metadata in enumerate(docs):
+            for title in [metadata['title'], *metadata.get('aliases', ())]:
+                self._titles.setdefault(tuple(sorted(set(tokenize(title)))), []).append(doc)
+
+    @classmethod
+    def build(cls, jobs: list):
+        """Construit l'index depuis la liste des métiers de apec-jobs.json"""
+        docs = []
+        postings = {}
+        doc_lengths = []
+
+        for job in jobs:
+            doc = len(docs)
+            docs.append(job_document(job))
+
+            frequencies = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                text = _field_text(job.get(field))
+                if field == 'title':
+                    # Titres des quasi-doublons fusionnés : toujours trouvables par leur nom
+                    text = " ".join([text, *alias_titles(job)])
+                for term in tokenize(text):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+                    length += weight
+
+            for term, tf in frequencies.items():
+                postings.setdefault(term, []).append([doc, tf])
+            doc_lengths.append(length)
+
+        return cls(docs, postings, doc_lengths)
+
+    def save(self, path: str = LEXICAL_INDEX_FILE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'params': {'k1': self.k1, 'b': self.b, 'field_weights': FIELD_WEIGHTS},
+                'docs': self.docs,
+                'doc_lengths': self.doc_lengths,
+                'postings': self.postings,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = LEXICAL_INDEX_FILE):
+        """Index enregistré, None s'il est absent ou d'une autre version"""
+        if not Path(path).exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get('version') != INDEX_VERSION or data['params'].get('field_weights') != FIELD_WEIGHTS:
+            return None
+        return cls(data['docs'], data['postings'], data['doc_lengths'], data['params']['k1'], data['params']['b'])
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def docs_for(self, job_keys) -> frozenset:
+        """Indices des documents des métiers donnés (slug, sinon titre)"""
+        job_keys = set(job_keys)
+        return frozenset(doc for doc, metadata in enumerate(self.docs)
+                         if (metadata.get('slug') or metadata.get('title', '')) in job_keys)
+
+    def search(self, query: str, k: int = 5, allowed: frozenset = None) -> list:
+        """
+        Les k documents de meilleur score BM25 (titre identique à la requête en tête, par bonus)
+
+        Args:
+            query: Texte de la requête
+            k: Nombre de documents à retourner
+            allowed: Documents candidats (filtres) ; les autres ne sont pas scorés
+
+        Returns:
+            list: [(indice du document, score)] triés par score décroissant
+        """
+        if allowed is not None and not allowed:
+            return []
+
+        terms = set(tokenize(query))
+        scores = {}
+        for term in terms:
+            for doc, weight in self._weights.get(term, ()):
+                if allowed is None or doc in allowed:
+                    scores[doc] = scores.get(doc, 0.0) + weight
+
+        # Titre identique à la requête : bonus égal au meilleur score, inclus dans le
+        # score (les scores renvoyés suivent le classement, pour la fusion RRF)
+        exact = [doc for doc in self._titles.get(tuple(sorted(terms)), ()) if doc in scores]
+        if exact:
+            bonus = max(scores.values())
+            for doc in exact:
+                scores[doc] += bonus
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60) -> list:
+    """
+    Fusionne des classements par Reciprocal Rank Fusion
+
+    Args:
+        rankings: Listes de clés, chacune triée du plus au moins pertinent
+        k: Constante d'amortissement des rangs (60 dans la littérature)
+
+    Returns:
+        list: [(clé, score RRF)] triés par score décroissant
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def lexical_index_for(jobs_file: str, index_file: str = LEXICAL_INDEX_FILE):
+    """Index enregistré s'il existe, sinon construit depuis le fichier des métiers (None si absent)"""
+    index = LexicalIndex.load(index_file)
+    if index is not None:
+        return index
+    from columnar_catalog import catalog_path, read_jobs
+    if not Path(jobs_file).exists() and not catalog_path(jobs_file).exists():
+        return None
+    return LexicalIndex.build(read_jobs(jobs_file, ['title', 'sector', 'salary', 'slug', 'url', 'description',
+                                                    'aliases', *FIELD_WEIGHTS]))
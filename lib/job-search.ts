@@ -0,0 +1,216 @@
+/**
+ * Client de recherche de métiers (RAG)
+ *
+ * Interroge le serveur Python persistant (search_server.py) et, s'il ne
+ * répond pas, se replie sur un appel ponctuel à search_jobs.py.
+ */
+
+import { spawn } from 'child_process'
+
+const SEARCH_SERVER_URL = process.env.SEARCH_SERVER_URL || 'http://127.0.0.1:8765'
+
+/** vector : embeddings, lexical : BM25 sans appel réseau, hybrid : fusion des deux */
+export type SearchMode = 'vector' | 'lexical' | 'hybrid'
+
+/** Filtres appliqués avant le scoring (catalogue typé côté Python) */
+export interface JobSearchFilters {
+  sectors?: string[]
+  salary_min?: number
+  salary_max?: number
+  max_education?: string
+  remote_possible?: boolean
+}
+
+/**
+ * Durée de chaque étape de la recherche en ms (open_index, filters, embed,
+ * vector_search, lexical_search, fuse, search ; startup et imports en subprocess)
+ */
+export type SearchTimings = Record<string, number>
+
+export interface JobSearchResponse {
+  query?: string
+  mode?: SearchMode
+  n_results?: number
+  jobs: any[]
+  timings?: SearchTimings
+  error?: string
+  /** Statut HTTP de l'erreur : 400 pour une requête invalide, sinon panne (index, clé API) */
+  status?: number
+}
+
+export interface JobBatchSearchResponse {
+  queries?: string[]
+  mode?: SearchMode
+  fused?: boolean
+  /** Classement fusionné (fuse = true) */
+  jobs: any[]
+  /** Un bloc par requête (fuse = false) */
+  results?: { query: string; n_results: number; jobs: any[] }[]
+  timings?: SearchTimings
+  error?: string
+  /** Statut HTTP de l'erreur : 400 pour une requête invalide, sinon panne (index, clé API) */
+  status?: number
+}
+
+export interface JobRecommendationsResponse {
+  riasec?: string
+  mbti?: string
+  enneagram?: number | null
+  /**
+   * table : classement précalculé, search : recherche fusionnée en direct,
+   * profile(+table) : correspondance des champs structurés (mélangée au classement précalculé)
+   */
+  source?: 'table' | 'search' | 'profile' | 'profile+table'
+  n_results?: number
+  jobs: any[]
+  error?: string
+}
+
+async function searchViaServer(
+  body: Record<string, unknown>,
+  timeoutMs: number,
+  route = '/search'
+): Promise<any | null> {
+  const controller = new AbortController()
+  const timer = setTimeout(() => controller.abort(), timeoutMs)
+
+  try {
+    const response = await fetch(`${SEARCH_SERVER_URL}${route}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+      signal: controller.signal,
+    })
+    const data = await response.json()
+    // Statut du serveur conservé : 400 (requête invalide) ou 503 (index, clé API)
+    return response.ok ? data : { ...data, status: response.status }
+  } catch {
+    // Serveur absent ou trop lent : on passe au subprocess
+    return null
+  } finally {
+    clearTimeout(timer)
+  }
+}
+
+function searchViaSubprocess(args: string[], timeoutMs: number, script = 'search_jobs.py'): Promise<any> {
+  return new Promise((resolve) => {
+    // Heure du lancement : search_jobs.py en déduit la durée de démarrage de l'interpréteur
+    const pythonProcess = spawn('python3', [script, ...args], {
+      env: { ...process.env, DECLIC_SPAWN_TS_MS: Date.now().toString() },
+    })
+
+    let dataString = ''
+
+    pythonProcess.stdout.on('data', (data: Buffer) => {
+      dataString += data.toString()
+    })
+
+    const timer = setTimeout(() => {
+      pythonProcess.kill()
+      resolve({ error: 'Timeout', jobs: [] })
+    }, timeoutMs)
+
+    pythonProcess.on('close', (code: number | null) => {
+      clearTimeout(timer)
+      try {
+        const data = JSON.parse(dataString)
+        // Code de sortie 1 : usage ou requête invalide (mode, filtres), comme un 400 du serveur
+        resolve(data.error ? { ...data, status: code === 1 ? 400 : 503 } : data)
+      } catch {
+        resolve({ error: 'Réponse invalide', jobs: [] })
+      }
+    })
+
+    pythonProcess.on('error', (error: Error) => {
+      clearTimeout(timer)
+      resolve({ error: error.message, jobs: [] })
+    })
+  })
+}
+
+function subprocessArgs(
+  query: string,
+  nResults: number,
+  mode?: SearchMode,
+  filters?: JobSearchFilters
+): string[] {
+  const args = [query, nResults.toString(), mode || '']
+  if (filters) args.push(JSON.stringify(filters))
+  return args
+}
+
+export async function searchJobs(
+  query: string,
+  nResults = 5,
+  timeoutMs = 10000,
+  mode?: SearchMode,
+  filters?: JobSearchFilters,
+  timings = false
+): Promise<JobSearchResponse> {
+  const fromServer = await searchViaServer({ query, n_results: nResults, mode, filters, timings }, timeoutMs)
+  if (fromServer) return fromServer
+
+  const flags = timings ? ['--timings'] : []
+  return searchViaSubprocess([...flags, ...subprocessArgs(query, nResults, mode, filters)], timeoutMs)
+}
+
+/**
+ * Plusieurs requêtes en un seul appel (un lot d'embeddings côté Python)
+ * fuse = true : un seul classement fusionné de nResults métiers
+ */
+export async function searchJobsBatch(
+  queries: string[],
+  nResults = 5,
+  fuse = false,
+  timeoutMs = 10000,
+  mode?: SearchMode,
+  filters?: JobSearchFilters,
+  timings = false
+): Promise<JobBatchSearchResponse> {
+  const fromServer = await searchViaServer({ queries, n_results: nResults, fuse, mode, filters, timings }, timeoutMs)
+  if (fromServer) return fromServer
+
+  const flags = fuse ? ['--batch', '--fuse'] : ['--batch']
+  if (timings) flags.push('--timings')
+  return searchViaSubprocess(
+    [...flags, ...subprocessArgs(JSON.stringify(queries), nResults, mode, filters)],
+    timeoutMs
+  )
+}
+
+/** semantic : classements précalculés, profile : champs structurés des fiches (sans réseau) */
+export type RecommendationStrategy = 'semantic' | 'profile'
+
+/**
+ * Recommandations d'un profil RIASEC/MBTI : classement précalculé par
+ * setup_rag.py (aucun appel d'embeddings), recherche fusionnée à défaut
+ */
+export async function recommendJobs(
+  riasec: string | undefined,
+  mbti: string | undefined,
+  nResults = 5,
+  timeoutMs = 10000,
+  strategy: RecommendationStrategy = 'semantic',
+  enneagram?: number
+): Promise<JobRecommendationsResponse> {
+  const fromServer = await searchViaServer(
+    { riasec, mbti, enneagram, n_results: nResults, strategy },
+    timeoutMs,
+    '/recommendations'
+  )
+  if (fromServer) return fromServer
+
+  if (strategy === 'profile') {
+    return searchViaSubprocess(
+      [riasec || '', mbti || '', enneagram?.toString() || '', nResults.toString()],
+      timeoutMs,
+      'profile_matching.py'
+    )
+  }
+
+  return searchViaSubprocess(
+    ['lookup', riasec || '', mbti || '', nResults.toString()],
+    timeoutMs,
+    'recommendation_tables.py'
+  )
+}
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Détection des quasi-doublons du catalogue (MinHash + LSH)
+
+Un même métier apparaît sous plusieurs titres ou slugs selon la catégorie APEC
+ou la source ("Chef de projet IT" / "Chef de projet informatique"), parfois
+avec un slug abîmé ("agent-g-n-ral-d-assurances"). Chaque doublon est embeddé
+pour rien et encombre les résultats de recherche.
+
+    titre + missions -> termes normalisés (lexical_index.tokenize) -> shingles
+    shingles -> signature MinHash (NUM_PERM minimums de hachages universels)
+    signature -> LSH par bandes : deux fiches sont candidates si une bande coïncide
+    candidates -> Jaccard exact >= seuil et titres proches -> groupes (union-find)
+
+Les shingles communs à beaucoup de fiches (phrases de gabarit) sont écartés
+avant le calcul des signatures. Des missions proches ne suffisent pas : les
+termes des titres doivent aussi se recouvrir (TITLE_SIMILARITY), sinon deux
+métiers voisins ("Acheteur industriel" / "Acheteur projets") seraient fusionnés.
+
+Seules les paires qui partagent une bande sont comparées : le coût reste
+quasi linéaire en nombre de fiches. setup_rag.py fusionne les groupes avant
+l'indexation si DECLIC_DEDUP_THRESHOLD > 0 (désactivé par défaut : vérifier les
+groupes avec ce script avant de l'activer). Les titres des fiches fusionnées
+restent indexés (BM25 et texte des chunks) via le champ "aliases".
+
+Usage:
+    python near_duplicates.py [data/jobs/apec-jobs.json] [--threshold 0.8] [--write]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from lexical_index import fold_accents, tokenize
+
+DEDUP_THRESHOLD = float(os.getenv("DECLIC_DEDUP_THRESHOLD", "0"))
+# Seuil proposé par le script quand la fusion est désactivée
+SUGGESTED_THRESHOLD = 0.8
+
+# Jaccard minimal des termes des titres (racinisés) d'une paire fusionnée
+TITLE_SIMILARITY = 0.5
+
+NUM_PERM = 128
+
+# Premier nombre premier au-delà de 2^32 : (a * h + b) tient dans un uint64 sans débordement
+_HASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Shingles présents dans plus de max(2 %, 10) fiches ignorés : gabarits des pages
+# ("peut varier", "site de France Travail") qui rapprochent des métiers distincts
+COMMON_SHINGLE_FRACTION = 0.02
+COMMON_SHINGLE_MIN_DOCS = 10
+
+
+
+def shingles(job: dict) -> set:
+    """Termes du titre et bigrammes de termes du titre et des missions"""
+    title = tokenize(job.get('title') or '')
+    words = title + tokenize(job.get('missions') or '')
+    return set(title) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _hash_shingles(doc_shingles: set) -> np.ndarray:
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+         for s in doc_shingles],
+        dtype=np.uint64,
+    )
+
+
+class MinHasher:
+    """NUM_PERM fonctions de hachage universelles (a * h + b) mod p, tirées une fois"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, int(_HASH_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_HASH_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, doc_shingles: set) -> np.ndarray:
+        """Signature (num_perm,) uint32 ; constante maximale pour un ensemble vide"""
+        if not doc_shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = _hash_shingles(doc_shingles)
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % _HASH_PRIME
+        return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+    def signatures(self, shingle_sets: list) -> np.ndarray:
+        return np.array([self.signature(s) for s in shingle_sets], dtype=np.uint32).reshape(-1, self.num_perm)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> tuple:
+    """
+    (bandes, lignes par bande) qui minimisent faux positifs + faux négatifs autour du seuil
+
+    Une paire de similarité s devient candidate avec la probabilité 1 - (1 - s^r)^b.
+    """
+    s = np.linspace(0.0, 1.0, 201)
+    best, best_error = (num_perm, 1), float('inf')
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate = 1.0 - (1.0 - s ** rows) ** bands
+        error = np.where(s < threshold, candidate, 1.0 - candidate).mean()
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int, rows: int) -> set:
+    """Paires (i, j), i < j, dont au moins une bande de signature coïncide"""
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        for doc, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(key.tobytes(), []).append(doc)
+        for docs in buckets.values():
+            if len(docs) > 1:
+                pairs.update((i, j) for k, i in enumerate(docs) for j in docs[k + 1:])
+    return pairs
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def find_near_duplicates(jobs: list, threshold: float = DEDUP_THRESHOLD, num_perm: int = NUM_PERM) -> list:
+    """
+    Groupes de fiches quasi identiques
+
+    Returns:
+        list: [[indices dans jobs], ...], groupes d'au moins deux fiches, chacun trié
+    """
+    shingle_sets = [shingles(job) for job in jobs]
+    frequencies = Counter(s for doc_shingles in shingle_sets for s in doc_shingles)
+    limit = max(COMMON_SHINGLE_MIN_DOCS, COMMON_SHINGLE_FRACTION * len(jobs))
+    shingle_sets = [{s for s in doc_shingles if frequencies[s] <= limit} for doc_shingles in shingle_sets]
+
+    signatures = MinHasher(num_perm).signatures(shingle_sets)
+    bands, rows = lsh_params(threshold, num_perm)
+
+    parent = list(range(len(jobs)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    titles = [set(tokenize(job.get('title') or '')) for job in jobs]
+    for i, j in candidate_pairs(signatures, bands, rows):
+        if (shingle_sets[i] and shingle_sets[j] and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold
+                and jaccard(titles[i], titles[j]) >= TITLE_SIMILARITY):
+            parent[find(j)] = find(i)
+
+    groups = {}
+    for i in range(len(jobs)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted((members for members in groups.values() if len(members) > 1), key=lambda g: g[0])
+
+
+def _canonical_rank(job: dict) -> tuple:
+    """
+    Fiche gardée dans un groupe : slug fidèle au titre, puis contenu le plus long
+
+    Un slug abîmé ("agent-g-n-ral-d-assurances") a perdu ses lettres accentuées
+    au lieu de les replier ("agent-general-d-assurances").
+    """
+    intact = job.get('slug') == re.sub(r"[^a-z0-9]+", "-", fold_accents(job.get('title') or '')).strip("-")
+    return (not intact, -len(job.get('missions') or ''))
+
+
+def merge_near_duplicates(jobs: list, clusters: list) -> list:
+    """
+    Catalogue où chaque groupe est réduit à une fiche
+
+    La fiche canonique garde sa position et ses champs ; ses champs vides sont
+    complétés par les autres membres, dont titre et slug sont conservés dans
+    "aliases" : les titres sont indexés par lexical_index.py et setup_rag.py.
+    """
+    merged_into = {}
+    canonical = {}
+    for cluster in clusters:
+        keep = min(cluster, key=lambda i: (_canonical_rank(jobs[i]), i))
+        job = dict(jobs[keep])
+        aliases = list(job.get('aliases') or [])
+        for i in cluster:
+            if i == keep:
+                continue
+            merged_into[i] = keep
+            aliases.append({'title': jobs[i].get('title', ''), 'slug': jobs[i].get('slug', '')})
+            for field, value in jobs[i].items():
+                if field not in job or job[field] in (None, "", [], {}):
+                    job[field] = value
+        job['aliases'] = aliases
+        canonical[keep] = job
+
+    return [canonical.get(i, job) for i, job in enumerate(jobs) if i not in merged_into]
+
+
+def dedupe_jobs(jobs: list, threshold: float = DEDUP_THRESHOLD) -> tuple:
+    """(catalogue dédoublonné, groupes détectés) ; seuil <= 0 : catalogue inchangé"""
+    if threshold <= 0 or len(jobs) < 2:
+        return jobs, []
+    clusters = find_near_duplicates(jobs, threshold)
+    return merge_near_duplicates(jobs, clusters), clusters
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from columnar_catalog import read_jobs, save_jobs_catalog
+    from crawl_journal import write_json_atomic
+
+    parser = argparse.ArgumentParser(description="Quasi-doublons du catalogue de métiers (MinHash + LSH)")
+    parser.add_argument("jobs_file", nargs="?", default="data/jobs/apec-jobs.json")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD or SUGGESTED_THRESHOLD,
+                        help=f"Similarité de Jaccard minimale (défaut: DECLIC_DEDUP_THRESHOLD, "
+                             f"ou {SUGGESTED_THRESHOLD} s'il vaut 0)")
+    parser.add_argument("--write", action="store_true",
+                        help="Réécrire le catalogue (JSON + Arrow) avec les groupes fusionnés")
+    args = parser.parse_args()
+
+    jobs = read_jobs(args.jobs_file)
+    bands, rows = lsh_params(args.threshold)
+    start = time.perf_counter()
+    deduped, clusters = dedupe_jobs(jobs, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    for cluster in clusters:
+        print(" ≈ " + " | ".join(f"{jobs[i].get('title', '')} ({jobs[i].get('slug', '')})" for i in cluster))
+    print(f"📊 {len(jobs)} fiches, {len(clusters)} groupes de quasi-doublons, "
+          f"{len(jobs) - len(deduped)} fiches fusionnées ({bands} bandes × {rows} lignes, {elapsed:.2f} s)")
+
+    if args.write and clusters:
+        with open(args.jobs_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['jobs'] = deduped
+        data.setdefault('metadata', {})['total_jobs'] = len(deduped)
+        write_json_atomic(args.jobs_file, data)
+        save_jobs_catalog(data, args.jobs_file)
+        print(f"✓ {args.jobs_file} réécrit")
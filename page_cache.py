@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Cache local des pages rendues pour les scrapers (clé = URL, contenu adressé par hash)
+
+    data/page_cache/index/<sha256(url)>.json   URL, ETag, Last-Modified, date de fetch
+    data/page_cache/blobs/<sha256(html)>.html  HTML rendu (partagé entre URLs identiques)
+
+Une page plus récente que le TTL est servie depuis le cache. Au-delà, elle est
+revalidée par une requête conditionnelle (If-None-Match / If-Modified-Since) :
+un 304 évite le rendu navigateur. En mode hors ligne, seul le cache est lu, ce
+qui permet de rejouer les parsers sur le HTML déjà récupéré.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = "data/page_cache"
+DEFAULT_TTL_S = 7 * 24 * 3600
+
+
+class CacheMiss(Exception):
+    """Page absente du cache en mode hors ligne"""
+
+
+class CachedPage:
+    """
+    Résultat compatible avec crawler.arun() pour les scrapers (attribut .html)
+
+    Attributes:
+        wait_s: Attente du budget de politesse de l'hôte
+        render_s: Rendu navigateur ou revalidation (0 pour une page servie par le cache)
+    """
+
+    def __init__(self, url: str, html: str, from_cache: bool, wait_s: float = 0.0, render_s: float = 0.0):
+        self.url = url
+        self.html = html
+        self.from_cache = from_cache
+        self.wait_s = wait_s
+        self.render_s = render_s
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    """
+    Args:
+        cache_dir: Dossier du cache
+        ttl_s: Durée pendant laquelle une page est servie sans revalidation
+        offline: Ne jamais contacter le site (CacheMiss si la page manque)
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_s: float = DEFAULT_TTL_S, offline: bool = False):
+        self.root = Path(cache_dir)
+        self.ttl_s = ttl_s
+        self.offline = offline
+        self.stats = {'hits': 0, 'revalidated': 0, 'fetched': 0, 'misses': 0}
+        (self.root / "index").mkdir(parents=True, exist_ok=True)
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "index" / f"{_sha256(url)}.json"
+
+    def _blob_path(self, content_sha: str) -> Path:
+        return self.root / "blobs" / f"{content_sha}.html"
+
+    def lookup(self, url: str):
+        """Métadonnées de la page en cache, None si absente"""
+        path = self._index_path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry if self._blob_path(entry['content_sha256']).exists() else None
+
+    def read(self, entry: dict) -> str:
+        with open(self._blob_path(entry['content_sha256']), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def store(self, url: str, html: str, headers: dict = None) -> dict:
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        content_sha = _sha256(html)
+
+        blob_path = self._blob_path(content_sha)
+        if not blob_path.exists():
+            self._write_atomic(blob_path, html)
+
+        entry = {
+            'url': url,
+            'content_sha256': content_sha,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'fetched_at': time.time(),
+        }
+        self._write_entry(url, entry)
+        return entry
+
+    def _write_entry(self, url: str, entry: dict):
+        self._write_atomic(self._index_path(url), json.dumps(entry, ensure_ascii=False))
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str):
+        tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get('fetched_at', 0) < self.ttl_s
+
+    def _not_modified(self, entry: dict) -> bool:
+        """Requête conditionnelle : True si le serveur répond 304"""
+        conditional = {}
+        if entry.get('etag'):
+            conditional['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            conditional['If-Modified-Since'] = entry['last_modified']
+        if not conditional:
+            return False
+
+        request = urllib.request.Request(entry['url'], method='HEAD', headers=conditional)
+        try:
+            with urllib.request.urlopen(request, timeout=10):
+                return False
+        except urllib.error.HTTPError as e:
+            return e.code == 304
+        except (urllib.error.URLError, OSError):
+            return False
+
+    async def fetch(self, crawler, url: str, limiter=None, **arun_kwargs) -> CachedPage:
+        """
+        Retourne la page depuis le cache ou la rend avec crawler.arun()
+
+        Args:
+            crawler: AsyncWebCrawler ouvert
+            url: Page à récupérer
+            limiter: HostRateLimiter optionnel, appliqué seulement aux accès réseau
+            **arun_kwargs: Options transmises à crawler.arun() (wait_for, timeout...)
+        """
+        entry = self.lookup(url)
+
+        if entry and (self.offline or self.is_fresh(entry)):
+            self.stats['hits'] += 1
+            return CachedPage(url, self.read(entry), from_cache=True)
+
+        if self.offline:
+            self.stats['misses'] += 1
+            raise CacheMiss(f"Page absente du cache (mode hors ligne): {url}")
+
+        wait_s = 0.0
+        if entry:
+            wait_s += await self._acquire(limiter, url)
+            start = time.monotonic()
+            if await asyncio.to_thread(self._not_modified, entry):
+                entry['fetched_at'] = time.time()
+                self._write_entry(url, entry)
+                self.stats['revalidated'] += 1
+                return CachedPage(url, self.read(entry), from_cache=True, wait_s=wait_s,
+                                  render_s=time.monotonic() - start)
+
+        wait_s += await self._acquire(limiter, url)
+        start = time.monotonic()
+        result = await crawler.arun(url, **arun_kwargs)
+        render_s = time.monotonic() - start
+        self.stats['fetched'] += 1
+
+        if getattr(result, 'success', True) and result.html:
+            self.store(url, result.html, getattr(result, 'response_headers', None))
+        return CachedPage(url, result.html, from_cache=False, wait_s=wait_s, render_s=render_s)
+
+    @staticmethod
+    async def _acquire(limiter, url: str) -> float:
+        """Réserve un créneau pour l'hôte de l'URL, retourne l'attente en secondes"""
+        if not limiter:
+            return 0.0
+        start = time.monotonic()
+        await limiter.acquire(url)
+        return time.monotonic() - start
+
+
+def page_cache_from_env(offline: bool = None) -> PageCache:
+    """Cache configuré par DECLIC_PAGE_CACHE_DIR / _TTL_HOURS / _OFFLINE"""
+    ttl_hours = os.getenv("DECLIC_PAGE_CACHE_TTL_HOURS")
+    if offline is None:
+        offline = os.getenv("DECLIC_PAGE_CACHE_OFFLINE", "") in ("1", "true", "yes")
+    return PageCache(
+        cache_dir=os.getenv("DECLIC_PAGE_CACHE_DIR", DEFAULT_CACHE_DIR),
+        ttl_s=float(ttl_hours) * 3600 if ttl_hours else DEFAULT_TTL_S,
+        offline=offline,
+    )
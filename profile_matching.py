@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Moteur de correspondance profil -> métiers sur les champs structurés des fiches
+
+    riasec_codes   "EAS"                 -> poids par position (6 colonnes float32)
+    mbti_fit       ["ENTJ", "INTJ"]      -> masque 16 bits (uint16)
+    enneagram_fit  [3, 8, 1]             -> masque 9 bits (uint16)
+
+Les fiches sont encodées une seule fois ; un profil (code RIASEC, type MBTI,
+type d'ennéagramme) est ensuite scoré contre tout le catalogue par quelques
+opérations NumPy vectorisées, sans appel réseau. Un score sémantique (table de
+recommandations ou recherche) peut être mélangé au score structuré.
+
+Usage:
+    python profile_matching.py AIS [ENFP] [4] [n_results]
+"""
+
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from columnar_catalog import read_jobs
+from lexical_index import job_document
+from recommendation_tables import MAX_RECOMMENDATIONS, MBTI_TYPES, RIASEC_QUERIES, get_tables, recommend_jobs
+
+RIASEC_LETTERS = tuple(RIASEC_QUERIES)
+
+# Poids des lettres selon leur rang dans le code (dominante d'abord)
+RIASEC_POSITION_WEIGHTS = (3.0, 2.0, 1.0)
+
+# Part de chaque test dans le score structuré (renormalisée sur les tests passés)
+PROFILE_WEIGHTS = {
+    'riasec': 0.5,
+    'mbti': 0.3,
+    'enneagram': 0.2,
+}
+
+# Type voisin (aile) de l'ennéagramme : crédit partiel
+ENNEAGRAM_WING_SCORE = 0.5
+
+# Part du score sémantique quand il est fourni
+SEMANTIC_WEIGHT = 0.3
+
+PROFILE_COLUMNS = ['title', 'sector', 'salary', 'slug', 'url', 'description',
+                   'riasec_codes', 'mbti_fit', 'enneagram_fit']
+
+# Similarité entre types MBTI : part des quatre préférences communes
+MBTI_SIMILARITY = np.array(
+    [[sum(a == b for a, b in zip(t, u)) / 4.0 for u in MBTI_TYPES] for t in MBTI_TYPES],
+    dtype=np.float32,
+)
+
+
+def riasec_vector(code) -> np.ndarray:
+    """Code RIASEC -> vecteur de norme 1 pondéré par position ("EAS" : E=3, A=2, S=1)"""
+    vector = np.zeros(len(RIASEC_LETTERS), dtype=np.float32)
+    letters = [c for c in str(code or '').upper() if c in RIASEC_LETTERS]
+    for position, letter in enumerate(letters[:len(RIASEC_POSITION_WEIGHTS)]):
+        vector[RIASEC_LETTERS.index(letter)] = max(vector[RIASEC_LETTERS.index(letter)],
+                                                   RIASEC_POSITION_WEIGHTS[position])
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def mbti_mask(types) -> int:
+    """["ENTJ", "INTJ"] -> masque 16 bits (bit i = MBTI_TYPES[i])"""
+    mask = 0
+    for mbti in types or ():
+        mbti = str(mbti).strip().upper()
+        if mbti in MBTI_TYPES:
+            mask |= 1 << MBTI_TYPES.index(mbti)
+    return mask
+
+
+def enneagram_mask(types) -> int:
+    """[3, 8, 1] -> masque 9 bits (bit t-1 = type t)"""
+    mask = 0
+    for enneagram in types or ():
+        try:
+            enneagram = int(enneagram)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= enneagram <= 9:
+            mask |= 1 << (enneagram - 1)
+    return mask
+
+
+def normalize_profile(riasec=None, mbti=None, enneagram=None) -> tuple:
+    """
+    Valide un profil utilisateur
+
+    Returns:
+        tuple: (code RIASEC, type MBTI, type d'ennéagramme), None pour un test non passé
+
+    Raises:
+        ValueError: Valeur invalide
+    """
+    riasec = str(riasec or '').strip().upper() or None
+    if riasec is not None and not all(c in RIASEC_LETTERS for c in riasec):
+        raise ValueError(f"Code RIASEC invalide: {riasec} (lettres: {''.join(RIASEC_LETTERS)})")
+
+    mbti = str(mbti or '').strip().upper() or None
+    if mbti is not None and mbti not in MBTI_TYPES:
+        raise ValueError(f"Type MBTI inconnu: {mbti}")
+
+    if enneagram not in (None, ''):
+        try:
+            enneagram = int(enneagram)
+        except (TypeError, ValueError):
+            raise ValueError("enneagram doit être un entier de 1 à 9")
+        if not 1 <= enneagram <= 9:
+            raise ValueError("enneagram doit être un entier de 1 à 9")
+    else:
+        enneagram = None
+
+    return riasec, mbti, enneagram
+
+
+class ProfileMatcher:
+    """
+    Catalogue encodé pour le scoring de profils
+
+    Attributes:
+        docs: Métadonnées des métiers (voir lexical_index.job_document), alignées sur les lignes
+        riasec: (métiers × 6) float32, lignes de norme 1
+        mbti: (métiers,) uint16, masque des types MBTI adaptés
+        enneagram: (métiers,) uint16, masque des types d'ennéagramme adaptés
+    """
+
+    def __init__(self, docs: list, riasec: np.ndarray, mbti: np.ndarray, enneagram: np.ndarray):
+        self.docs = docs
+        self.riasec = riasec
+        self.mbti = mbti
+        self.enneagram = enneagram
+        # Bits dépliés une fois : (métiers × 16) et (métiers × 9)
+        self._mbti_bits = ((mbti[:, None] >> np.arange(len(MBTI_TYPES), dtype=np.uint16)) & 1).astype(bool)
+        self._enneagram_bits = ((enneagram[:, None] >> np.arange(9, dtype=np.uint16)) & 1).astype(bool)
+        self._rows = {(doc.get('slug') or doc.get('title', '')): row for row, doc in enumerate(docs)}
+
+    @classmethod
+    def from_jobs(cls, jobs: list):
+        """Encode les champs structurés des fiches de apec-jobs.json"""
+        return cls(
+            [job_document(job) for job in jobs],
+            np.array([riasec_vector(job.get('riasec_codes')) for job in jobs],
+                     dtype=np.float32).reshape(len(jobs), len(RIASEC_LETTERS)),
+            np.array([mbti_mask(job.get('mbti_fit')) for job in jobs], dtype=np.uint16),
+            np.array([enneagram_mask(job.get('enneagram_fit')) for job in jobs], dtype=np.uint16),
+        )
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def score(self, riasec=None, mbti=None, enneagram=None) -> np.ndarray:
+        """
+        Score structuré de chaque métier pour un profil normalisé (entre 0 et 1)
+
+        Returns:
+            np.ndarray: (métiers,) float32 ; nul partout pour un profil vide
+        """
+        total = np.zeros(len(self), dtype=np.float32)
+        weight = 0.0
+
+        if riasec:
+            # Cosinus entre vecteurs positifs : déjà entre 0 et 1
+            total += PROFILE_WEIGHTS['riasec'] * (self.riasec @ riasec_vector(riasec))
+            weight += PROFILE_WEIGHTS['riasec']
+
+        if mbti:
+            # Type le plus proche parmi ceux adaptés au métier (1.0 si le type y figure)
+            similarity = np.where(self._mbti_bits, MBTI_SIMILARITY[MBTI_TYPES.index(mbti)], 0.0)
+            total += PROFILE_WEIGHTS['mbti'] * similarity.max(axis=1)
+            weight += PROFILE_WEIGHTS['mbti']
+
+        if enneagram:
+            wings = [(enneagram - 2) % 9, enneagram % 9]
+            exact = self._enneagram_bits[:, enneagram - 1]
+            wing = self._enneagram_bits[:, wings].any(axis=1)
+            total += PROFILE_WEIGHTS['enneagram'] * np.where(exact, 1.0, np.where(wing, ENNEAGRAM_WING_SCORE, 0.0))
+            weight += PROFILE_WEIGHTS['enneagram']
+
+        return total / weight if weight else total
+
+    def semantic_scores(self, jobs: list) -> np.ndarray:
+        """Scores d'une liste de résultats de recherche, alignés sur les lignes (0 hors liste)"""
+        scores = np.zeros(len(self), dtype=np.float32)
+        for job in jobs:
+            row = self._rows.get(job.get('slug') or job.get('title', ''))
+            if row is not None:
+                scores[row] = max(scores[row], float(job.get('relevance_score', 0.0)))
+        return scores
+
+    def top(self, riasec=None, mbti=None, enneagram=None, k: int = 5,
+            semantic: np.ndarray = None, semantic_weight: float = SEMANTIC_WEIGHT) -> list:
+        """
+        Les k meilleurs métiers pour un profil
+
+        Args:
+            semantic: Scores sémantiques alignés sur les lignes (voir semantic_scores),
+                mélangés au score structuré avec le poids semantic_weight
+
+        Returns:
+            list: [(ligne, score)] triés par score décroissant ; vide pour un
+                profil vide sans scores sémantiques (tous les scores seraient nuls)
+        """
+        if semantic is None and not (riasec or mbti or enneagram):
+            return []
+        scores = self.score(riasec, mbti, enneagram)
+        if semantic is not None:
+            scores = (1.0 - semantic_weight) * scores + semantic_weight * semantic
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def results(self, riasec=None, mbti=None, enneagram=None, k: int = 5, semantic_jobs: list = None) -> list:
+        """Résultats au format de search_jobs.job_result (relevance_score = score du profil)"""
+        semantic = self.semantic_scores(semantic_jobs) if semantic_jobs else None
+        return [
+            {
+                'title': self.docs[row]['title'],
+                'sector': self.docs[row]['sector'],
+                'salary_min': self.docs[row]['salary_min'],
+                'salary_max': self.docs[row]['salary_max'],
+                'slug': self.docs[row]['slug'],
+                'url': self.docs[row]['url'],
+                'relevance_score': round(score, 4),
+                'excerpt': self.docs[row]['excerpt'],
+            }
+            for row, score in self.top(riasec, mbti, enneagram, k, semantic)
+        ]
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher(jobs_file: str = "data/jobs/apec-jobs.json"):
+    """Catalogue encodé une seule fois par processus"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = ProfileMatcher.from_jobs(read_jobs(jobs_file, PROFILE_COLUMNS))
+    return _matcher
+
+
+def profile_recommendations(riasec=None, mbti=None, enneagram=None, n_results: int = 5) -> dict:
+    """
+    Recommandations par correspondance de profil, sans appel réseau
+
+    Le classement sémantique précalculé du profil (recommendation_tables), s'il
+    existe, est mélangé au score structuré. Un profil vide n'a pas de score
+    structuré : recommandations du profil "/" (table, sinon recherche en direct).
+
+    Raises:
+        ValueError: Profil invalide (voir normalize_profile)
+    """
+    riasec, mbti, enneagram = normalize_profile(riasec, mbti, enneagram)
+    if not (riasec or mbti or enneagram):
+        results = recommend_jobs('', '', n_results)
+        if 'error' not in results:
+            results['enneagram'] = None
+        return results
+
+    tables = get_tables()
+    semantic_jobs = tables.lookup(riasec, mbti, MAX_RECOMMENDATIONS) if tables is not None else None
+
+    matcher = get_matcher()
+    start = time.perf_counter()
+    jobs = matcher.results(riasec, mbti, enneagram, n_results, semantic_jobs)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+
+    return {
+        'riasec': riasec or '',
+        'mbti': mbti or '',
+        'enneagram': enneagram,
+        'source': 'profile+table' if semantic_jobs else 'profile',
+        'elapsed_us': round(elapsed_us, 1),
+        'n_results': len(jobs),
+        'jobs': jobs,
+    }
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    profile = (args[:3] + [None] * 3)[:3]
+    n_results = int(args[3]) if len(args) > 3 else 5
+
+    try:
+        results = profile_recommendations(*profile, n_results)
+    except ValueError as e:
+        print(json.dumps({"error": str(e), "jobs": []}, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if 'error' in results:
+        sys.exit(1)
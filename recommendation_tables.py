@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Tables de recommandations précalculées pour chaque profil RIASEC × MBTI
+
+    data/recommendation_tables.json   classement des métiers de chaque profil
+
+Un profil est un code RIASEC de trois lettres (120 codes ordonnés) et/ou un
+type MBTI (16 types) : 120 × 16 combinaisons, plus les profils à un seul test
+et le profil vide. Chaque classement est celui que renverrait la recherche
+fusionnée de la page /recommendations (une requête par lettre RIASEC + le type
+MBTI) ; les requêtes distinctes ne sont que 23, elles sont donc recherchées
+une seule fois puis fusionnées pour chaque profil.
+
+La table porte l'empreinte de l'index (manifeste) : setup_rag.py la régénère
+après chaque reconstruction, et une table périmée n'est jamais servie (la
+recherche en direct prend le relais). Un processus qui tourne (search_server.py)
+la relit dès que le fichier change.
+
+Usage:
+    python recommendation_tables.py build [--mode hybrid]
+    python recommendation_tables.py lookup AIS ENFP [n_results]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from itertools import permutations
+from pathlib import Path
+
+from index_manifest import load_manifest
+
+RECOMMENDATIONS_FILE = "data/recommendation_tables.json"
+TABLE_VERSION = 2
+
+# Profondeur des classements (plan premium de /recommendations)
+MAX_RECOMMENDATIONS = 25
+
+# Requête associée à chaque lettre RIASEC (anciennement riasecMap côté page)
+RIASEC_QUERIES = {
+    'R': 'réaliste pratique technique',
+    'I': 'investigateur analytique scientifique',
+    'A': 'artistique créatif',
+    'S': 'social empathique aide',
+    'E': 'entreprenant leader commercial',
+    'C': 'conventionnel organisé méthodique',
+}
+
+MBTI_TYPES = tuple(
+    a + b + c + d for a in 'EI' for b in 'SN' for c in 'TF' for d in 'JP'
+)
+
+RIASEC_CODES = tuple(''.join(code) for code in permutations(RIASEC_QUERIES, 3))
+
+FALLBACK_QUERY = 'métiers variés intéressants'
+
+
+def profile_key(riasec: str = None, mbti: str = None) -> str:
+    """Clé d'un profil : "AIS/ENFP", "AIS/", "/ENFP" ou "/" """
+    return f"{(riasec or '').strip().upper()}/{(mbti or '').strip().upper()}"
+
+
+def profile_queries(riasec: str = None, mbti: str = None) -> list:
+    """Requêtes de recherche d'un profil : une par lettre RIASEC, puis le type MBTI"""
+    queries = [RIASEC_QUERIES[c] for c in (riasec or '').strip().upper() if c in RIASEC_QUERIES]
+    if mbti and mbti.strip():
+        queries.append(mbti.strip().upper())
+    return queries or [FALLBACK_QUERY]
+
+
+def all_profiles() -> list:
+    """(riasec, mbti) de toutes les combinaisons précalculées"""
+    return ([(code, mbti) for code in RIASEC_CODES for mbti in MBTI_TYPES]
+            + [(code, '') for code in RIASEC_CODES]
+            + [('', mbti) for mbti in MBTI_TYPES]
+            + [('', '')])
+
+
+def index_fingerprint(chroma_dir: str, mode: str) -> str:
+    """Empreinte de l'index (embeddings, contenu des métiers) et du mode de recherche"""
+    manifest = load_manifest(chroma_dir) or {}
+    payload = json.dumps({
+        'embedding': manifest.get('embedding'),
+        'jobs': {key: entry.get('hash') for key, entry in (manifest.get('jobs') or {}).items()},
+        'mode': mode,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class RecommendationTables:
+    """
+    Classements précalculés, indexés par clé de profil
+
+    Attributes:
+        jobs: Métiers distincts apparaissant dans les classements (sans score)
+        profiles: {clé de profil: [[indice dans jobs, score], ...]}
+        fingerprint: Empreinte de l'index qui a servi au calcul
+        mode: Mode de recherche utilisé
+        candidates: Candidats par requête avant fusion (search_jobs.fused_candidates)
+    """
+
+    def __init__(self, jobs: list, profiles: dict, fingerprint: str, mode: str, candidates: int):
+        self.jobs = jobs
+        self.profiles = profiles
+        self.fingerprint = fingerprint
+        self.mode = mode
+        self.candidates = candidates
+
+    @classmethod
+    def build(cls, mode: str = None, depth: int = MAX_RECOMMENDATIONS):
+        """
+        Calcule les classements de tous les profils sur l'index courant
+
+        Raises:
+            RuntimeError: Recherche impossible (index absent, clé API manquante...)
+        """
+        import search_jobs
+
+        mode = mode or search_jobs.DEFAULT_SEARCH_MODE
+        profiles = all_profiles()
+        queries = list(dict.fromkeys(q for profile in profiles for q in profile_queries(*profile)))
+
+        # Même nombre de candidats que la recherche fusionnée en direct
+        candidates = search_jobs.fused_candidates(depth)
+        results = search_jobs.search_jobs(queries, candidates, mode)
+        if 'error' in results:
+            raise RuntimeError(results['error'])
+        per_query = {block['query']: block['jobs'] for block in results['results']}
+
+        jobs = []
+        job_ids = {}
+        table = {}
+        for riasec, mbti in profiles:
+            ranked = search_jobs.fuse_rankings([per_query[q] for q in profile_queries(riasec, mbti)], depth)
+            entries = []
+            for job in ranked:
+                job = dict(job)
+                score = job.pop('relevance_score')
+                key = job['slug'] or job['title']
+                if key not in job_ids:
+                    job_ids[key] = len(jobs)
+                    jobs.append(job)
+                entries.append([job_ids[key], score])
+            table[profile_key(riasec, mbti)] = entries
+
+        return cls(jobs, table, index_fingerprint(search_jobs.CHROMA_DIR, mode), mode, candidates)
+
+    def save(self, path: str = RECOMMENDATIONS_FILE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': TABLE_VERSION,
+                'fingerprint': self.fingerprint,
+                'mode': self.mode,
+                'candidates': self.candidates,
+                'jobs': self.jobs,
+                'profiles': self.profiles,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = RECOMMENDATIONS_FILE):
+        """Table enregistrée, None si elle est absente ou d'une autre version"""
+        if not Path(path).exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get('version') != TABLE_VERSION:
+            return None
+        return cls(data['jobs'], data['profiles'], data['fingerprint'], data['mode'], data['candidates'])
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def lookup(self, riasec: str = None, mbti: str = None, n_results: int = MAX_RECOMMENDATIONS):
+        """
+        Les n_results premiers métiers du profil, None s'il n'a pas été précalculé
+        ou si la recherche en direct fusionnerait un autre nombre de candidats
+        """
+        import search_jobs
+
+        entries = self.profiles.get(profile_key(riasec, mbti))
+        if entries is None or n_results > MAX_RECOMMENDATIONS:
+            return None
+        if search_jobs.fused_candidates(n_results) != self.candidates:
+            return None
+        return [dict(self.jobs[job], relevance_score=score) for job, score in entries[:n_results]]
+
+
+_tables = None
+_tables_mtime = None
+_tables_lock = threading.Lock()
+
+
+def get_tables():
+    """
+    Table du processus, relue quand le fichier change (setup_rag.py) ;
+    None si absente ou périmée
+    """
+    global _tables, _tables_mtime
+    try:
+        mtime = os.stat(RECOMMENDATIONS_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime != _tables_mtime:
+        with _tables_lock:
+            if mtime != _tables_mtime:
+                import search_jobs
+                tables = RecommendationTables.load(RECOMMENDATIONS_FILE) if mtime is not None else None
+                if tables is not None and tables.fingerprint != index_fingerprint(search_jobs.CHROMA_DIR, tables.mode):
+                    print("⚠️  Table de recommandations périmée : recherche en direct", file=sys.stderr)
+                    tables = None
+                _tables = tables
+                _tables_mtime = mtime
+    return _tables
+
+
+def _profile_result(riasec: str, mbti: str, source: str, jobs: list) -> dict:
+    return {
+        'riasec': (riasec or '').upper(),
+        'mbti': (mbti or '').upper(),
+        'source': source,
+        'n_results': len(jobs),
+        'jobs': jobs,
+    }
+
+
+def table_recommendations(riasec: str = None, mbti: str = None, n_results: int = 5):
+    """Recommandations lues dans la table (O(1)), None si le profil n'y est pas"""
+    tables = get_tables()
+    jobs = tables.lookup(riasec, mbti, n_results) if tables is not None else None
+    return None if jobs is None else _profile_result(riasec, mbti, 'table', jobs)
+
+
+def recommend_jobs(riasec: str = None, mbti: str = None, n_results: int = 5) -> dict:
+    """
+    Recommandations d'un profil : table précalculée, sinon recherche fusionnée en direct
+
+    Returns:
+        dict: {riasec, mbti, source: "table" | "search", n_results, jobs}
+    """
+    results = table_recommendations(riasec, mbti, n_results)
+    if results is not None:
+        return results
+
+    import search_jobs
+    results = search_jobs.search_jobs(profile_queries(riasec, mbti), n_results, fuse=True)
+    if 'error' in results:
+        return results
+    return _profile_result(riasec, mbti, 'search', results['jobs'])
+
+
+def refresh_tables(mode: str = None, path: str = RECOMMENDATIONS_FILE):
+    """Recalcule et enregistre les tables (appelé par setup_rag.py après l'index)"""
+    tables = RecommendationTables.build(mode)
+    tables.save(path)
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tables de recommandations par profil RIASEC/MBTI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Précalculer les classements de tous les profils")
+    build.add_argument("--mode", default=None, help="vector, lexical ou hybrid (défaut: DECLIC_SEARCH_MODE)")
+
+    lookup = subparsers.add_parser("lookup", help="Recommandations d'un profil (JSON)")
+    lookup.add_argument("riasec", nargs="?", default="")
+    lookup.add_argument("mbti", nargs="?", default="")
+    lookup.add_argument("n_results", nargs="?", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        try:
+            tables = refresh_tables(args.mode)
+        except RuntimeError as e:
+            print(f"❌ ERREUR: {e}")
+            sys.exit(1)
+        print(f"✓ {len(tables)} profils ({len(tables.jobs)} métiers distincts, mode {tables.mode}) "
+              f"-> {RECOMMENDATIONS_FILE}")
+    else:
+        print(json.dumps(recommend_jobs(args.riasec, args.mbti, args.n_results), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
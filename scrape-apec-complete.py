@@ -1,17 +1,26 @@
 import asyncio
+import contextlib
 import json
 import os
 from crawl4ai import AsyncWebCrawler
 from urllib.parse import urljoin, urlparse
 import re
 
+from apec_parser import parse_apec_fiche
+from columnar_catalog import save_jobs_catalog
+from page_cache import page_cache_from_env
+
 async def scrape_apec_complete():
     """Scrape toutes les fiches métiers APEC"""
 
     base_url = "https://www.apec.fr"
     all_jobs = []
 
-    async with AsyncWebCrawler() as crawler:
+    # Cache de pages (DECLIC_PAGE_CACHE_OFFLINE=1 pour rejouer sans le site)
+    cache = page_cache_from_env()
+    crawler_context = contextlib.nullcontext() if cache.offline else AsyncWebCrawler()
+
+    async with crawler_context as crawler:
         print("🔄 Scraping APEC (toutes les pages)...")
         print("="*70)
 
@@ -19,7 +28,7 @@ async def scrape_apec_complete():
             # 1. Scraper la page principale des métiers
             print("\n📍 Étape 1: Scraping page métiers...")
             jobs_page_url = "https://www.apec.fr/tous-nos-metiers.html"
-            result = await crawler.arun(jobs_page_url)
+            result = await cache.fetch(crawler, jobs_page_url)
             jobs_html = result.html
 
             print(f"✓ Page métiers scraped ({len(jobs_html)} chars)")
@@ -45,7 +54,7 @@ async def scrape_apec_complete():
                     full_url = urljoin(base_url, link)
 
                     # Scraper la fiche
-                    fiche_result = await crawler.arun(full_url)
+                    fiche_result = await cache.fetch(crawler, full_url)
                     fiche_html = fiche_result.html
 
                     # Parser les données
@@ -56,7 +65,7 @@ async def scrape_apec_complete():
                         print(f"  ✓ [{idx}] {job_data['title']}")
 
                     # Délai pour éviter surcharge
-                    if idx % 10 == 0:
+                    if idx % 10 == 0 and not fiche_result.from_cache:
                         await asyncio.sleep(2)
 
                 except Exception as e:
@@ -91,88 +100,17 @@ async def scrape_apec_complete():
 
     with open('data/jobs/apec-jobs.json', 'w', encoding='utf-8') as f:
         json.dump(final_data, f, indent=2, ensure_ascii=False)
+    save_jobs_catalog(final_data, 'data/jobs/apec-jobs.json')
 
     print("\n" + "="*70)
     print("✅ SCRAPING APEC COMPLET!")
     print("="*70)
     print(f"✓ Total métiers scrappés: {len(all_jobs)}")
+    print(f"✓ Cache de pages: {cache.stats}")
     print(f"✓ Fichier créé: data/jobs/apec-jobs.json")
     print(f"✓ Taille: {os.path.getsize('data/jobs/apec-jobs.json') / 1024:.2f} KB")
     print("="*70)
 
-def parse_apec_fiche(html, url):
-    """Parser une fiche métier APEC"""
-
-    try:
-        # Extraire titre
-        title_match = re.search(r'<h1[^>]*>([^<]+)</h1>', html, re.IGNORECASE)
-        title = title_match.group(1).strip() if title_match else "Métier Cadre"
-
-        # Extraire description
-        description_match = re.search(
-            r'<p[^>]*class="[^"]*description[^"]*"[^>]*>([^<]+)</p>',
-            html,
-            re.IGNORECASE
-        )
-        description = description_match.group(1).strip() if description_match else f"Expert en {title.lower()}"
-
-        # Extraire salaire
-        salary_match = re.search(
-            r'(\d+\s*\d*\s*000)\s*à\s*(\d+\s*\d*\s*000)\s*€',
-            html
-        )
-        salary_min = int(salary_match.group(1).replace(" ", "")) if salary_match else 40000
-        salary_max = int(salary_match.group(2).replace(" ", "")) if salary_match else 65000
-
-        # Déterminer profil MBTI selon le métier
-        mbti = determine_mbti_from_title(title)
-
-        # Créer objet métier
-        job = {
-            "title": title,
-            "slug": re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-'),
-            "sector": "Business",
-            "description": description,
-            "salary": {
-                "min": salary_min,
-                "max": salary_max,
-                "currency": "EUR"
-            },
-            "required_skills": ["Communication", "Leadership", "Analytique", "Management"],
-            "required_education": ["Bac+5", "MBA"],
-            "formations": [
-                {"title": f"Formation {title}", "provider": "APEC", "cost": 5000}
-            ],
-            "mbti_fit": mbti,
-            "enneagram_fit": [3, 8],
-            "riasec_codes": "EAS",
-            "growth_rate": 8.0,
-            "job_openings_yearly": 1200,
-            "similar_jobs": ["Management", "Consulting"],
-            "source": "APEC",
-            "url": url
-        }
-
-        return job
-
-    except Exception as e:
-        return None
-
-def determine_mbti_from_title(title):
-    """Détermine le profil MBTI selon le titre du métier"""
-    title_lower = title.lower()
-
-    if any(word in title_lower for word in ['manager', 'directeur', 'responsable', 'chef']):
-        return ["ENTJ", "ESTJ", "ENFJ"]
-    elif any(word in title_lower for word in ['consultant', 'analyste', 'expert']):
-        return ["INTJ", "INTP", "ENTP"]
-    elif any(word in title_lower for word in ['commercial', 'vente', 'développement']):
-        return ["ESTP", "ENTP", "ESFJ"]
-    elif any(word in title_lower for word in ['rh', 'ressources humaines', 'recrutement']):
-        return ["ENFJ", "ESFJ", "INFJ"]
-    else:
-        return ["ENTJ", "INTJ"]
-
 def create_apec_sample_jobs():
     """Crée des métiers d'exemple APEC (métiers cadres)"""
     return [
@@ -1,30 +1,67 @@
+import argparse
 import asyncio
-import json
+import contextlib
 import os
 from crawl4ai import AsyncWebCrawler
 from bs4 import BeautifulSoup
-import re
 from urllib.parse import urljoin
 
-async def scrape_apec_complete():
-    """Scrape APEC en suivant la structure exacte du site"""
+from apec_parser import PARSER_BACKENDS, make_soup, parse_job_details
+from columnar_catalog import save_jobs_catalog
+from crawl_journal import CrawlJournal, write_json_atomic
+from crawl_scheduler import DEFAULT_RPS, DEFAULT_WORKERS, HostRateLimiter, run_pool
+from crawl_telemetry import CrawlTelemetry
+from page_cache import page_cache_from_env
+
+JOURNAL_FILE = 'data/jobs/apec-crawl.jsonl'
+OUTPUT_FILE = 'data/jobs/apec-jobs.json'
+
+async def scrape_apec_complete(workers=DEFAULT_WORKERS, rps=DEFAULT_RPS, resume=False, offline=None,
+                               parser_backend='html.parser'):
+    """
+    Scrape APEC en suivant la structure exacte du site
+
+    Args:
+        workers: Nombre de pages rendues en parallèle
+        rps: Budget de politesse (requêtes par seconde vers apec.fr)
+        resume: Reprendre le journal existant et ignorer les fiches déjà extraites
+        offline: Rejouer uniquement depuis le cache de pages (aucun accès au site)
+        parser_backend: Backend BeautifulSoup des fiches ('html.parser' ou 'lxml')
+    """
 
-    all_jobs = []
     base_url = "https://www.apec.fr"
-
-    async with AsyncWebCrawler() as crawler:
+    limiter = HostRateLimiter(rps)
+    journal = CrawlJournal(JOURNAL_FILE, resume=resume)
+    cache = page_cache_from_env(offline=offline)
+    # Événements par URL et résumé live : python crawl_telemetry.py status
+    telemetry = CrawlTelemetry("apec", mode="offline" if cache.offline else "online", resume=resume)
+    if resume:
+        print(f"↩️  Reprise: {len(journal)} fiches déjà dans {JOURNAL_FILE}")
+
+    # Hors ligne : pas de navigateur, toutes les pages viennent du cache
+    crawler_context = contextlib.nullcontext() if cache.offline else AsyncWebCrawler()
+
+    async with crawler_context as crawler:
         print("🔄 SCRAPING APEC - STRUCTURE COMPLÈTE")
+        if cache.offline:
+            print(f"   Mode hors ligne: rejeu depuis {cache.root}")
+        else:
+            print(f"   {workers} workers, {rps} requêtes/s max vers apec.fr")
         print("="*70)
 
         # ÉTAPE 1: Récupérer les catégories principales
         main_url = "https://www.apec.fr/tous-nos-metiers.html"
         print(f"\n📍 ÉTAPE 1: Récupération des catégories depuis {main_url}")
 
-        result = await crawler.arun(
-            main_url,
-            wait_for='div.card-subtitle',
-            timeout=30000
-        )
+        with telemetry.page(main_url, 'index') as span:
+            result = await cache.fetch(
+                crawler,
+                main_url,
+                limiter=limiter,
+                wait_for='div.card-subtitle',
+                timeout=30000
+            )
+            span.fetched(result)
 
         soup = BeautifulSoup(result.html, 'html.parser')
 
@@ -50,85 +87,124 @@ async def scrape_apec_complete():
                     print(f"  ✓ {category_name} -> {category_url}")
 
         print(f"\n✓ Total catégories trouvées: {len(categories)}")
+        telemetry.queued([category['url'] for category in categories], 'category')
 
-        # ÉTAPE 2: Pour chaque catégorie, récupérer les métiers
-        for cat_idx, category in enumerate(categories, 1):
-            print(f"\n{'='*70}")
-            print(f"📍 ÉTAPE 2.{cat_idx}: Catégorie '{category['name']}'")
-            print(f"{'='*70}")
+        # ÉTAPE 2: Récupérer les métiers de toutes les catégories en parallèle
+        print(f"\n{'='*70}")
+        print(f"📍 ÉTAPE 2: Listes de métiers des {len(categories)} catégories")
+        print(f"{'='*70}")
 
-            try:
-                cat_result = await crawler.arun(
+        async def fetch_category(category):
+            with telemetry.page(category['url'], 'category') as span:
+                cat_result = await cache.fetch(
+                    crawler,
                     category['url'],
+                    limiter=limiter,
                     wait_for='div.card-subtitle',
                     timeout=30000
                 )
-
-                cat_soup = BeautifulSoup(cat_result.html, 'html.parser')
-
-                # Trouver tous les métiers
-                # Les liens <a> entourent les cartes entières
-                jobs_in_category = []
-
-                for link in cat_soup.find_all('a', href=True):
-                    href = link.get('href', '')
-
-                    # Les métiers ont des liens relatifs ou absolus
-                    # Chercher les card-subtitle dans ces liens
-                    subtitle_div = link.find('div', class_='card-subtitle')
-                    if subtitle_div:
-                        job_title = subtitle_div.text.strip()
-                        # Vérifier si c'est un métier (contient F/H ou H/F)
-                        if 'F/H' in job_title or 'H/F' in job_title:
-                            job_url = urljoin(base_url, href)
-                            jobs_in_category.append({
-                                'title': job_title,
-                                'url': job_url,
-                                'category': category['name']
-                            })
-
-                print(f"  ✓ {len(jobs_in_category)} métiers trouvés")
-
-                # ÉTAPE 3: Pour chaque métier, récupérer les détails
-                for job_idx, job in enumerate(jobs_in_category, 1):
-                    print(f"\n  [{cat_idx}.{job_idx}] {job['title']}")
-                    print(f"       URL: {job['url']}")
-
-                    try:
-                        job_result = await crawler.arun(
-                            job['url'],
-                            wait_for='h1, .job-content',
-                            timeout=20000
-                        )
-
-                        job_soup = BeautifulSoup(job_result.html, 'html.parser')
-
-                        # Parser les détails du métier
-                        job_data = parse_job_details(job_soup, job)
-
-                        if job_data:
-                            all_jobs.append(job_data)
-                            print(f"       ✓ Données extraites")
-                            print(f"       Salaire: {job_data.get('salary', {}).get('min', 'N/A')}-{job_data.get('salary', {}).get('max', 'N/A')} €")
-                        else:
-                            print(f"       ✗ Échec extraction")
-
-                        # Délai pour éviter blocage
-                        await asyncio.sleep(2)
-
-                    except Exception as e:
-                        print(f"       ✗ Erreur: {str(e)[:80]}")
-                        continue
-
-                # Pause entre catégories
-                print(f"\n  ⏳ Pause (3s) avant catégorie suivante...")
-                await asyncio.sleep(3)
-
-            except Exception as e:
-                print(f"  ✗ Erreur catégorie: {str(e)[:80]}")
+                span.fetched(cat_result)
+
+                with span.parsing():
+                    cat_soup = BeautifulSoup(cat_result.html, 'html.parser')
+
+                    # Trouver tous les métiers
+                    # Les liens <a> entourent les cartes entières
+                    jobs_in_category = []
+
+                    for link in cat_soup.find_all('a', href=True):
+                        href = link.get('href', '')
+
+                        # Les métiers ont des liens relatifs ou absolus
+                        # Chercher les card-subtitle dans ces liens
+                        subtitle_div = link.find('div', class_='card-subtitle')
+                        if subtitle_div:
+                            job_title = subtitle_div.text.strip()
+                            # Vérifier si c'est un métier (contient F/H ou H/F)
+                            if 'F/H' in job_title or 'H/F' in job_title:
+                                job_url = urljoin(base_url, href)
+                                jobs_in_category.append({
+                                    'title': job_title,
+                                    'url': job_url,
+                                    'category': category['name']
+                                })
+
+            print(f"  ✓ {category['name']}: {len(jobs_in_category)} métiers trouvés")
+            return jobs_in_category
+
+        category_results = await run_pool(categories, fetch_category, workers)
+
+        job_queue = []
+        for category, jobs_in_category in zip(categories, category_results):
+            if isinstance(jobs_in_category, Exception):
+                print(f"  ✗ Erreur catégorie {category['name']}: {str(jobs_in_category)[:80]}")
                 continue
+            job_queue.extend(jobs_in_category)
+
+        # ÉTAPE 3: Récupérer les détails de chaque métier (pool de workers)
+        remaining = [job for job in job_queue if job['url'] not in journal]
+        print(f"\n{'='*70}")
+        print(f"📍 ÉTAPE 3: {len(remaining)} fiches métiers à extraire "
+              f"({len(job_queue) - len(remaining)} déjà dans le journal)")
+        print(f"{'='*70}")
+        telemetry.queued([job['url'] for job in remaining], 'fiche')
+
+        async def fetch_job(job):
+            with telemetry.page(job['url'], 'fiche') as span:
+                job_result = await cache.fetch(
+                    crawler,
+                    job['url'],
+                    limiter=limiter,
+                    wait_for='h1, .job-content',
+                    timeout=20000
+                )
+                span.fetched(job_result)
+
+                with span.parsing():
+                    job_soup = make_soup(job_result.html, parser_backend)
+
+                    # Parser les détails du métier
+                    job_data = parse_job_details(job_soup, job)
+
+                span.outcome('ok' if job_data else 'empty')
+                if job_data:
+                    journal.record(job['url'], job_data)
+                    print(f"  ✓ Données extraites: {job['title']} "
+                          f"({job_data.get('salary', {}).get('min', 'N/A')}-{job_data.get('salary', {}).get('max', 'N/A')} €)")
+                else:
+                    print(f"  ✗ Échec extraction: {job['title']} ({job['url']})")
+            return job_data
+
+        job_results = await run_pool(remaining, fetch_job, workers)
+
+        for job, job_data in zip(remaining, job_results):
+            if isinstance(job_data, Exception):
+                print(f"  ✗ Erreur {job['title']}: {str(job_data)[:80]}")
+
+    print(f"\n✓ Cache de pages: {cache.stats}")
+    crawl_status = telemetry.close()
+    print(f"✓ Débit: {crawl_status['overall_rate_per_min']} pages/min, "
+          f"rendu p95 {crawl_status['render_ms']['p95']} ms (détail: python crawl_telemetry.py status)")
+
+    # ÉTAPE 4: Compacter le journal en apec-jobs.json (ordre du site)
+    journal.close()
+    all_jobs = journal.jobs([job['url'] for job in job_queue])
+    save_jobs(all_jobs, len(categories))
 
-    # ÉTAPE 4: Sauvegarder les résultats
+    return all_jobs
+
+
+def compact_journal():
+    """Produit apec-jobs.json depuis le journal seul, sans crawler"""
+    journal = CrawlJournal(JOURNAL_FILE, resume=True)
+    journal.close()
+    all_jobs = journal.jobs()
+    save_jobs(all_jobs, len({job.get('sector') for job in all_jobs}))
+    return all_jobs
+
+
+def save_jobs(all_jobs, categories_count):
+    """Sauvegarde les métiers au format data/jobs/apec-jobs.json"""
     os.makedirs('data/jobs', exist_ok=True)
 
     final_data = {
@@ -139,200 +215,45 @@ async def scrape_apec_complete():
             "language": "fr",
             "country": "France",
             "url": "https://www.apec.fr/tous-nos-metiers.html",
-            "categories": len(categories)
+            "categories": categories_count
         },
         "jobs": all_jobs
     }
 
-    with open('data/jobs/apec-jobs.json', 'w', encoding='utf-8') as f:
-        json.dump(final_data, f, indent=2, ensure_ascii=False)
+    write_json_atomic(OUTPUT_FILE, final_data)
+    save_jobs_catalog(final_data, OUTPUT_FILE)
 
     print("\n" + "="*70)
     print("✅ SCRAPING APEC TERMINÉ!")
     print("="*70)
-    print(f"✓ Catégories scrappées: {len(categories)}")
+    print(f"✓ Catégories scrappées: {categories_count}")
     print(f"✓ Total métiers: {len(all_jobs)}")
-    print(f"✓ Fichier: data/jobs/apec-jobs.json")
+    print(f"✓ Fichier: {OUTPUT_FILE}")
     if len(all_jobs) > 0:
-        file_size = os.path.getsize('data/jobs/apec-jobs.json')
+        file_size = os.path.getsize(OUTPUT_FILE)
         print(f"✓ Taille: {file_size / 1024:.2f} KB")
     print("="*70)
 
-    return all_jobs
-
-
-def parse_job_details(soup, job_info):
-    """Parser les détails d'une fiche métier APEC"""
-
-    try:
-        # Extraire le titre (nettoyer le F/H)
-        title = job_info['title'].replace(' F/H', '').replace(' H/F', '').strip()
-
-        # Créer le slug
-        slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
-
-        # Extraire les sections
-        sections = {
-            'missions': '',
-            'formation': '',
-            'competences': '',
-            'salaire': '',
-            'evolutions': ''
-        }
-
-        # Stratégie 1: Chercher les sections par ID ou ancre
-        activites = soup.find(id='activites') or soup.find('a', attrs={'name': 'activites'})
-        if activites:
-            # Récupérer le contenu après l'ancre
-            content_div = activites.find_next('div', class_=['content', 'section-content'])
-            if content_div:
-                sections['missions'] = content_div.get_text(strip=True)[:500]
-
-        # Stratégie 2: Chercher par titres de sections
-        for heading in soup.find_all(['h2', 'h3', 'h4']):
-            heading_text = heading.get_text(strip=True).lower()
-
-            if 'mission' in heading_text or 'activité' in heading_text:
-                content = heading.find_next(['p', 'div', 'ul'])
-                if content:
-                    sections['missions'] = content.get_text(strip=True)[:500]
-
-            elif 'formation' in heading_text or 'expérience' in heading_text:
-                content = heading.find_next(['p', 'div', 'ul'])
-                if content:
-                    sections['formation'] = content.get_text(strip=True)[:500]
-
-            elif 'savoir-faire' in heading_text or 'compétence' in heading_text:
-                content = heading.find_next(['p', 'div', 'ul'])
-                if content:
-                    sections['competences'] = content.get_text(strip=True)[:500]
-
-            elif 'salaire' in heading_text or 'rémunération' in heading_text:
-                content = heading.find_next(['p', 'div', 'ul'])
-                if content:
-                    sections['salaire'] = content.get_text(strip=True)[:500]
-
-            elif 'évolution' in heading_text:
-                content = heading.find_next(['p', 'div', 'ul'])
-                if content:
-                    sections['evolutions'] = content.get_text(strip=True)[:500]
-
-        # Extraire salaire (chercher pattern monétaire)
-        salary_min = 30000
-        salary_max = 50000
-
-        salary_text = sections['salaire'] or soup.get_text()
-
-        # Pattern: "35 000 € à 55 000 €" ou "35k-55k"
-        salary_patterns = [
-            r'(\d+\s*\d*)\s*000\s*€\s*(?:à|et|-)\s*(\d+\s*\d*)\s*000\s*€',
-            r'(\d+)\s*k€?\s*(?:à|et|-)\s*(\d+)\s*k€?',
-            r'entre\s*(\d+\s*\d*)\s*(?:et|à)\s*(\d+\s*\d*)'
-        ]
-
-        for pattern in salary_patterns:
-            match = re.search(pattern, salary_text, re.IGNORECASE)
-            if match:
-                try:
-                    min_val = int(match.group(1).replace(' ', ''))
-                    max_val = int(match.group(2).replace(' ', ''))
-
-                    # Si c'est en "k", multiplier par 1000
-                    if 'k' in pattern:
-                        min_val *= 1000
-                        max_val *= 1000
-
-                    salary_min = min_val
-                    salary_max = max_val
-                    break
-                except:
-                    pass
-
-        # Extraire compétences (chercher des listes)
-        skills = []
-        for ul in soup.find_all('ul'):
-            parent_heading = ul.find_previous(['h2', 'h3', 'h4'])
-            if parent_heading and 'compétence' in parent_heading.get_text().lower():
-                for li in ul.find_all('li')[:5]:
-                    skill = li.get_text(strip=True)
-                    if skill:
-                        skills.append(skill)
-
-        if not skills:
-            skills = ["Communication", "Organisation", "Analyse", "Gestion de projet"]
-
-        # Construire l'objet métier
-        job_data = {
-            "title": title,
-            "slug": slug,
-            "sector": job_info['category'],
-            "description": sections['missions'] or f"Métier dans le domaine {job_info['category']}",
-            "missions": sections['missions'],
-            "formation_required": sections['formation'],
-            "competences_required": sections['competences'],
-            "salary_info": sections['salaire'],
-            "evolutions": sections['evolutions'],
-            "salary": {
-                "min": salary_min,
-                "max": salary_max,
-                "currency": "EUR"
-            },
-            "required_skills": skills,
-            "required_education": extract_education(sections['formation']),
-            "formations": [
-                {
-                    "title": f"Formation {title}",
-                    "provider": "APEC",
-                    "duration": 12,
-                    "cost": 5000
-                }
-            ],
-            "mbti_fit": ["ENTJ", "ESTJ", "INTJ"],
-            "enneagram_fit": [3, 8, 1],
-            "riasec_codes": "EAS",
-            "growth_rate": 7.0,
-            "job_openings_yearly": 1000,
-            "competition_level": "Medium",
-            "working_conditions": {
-                "hours_per_week": "35-39",
-                "remote_possible": True,
-                "travel_required": False
-            },
-            "pros": ["Salaire attractif", "Évolution de carrière", "Secteur dynamique"],
-            "cons": ["Responsabilités", "Pression", "Horaires variables"],
-            "similar_jobs": [],
-            "source": "APEC",
-            "url": job_info['url']
-        }
-
-        return job_data
-
-    except Exception as e:
-        print(f"       ✗ Erreur parse détails: {str(e)[:60]}")
-        return None
-
-
-def extract_education(formation_text):
-    """Extraire les niveaux d'éducation du texte"""
-    education_levels = []
-
-    if not formation_text:
-        return ["Bac+5"]
-
-    text_lower = formation_text.lower()
-
-    if 'bac+5' in text_lower or 'master' in text_lower or 'ingénieur' in text_lower:
-        education_levels.append("Bac+5")
-    if 'bac+3' in text_lower or 'licence' in text_lower:
-        education_levels.append("Bac+3")
-    if 'bac+2' in text_lower or 'bts' in text_lower or 'dut' in text_lower:
-        education_levels.append("Bac+2")
-    if 'doctorat' in text_lower or 'phd' in text_lower:
-        education_levels.append("Doctorat")
-
-    return education_levels if education_levels else ["Bac+5"]
-
 
 if __name__ == "__main__":
-    jobs = asyncio.run(scrape_apec_complete())
+    parser = argparse.ArgumentParser(description="Scraping des fiches métiers APEC")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Pages rendues en parallèle (défaut: DECLIC_CRAWL_WORKERS ou 4)")
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS,
+                        help="Requêtes par seconde max vers apec.fr (défaut: DECLIC_CRAWL_RPS ou 0.5)")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Reprendre le crawl depuis {JOURNAL_FILE} (fiches déjà extraites ignorées)")
+    parser.add_argument("--compact-only", action="store_true",
+                        help=f"Produire {OUTPUT_FILE} depuis le journal sans crawler")
+    parser.add_argument("--offline", action="store_true",
+                        help="Rejouer depuis le cache de pages sans contacter le site")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default='html.parser',
+                        help="Backend HTML des fiches (lxml: plus rapide, voir bench_parser.py)")
+    args = parser.parse_args()
+
+    if args.compact_only:
+        jobs = compact_journal()
+    else:
+        jobs = asyncio.run(scrape_apec_complete(workers=args.workers, rps=args.rps, resume=args.resume,
+                                               offline=args.offline or None, parser_backend=args.parser))
     print(f"\n📊 RÉSUMÉ: {len(jobs)} métiers scrappés avec succès!")
@@ -1,14 +1,23 @@
 import asyncio
+import contextlib
 import json
 import os
 from crawl4ai import AsyncWebCrawler
 from bs4 import BeautifulSoup
 import time
 
+from apec_parser import parse_apec_fiche_detail
+from columnar_catalog import save_jobs_catalog
+from page_cache import page_cache_from_env
+
 async def scrape_apec_all_jobs():
     """Scrape APEC avec support JavaScript"""
     
     all_jobs = []
+
+    # Cache de pages (DECLIC_PAGE_CACHE_OFFLINE=1 pour rejouer sans le site)
+    cache = page_cache_from_env()
+    crawler_context = contextlib.nullcontext() if cache.offline else AsyncWebCrawler()
     
     # Crawl4AI config pour gérer JavaScript
     config = {
@@ -17,7 +26,7 @@ async def scrape_apec_all_jobs():
         'verbose': True
     }
     
-    async with AsyncWebCrawler() as crawler:
+    async with crawler_context as crawler:
         print("🔄 Scraping APEC (avec JavaScript)...")
         print("="*70)
         
@@ -28,7 +37,8 @@ async def scrape_apec_all_jobs():
             print(f"\n📍 Scraping page principale: {main_url}")
             
             # Scraper avec JavaScript rendering
-            result = await crawler.arun(
+            result = await cache.fetch(
+                crawler,
                 main_url,
                 wait_for='div.job-list, div.metier, article',
                 timeout=30000
@@ -78,7 +88,8 @@ async def scrape_apec_all_jobs():
                     print(f"\n  [{idx}] Scraping: {full_url}")
                     
                     # Scraper la fiche avec timeout
-                    fiche_result = await crawler.arun(
+                    fiche_result = await cache.fetch(
+                        crawler,
                         full_url,
                         wait_for='h1, .metier-title, .job-title',
                         timeout=15000
@@ -97,7 +108,9 @@ async def scrape_apec_all_jobs():
                     else:
                         print(f"     ✗ Pas de données extraites")
                     
-                    # Délai pour éviter blocage
+                    # Délai pour éviter blocage (inutile si la page vient du cache)
+                    if fiche_result.from_cache:
+                        continue
                     if idx % 5 == 0:
                         print(f"     ⏳ Pause (5s)...")
                         await asyncio.sleep(5)
@@ -128,11 +141,13 @@ async def scrape_apec_all_jobs():
     
     with open('data/jobs/apec-jobs.json', 'w', encoding='utf-8') as f:
         json.dump(final_data, f, indent=2, ensure_ascii=False)
+    save_jobs_catalog(final_data, 'data/jobs/apec-jobs.json')
     
     print("\n" + "="*70)
     print("✅ SCRAPING APEC COMPLET!")
     print("="*70)
     print(f"✓ Total métiers scrappés: {len(all_jobs)}")
+    print(f"✓ Cache de pages: {cache.stats}")
     print(f"✓ Fichier: data/jobs/apec-jobs.json")
     if len(all_jobs) > 0:
         print(f"✓ Taille: {os.path.getsize('data/jobs/apec-jobs.json') / 1024:.2f} KB")
@@ -140,116 +155,6 @@ async def scrape_apec_all_jobs():
     
     return all_jobs
 
-def parse_apec_fiche_detail(html, url):
-    """Parser une fiche métier APEC en détail"""
-    
-    try:
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Extraire titre (plusieurs variantes)
-        title = None
-        for selector in ['h1', '.metier-title', '.job-title', '[data-title]']:
-            elem = soup.select_one(selector)
-            if elem:
-                title = elem.text.strip()
-                break
-        
-        if not title:
-            return None
-        
-        # Extraire description
-        description = ""
-        for desc_elem in soup.find_all(['p', 'div'], class_=['description', 'desc']):
-            description = desc_elem.text.strip()
-            if len(description) > 50:
-                break
-        
-        if not description:
-            # Fallback: prendre le premier paragraphe
-            p = soup.find('p')
-            if p:
-                description = p.text.strip()[:200]
-        
-        # Extraire salaire (pattern: "35 000 à 55 000 €")
-        salary_min = 35000
-        salary_max = 55000
-        
-        for text in soup.stripped_strings:
-            if '€' in text and 'à' in text:
-                # Extraire chiffres
-                import re
-                numbers = re.findall(r'\d+\s*\d*\s*000', text)
-                if len(numbers) >= 2:
-                    try:
-                        salary_min = int(numbers[0].replace(" ", ""))
-                        salary_max = int(numbers[1].replace(" ", ""))
-                        break
-                    except:
-                        pass
-        
-        # Créer l'objet métier
-        job = {
-            "title": title,
-            "slug": title.lower().replace(" ", "-").replace("'", "").replace("(", "").replace(")", ""),
-            "sector": "Business",  # APEC = cadres
-            "description": description or f"Expert en {title.lower()}",
-            "salary": {
-                "min": salary_min,
-                "max": salary_max,
-                "currency": "EUR"
-            },
-            "required_skills": [
-                "Leadership",
-                "Management",
-                "Communication",
-                "Strategic Thinking",
-                "Problem Solving"
-            ],
-            "required_education": ["Bac+5", "MBA"],
-            "formations": [
-                {
-                    "title": f"Formation {title}",
-                    "provider": "APEC",
-                    "duration": 12,
-                    "cost": 5000
-                }
-            ],
-            "mbti_fit": ["ENTJ", "INTJ", "ESTJ"],
-            "enneagram_fit": [3, 8, 1],
-            "riasec_codes": "EAS",
-            "growth_rate": 8.5,
-            "job_openings_yearly": 1500,
-            "competition_level": "Medium",
-            "working_conditions": {
-                "hours_per_week": "35-45",
-                "remote_possible": True,
-                "travel_required": True
-            },
-            "pros": [
-                "Bon salaire",
-                "Évolution rapide",
-                "Télétravail possible"
-            ],
-            "cons": [
-                "Stress élevé",
-                "Responsabilités importantes",
-                "Déplacements fréquents"
-            ],
-            "similar_jobs": [
-                "Manager",
-                "Consultant",
-                "Director"
-            ],
-            "source": "APEC",
-            "url": url
-        }
-        
-        return job
-        
-    except Exception as e:
-        print(f"     ✗ Erreur parse: {str(e)[:60]}")
-        return None
-
 if __name__ == "__main__":
     jobs = asyncio.run(scrape_apec_all_jobs())
     print(f"\n📊 Résumé final: {len(jobs)} métiers scrappés")
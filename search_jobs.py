@@ -1,96 +1,661 @@
 #!/usr/bin/env python3
 """
-Script de recherche sémantique dans ChromaDB via LangChain
-Appelé par l'API Next.js via subprocess
+Script de recherche sémantique des métiers
+Index NumPy memory-mappé (data/vector_index) si présent, sinon ChromaDB via LangChain
+Modes : vector (embeddings), lexical (BM25, sans appel réseau) ou hybrid (fusion RRF)
+Filtres (secteur, salaire, niveau d'études, télétravail) résolus sur le catalogue SQLite
+avant le scoring
+Appelé par l'API Next.js via subprocess, ou chargé une seule fois par search_server.py
+Durée de chaque étape mesurée par search_metrics.py (bloc "timings", export Prometheus)
+
+Démarrage à froid (CLI, cron, repli de l'API) : seuls des modules légers sont
+importés au chargement ; NumPy, hnswlib, python-dotenv, LangChain et le client
+OpenAI le sont à la première utilisation. Budget vérifié par import_budget.py.
 """
 
 import sys
 import json
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
 
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+CLI_FLAGS = ("--batch", "--fuse", "--timings", "--metrics")
+CLI_USAGE = ("Usage: python search_jobs.py [--batch [--fuse]] [--timings] [--metrics] "
+             "<query | requêtes JSON> [n_results] [vector|lexical|hybrid] [filtres JSON]")
+
+
+def parse_cli(argv: list) -> dict:
+    """Arguments de la CLI ; usage ou JSON invalide : erreur JSON et sortie (code 1)"""
+    args = [arg for arg in argv if arg not in CLI_FLAGS]
+    if not args:
+        print(json.dumps({"error": CLI_USAGE}))
+        sys.exit(1)
+
+    try:
+        query = json.loads(args[0]) if "--batch" in argv else args[0]
+        filters = json.loads(args[3]) if len(args) > 3 else None
+    except json.JSONDecodeError:
+        print(json.dumps({"error": "Requêtes ou filtres JSON invalides", "jobs": []}))
+        sys.exit(1)
+
+    try:
+        n_results = int(args[1]) if len(args) > 1 else 5
+    except ValueError:
+        print(json.dumps({"error": CLI_USAGE}))
+        sys.exit(1)
+
+    return {
+        'query': query,
+        'n_results': n_results,
+        'mode': args[2] if len(args) > 2 and args[2] else None,
+        'filters': filters,
+        'fuse': "--fuse" in argv,
+        # --timings : bloc "timings" dans la réponse ; --metrics : export Prometheus sur stderr
+        'timings': "--timings" in argv,
+        'metrics': "--metrics" in argv,
+    }
+
+
+# CLI : arguments vérifiés avant les imports du projet, une erreur d'usage répond aussitôt
+CLI_ARGS = parse_cli(sys.argv[1:]) if __name__ == "__main__" else None
+
+# Importé avant les autres modules du projet : mesure la durée de leurs imports
+from search_metrics import REGISTRY, collect_timings, process_timings, record_imports, rounded, serialize, stage
+
+from embedding_cache import CachedEmbeddings, cache_from_env
+from embedding_providers import get_embeddings, requires_api_key, spec_from_manifest, spec_id
+from index_manifest import load_manifest
+from job_catalog import CATALOG_FILE, catalog_for, normalize_filters
+from lexical_index import LEXICAL_INDEX_FILE, lexical_index_for, reciprocal_rank_fusion
+
+ENV_FILE = ".env.local"
+
+
+def load_env_file(path: str = ENV_FILE):
+    """Variables d'environnement du fichier, python-dotenv importé seulement s'il existe"""
+    if Path(path).exists():
+        from dotenv import load_dotenv
+        load_dotenv(path)
+
 
 # Charger les variables d'environnement
-load_dotenv(".env.local")
+load_env_file()
+
+CHROMA_DIR = "data/chroma_db"
+JOBS_FILE = "data/jobs/apec-jobs.json"
+# Comme dans vector_index.py, qui n'est importé (avec NumPy) qu'à l'ouverture de l'index
+VECTOR_INDEX_DIR = "data/vector_index"
+VECTORS_FILE = "vectors.npy"
+
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+DEFAULT_SEARCH_MODE = os.getenv("DECLIC_SEARCH_MODE", "vector")
+
+# Candidats par classement avant fusion (mode hybride)
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+# Requêtes fusionnées (--fuse) : au moins la profondeur des tables de recommandations
+# (recommendation_tables.MAX_RECOMMENDATIONS), qui reproduisent cette recherche
+FUSED_CANDIDATES = 25
+
+MAX_BATCH_QUERIES = 32
+# Résultats par requête (CLI, /search, /recommendations) : au moins 1, au plus MAX_RESULTS
+MAX_RESULTS = 50
+
+# Score d'un métier à partir de ses chunks : max (meilleur chunk) ou sum_top
+SEARCH_AGGREGATE = os.getenv("DECLIC_SEARCH_AGGREGATE", "max")
+AGGREGATE_TOP_CHUNKS = int(os.getenv("DECLIC_SEARCH_AGGREGATE_TOP", "2"))
+# Premier sur-échantillonnage de ChromaDB (chunks demandés par métier voulu)
+CHUNKS_PER_JOB_ESTIMATE = 3
+
+# auto : index NumPy s'il existe (graphe HNSW s'il a été construit), sinon ChromaDB ;
+# numpy : index NumPy en scan exact ; chroma : ChromaDB
+SEARCH_BACKEND = os.getenv("DECLIC_SEARCH_BACKEND", "auto")
+
+# Les requêtes sont embeddées avec le fournisseur qui a construit l'index
+EMBEDDING_SPEC = spec_from_manifest(load_manifest(CHROMA_DIR))
+
+# Cache des embeddings de requêtes, partagé par toutes les recherches du processus
+embedding_cache = cache_from_env(spec_id(EMBEDDING_SPEC))
+
+# Index partagés : ouverts une seule fois par processus (mode serveur)
+_vectorstore = None
+_vector_index = None
+_ann_index = None
+_ann_loaded = False
+_query_embeddings = None
+_lexical_index = None
+_catalog = None
+_vectorstore_lock = threading.Lock()
+
+record_imports()
+
+
+def use_vector_index() -> bool:
+    """True si les recherches passent par l'index NumPy plutôt que ChromaDB"""
+    if SEARCH_BACKEND == "chroma":
+        return False
+    if SEARCH_BACKEND == "numpy":
+        return True
+    return Path(VECTOR_INDEX_DIR, VECTORS_FILE).exists()
+
+
+def get_query_embeddings(api_key: str):
+    """Embeddings du manifeste, requêtes servies par le cache si possible"""
+    global _query_embeddings
+
+    if _query_embeddings is None:
+        with _vectorstore_lock:
+            if _query_embeddings is None:
+                with stage("open_index"):
+                    # Client HTTP direct pour OpenAI : ni LangChain ni SDK à importer
+                    embeddings = get_embeddings(EMBEDDING_SPEC, api_key=api_key, queries_only=True)
+                _query_embeddings = CachedEmbeddings(embeddings, embedding_cache)
+    return _query_embeddings
+
+
+def get_vector_index():
+    """
+    Retourne l'index NumPy memory-mappé, ouvert au premier appel puis réutilisé
+
+    Returns:
+        VectorIndex ou None si l'index n'existe pas
+    """
+    global _vector_index
+
+    if _vector_index is None:
+        with _vectorstore_lock:
+            if _vector_index is None:
+                with stage("open_index"):
+                    # Import différé : NumPy n'est pas chargé en mode lexical
+                    from vector_index import VectorIndex
+                    _vector_index = VectorIndex.load(VECTOR_INDEX_DIR)
+    return _vector_index
+
+
+def get_ann_index():
+    """
+    Retourne le graphe HNSW de l'index NumPy, ouvert au premier appel
+
+    Returns:
+        HNSWIndex ou None (pas de graphe, hnswlib absent, graphe périmé ou
+        DECLIC_SEARCH_BACKEND=numpy) : la recherche reste exacte
+    """
+    global _ann_index, _ann_loaded
+
+    if not _ann_loaded:
+        index = get_vector_index()
+        with _vectorstore_lock:
+            if not _ann_loaded:
+                with stage("open_index"):
+                    ann = None
+                    if SEARCH_BACKEND == "auto" and index is not None:
+                        from hnsw_index import HNSWIndex
+                        ann = HNSWIndex.load(VECTOR_INDEX_DIR)
+                if ann is not None and not ann.covers(index):
+                    print("⚠️  Graphe HNSW périmé : recherche exacte", file=sys.stderr)
+                    ann = None
+                _ann_index = ann
+                _ann_loaded = True
+    return _ann_index
 
 
-def search_jobs(query: str, n_results: int = 5) -> dict:
+def get_lexical_index():
+    """
+    Retourne l'index BM25, chargé (ou construit depuis JOBS_FILE) au premier appel
+
+    Returns:
+        LexicalIndex ou None si ni l'index ni le fichier des métiers n'existent
+    """
+    global _lexical_index
+
+    if _lexical_index is None:
+        with _vectorstore_lock:
+            if _lexical_index is None:
+                with stage("open_index"):
+                    _lexical_index = lexical_index_for(JOBS_FILE, LEXICAL_INDEX_FILE)
+    return _lexical_index
+
+
+def get_catalog():
+    """
+    Retourne le catalogue typé, ouvert (ou construit en mémoire) au premier appel
+
+    Returns:
+        JobCatalog ou None si ni le catalogue ni le fichier des métiers n'existent
     """
-    Recherche sémantique des métiers dans ChromaDB via LangChain
+    global _catalog
+
+    if _catalog is None:
+        with _vectorstore_lock:
+            if _catalog is None:
+                with stage("open_index"):
+                    _catalog = catalog_for(JOBS_FILE, CATALOG_FILE)
+    return _catalog
+
+
+@lru_cache(maxsize=256)
+def filtered_job_keys(filters: tuple):
+    """Métiers qui respectent les filtres normalisés (None = pas de filtre)"""
+    if not filters:
+        return None
+    catalog = get_catalog()
+    if catalog is None:
+        raise ValueError("Catalogue des métiers introuvable : filtres indisponibles")
+    with stage("filters"):
+        return catalog.matching_slugs(filters)
+
+
+@lru_cache(maxsize=256)
+def filtered_vector_rows(filters: tuple):
+    """Lignes de l'index NumPy des métiers filtrés (None = toutes)"""
+    job_keys = filtered_job_keys(filters)
+    if job_keys is None:
+        return None
+    index = get_vector_index()
+    with stage("filters"):
+        return index.rows_for(job_keys)
+
+
+@lru_cache(maxsize=256)
+def filtered_lexical_docs(filters: tuple):
+    """Documents de l'index BM25 des métiers filtrés (None = tous)"""
+    job_keys = filtered_job_keys(filters)
+    return None if job_keys is None else get_lexical_index().docs_for(job_keys)
+
+
+def get_vectorstore(api_key: str):
+    """
+    Retourne le vectorstore ChromaDB, ouvert au premier appel puis réutilisé
 
     Args:
-        query: Question ou description de l'utilisateur
-        n_results: Nombre de résultats à retourner
+        api_key: Clé OpenAI (uniquement pour un index construit avec OpenAI)
 
     Returns:
-        dict: Résultats de recherche avec métadonnées
+        Chroma ou None si la base n'existe pas
     """
+    global _vectorstore
+
+    if _vectorstore is not None:
+        return _vectorstore
+
+    embeddings = get_query_embeddings(api_key)
+
+    with _vectorstore_lock:
+        if _vectorstore is None:
+            if not Path(CHROMA_DIR).exists():
+                return None
+
+            # Import différé : inutile quand l'index NumPy est utilisé
+            from langchain_community.vectorstores import Chroma
+
+            with stage("open_index"):
+                _vectorstore = Chroma(
+                    persist_directory=CHROMA_DIR,
+                    embedding_function=embeddings,
+                    collection_name="jobs",
+                )
+
+    return _vectorstore
+
+
+def get_index(api_key: str):
+    """Index utilisé pour les recherches (NumPy ou ChromaDB), None s'il n'existe pas"""
+    return get_vector_index() if use_vector_index() else get_vectorstore(api_key)
+
 
+def job_result(metadata: dict, excerpt: str, score: float) -> dict:
+    """Résultat renvoyé à l'API pour un métier"""
+    return {
+        'title': metadata.get('title', ''),
+        'sector': metadata.get('sector', ''),
+        'salary_min': str(metadata.get('salary_min', '')),
+        'salary_max': str(metadata.get('salary_max', '')),
+        'slug': metadata.get('slug', ''),
+        'url': metadata.get('url', ''),
+        'relevance_score': round(score, 4),
+        'excerpt': excerpt[:300],
+    }
+
+
+def aggregate_chunks(chunks, n_jobs: int) -> list:
+    """
+    Agrège des chunks classés par métier (même règle que VectorIndex.search_jobs_many)
+
+    Args:
+        chunks: [(métadonnées, texte, score)]
+        n_jobs: Nombre de métiers à garder
+
+    Returns:
+        list: [(métadonnées, texte du meilleur chunk, score du métier)]
+    """
+    groups = {}
+    for metadata, text, score in chunks:
+        key = metadata.get('slug') or metadata.get('title', '')
+        groups.setdefault(key, []).append((score, metadata, text))
+
+    aggregated = []
+    for group in groups.values():
+        group.sort(key=lambda item: -item[0])
+        if SEARCH_AGGREGATE == "sum_top":
+            score = sum(item[0] for item in group[:AGGREGATE_TOP_CHUNKS]) / AGGREGATE_TOP_CHUNKS
+        else:
+            score = group[0][0]
+        aggregated.append((group[0][1], group[0][2], score))
+
+    aggregated.sort(key=lambda item: -item[2])
+    return aggregated[:n_jobs]
+
+
+def chroma_jobs(vectorstore, query_vectors: list, n_jobs: int, job_keys):
+    """
+    Métiers distincts via ChromaDB, qui ne renvoie que des chunks
+
+    Sur-échantillonnage adaptatif : k est doublé pour les requêtes qui n'ont
+    pas encore n_jobs métiers distincts, jusqu'à épuiser la collection.
+    """
+    collection = vectorstore._collection
+    total = collection.count()
+    where = {"slug": {"$in": sorted(job_keys)}} if job_keys is not None else None
+    relevance = vectorstore._select_relevance_score_fn()
+
+    results = [[] for _ in query_vectors]
+    pending = list(range(len(query_vectors)))
+    fetch = n_jobs * CHUNKS_PER_JOB_ESTIMATE
+
+    while pending and total:
+        fetch = min(fetch, total)
+        found = collection.query(
+            query_embeddings=[query_vectors[i] for i in pending],
+            n_results=fetch,
+            where=where,
+            include=["metadatas", "documents", "distances"],
+        )
+
+        still_pending = []
+        for i, metadatas, documents, distances in zip(pending, found["metadatas"], found["documents"],
+                                                      found["distances"]):
+            chunks = [(metadata, text, relevance(distance))
+                      for metadata, text, distance in zip(metadatas, documents, distances)]
+            results[i] = aggregate_chunks(chunks, n_jobs)
+            # Moins de chunks que demandé : les filtres ont épuisé les candidats
+            if len(results[i]) < n_jobs and len(chunks) == fetch and fetch < total:
+                still_pending.append(i)
+
+        pending = still_pending
+        fetch *= 2
+
+    return results
+
+
+def vector_jobs(queries: list, n_jobs: int, api_key: str, filters: tuple = ()):
+    """
+    Pour chaque requête, les n_jobs métiers distincts les plus proches
+
+    Toutes les requêtes sont embeddées en un seul appel puis scorées ensemble
+    (un produit matrice-matrice sur l'index NumPy, une requête Chroma groupée).
+    Les scores des chunks sont agrégés par métier (DECLIC_SEARCH_AGGREGATE).
+
+    Returns:
+        list: Pour chaque requête, la liste des métiers ; None si l'index n'existe pas
+    """
+    job_keys = filtered_job_keys(filters)
+
+    if use_vector_index():
+        index = get_vector_index()
+        if index is None:
+            return None
+        rows = filtered_vector_rows(filters)
+        if rows is not None and len(rows) == 0:
+            # Aucun métier ne passe les filtres : pas d'appel d'embeddings
+            return [[] for _ in queries]
+        embeddings = get_query_embeddings(api_key)
+        with stage("embed"):
+            query_vectors = embeddings.embed_queries(queries)
+        ann = get_ann_index()
+        with stage("vector_search"):
+            if ann is not None:
+                hits_per_query = ann.search_jobs_many(index, query_vectors, n_jobs, rows=rows,
+                                                      aggregate=SEARCH_AGGREGATE, top_chunks=AGGREGATE_TOP_CHUNKS)
+            else:
+                hits_per_query = index.search_jobs_many(query_vectors, n_jobs, rows=rows, aggregate=SEARCH_AGGREGATE,
+                                                        top_chunks=AGGREGATE_TOP_CHUNKS)
+        return [
+            [job_result(index.chunks[row]['metadata'], index.chunks[row]['text'], score) for row, score in hits]
+            for hits in hits_per_query
+        ]
+
+    vectorstore = get_vectorstore(api_key)
+    if vectorstore is None:
+        return None
+    if job_keys is not None and not job_keys:
+        return [[] for _ in queries]
+
+    embeddings = get_query_embeddings(api_key)
+    with stage("embed"):
+        query_vectors = embeddings.embed_queries(queries)
+    with stage("vector_search"):
+        found = chroma_jobs(vectorstore, query_vectors, n_jobs, job_keys)
+    return [
+        [job_result(metadata, text, score) for metadata, text, score in jobs]
+        for jobs in found
+    ]
+
+
+def lexical_jobs(query: str, k: int, filters: tuple = ()):
+    """
+    Les k métiers de meilleur score BM25 (None si l'index n'existe pas)
+
+    Le score est ramené entre 0 et 1 par rapport au meilleur score BM25.
+    """
+    index = get_lexical_index()
+    if index is None:
+        return None
+
+    allowed = filtered_lexical_docs(filters)
+    with stage("lexical_search"):
+        ranked = index.search(query, k, allowed=allowed)
+    top_score = max((score for _, score in ranked), default=1.0)
+    return [job_result(index.docs[doc], index.docs[doc]['excerpt'], score / top_score) for doc, score in ranked]
+
+
+def fused_candidates(n_results: int) -> int:
+    """Candidats par requête avant la fusion RRF d'une liste de requêtes"""
+    return max(FUSED_CANDIDATES, n_results)
+
+
+def fuse_rankings(job_lists: list, n_results: int) -> list:
+    """
+    Fusion RRF de plusieurs classements de métiers
+
+    Le score RRF est normalisé : 1.0 pour un métier classé premier partout.
+    Pour un métier présent dans plusieurs listes, la dernière fournit l'extrait.
+    """
+    candidates = {}
+    rankings = []
+    for jobs in job_lists:
+        ranking = []
+        for job in jobs:
+            key = job['slug'] or job['title']
+            candidates[key] = job
+            ranking.append(key)
+        rankings.append(ranking)
+
+    if not rankings:
+        return []
+    max_score = len(rankings) / (RRF_K + 1)
+    return [
+        dict(candidates[key], relevance_score=round(score / max_score, 4))
+        for key, score in reciprocal_rank_fusion(rankings, k=RRF_K)[:n_results]
+    ]
+
+
+def hybrid_jobs(queries: list, n_results: int, api_key: str, filters: tuple = ()):
+    """Pour chaque requête, fusion RRF des classements lexical et vectoriel"""
+    depth = max(HYBRID_CANDIDATES, n_results)
+    vector = vector_jobs(queries, depth, api_key, filters)
+    lexical = [lexical_jobs(query, depth, filters) for query in queries]
+    if vector is None and lexical[0] is None:
+        return None
+
+    # Les extraits vectoriels (chunk le plus proche) sont préférés
+    with stage("fuse"):
+        return [
+            fuse_rankings([lexical[i] or [], vector[i] if vector else []], n_results)
+            for i in range(len(queries))
+        ]
+
+
+def n_results_error(n_results):
+    """Message d'erreur si n_results n'est pas un entier entre 1 et MAX_RESULTS, None sinon"""
+    if isinstance(n_results, bool) or not isinstance(n_results, int) or not 1 <= n_results <= MAX_RESULTS:
+        return f"n_results doit être un entier entre 1 et {MAX_RESULTS}"
+    return None
+
+
+def request_error(query, n_results: int = 5, mode: str = None, filters: dict = None):
+    """
+    Message d'erreur d'une requête invalide (requêtes, nombre de résultats,
+    mode ou filtres), None sinon
+
+    Erreurs de l'appelant, distinguées des pannes (index absent, clé API) :
+    400 pour search_server.py, code de sortie 1 pour la CLI
+    """
+    if isinstance(query, str):
+        queries = [query]
+    elif isinstance(query, (list, tuple)):
+        queries = list(query)
+    else:
+        queries = []
+    if not queries or not all(isinstance(q, str) and q for q in queries):
+        return "Les requêtes doivent être des chaînes non vides"
+    if len(queries) > MAX_BATCH_QUERIES:
+        return f"Au plus {MAX_BATCH_QUERIES} requêtes par appel"
+
+    error = n_results_error(n_results)
+    if error:
+        return error
+
+    if (mode or DEFAULT_SEARCH_MODE) not in SEARCH_MODES:
+        return f"Mode de recherche inconnu: {mode} ({', '.join(SEARCH_MODES)})"
+
+    try:
+        normalize_filters(filters)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def search_jobs(query, n_results: int = 5, mode: str = None, filters: dict = None, fuse: bool = False,
+                timings: bool = False) -> dict:
+    """
+    Recherche des métiers (sémantique, lexicale ou hybride)
+
+    Args:
+        query: Question ou description de l'utilisateur, ou liste de requêtes
+            (recherche groupée : un seul appel d'embeddings pour toutes)
+        n_results: Nombre de résultats à retourner (par requête)
+        mode: vector, lexical ou hybrid (défaut: DECLIC_SEARCH_MODE ou vector)
+        filters: {sectors, salary_min, salary_max, max_education, remote_possible}
+            (voir job_catalog.normalize_filters)
+        fuse: Liste de requêtes uniquement : fusionner les classements (RRF) en
+            une seule liste de n_results métiers
+        timings: Ajouter la durée de chaque étape de cette recherche (ms) dans "timings"
+
+    Returns:
+        dict: Résultats de recherche avec métadonnées ; pour une liste de requêtes,
+            "results" (un bloc par requête) ou "jobs" (fusionnés)
+    """
+    with collect_timings() as stages:
+        with stage("search"):
+            results = _search_jobs(query, n_results, mode, filters, fuse)
+    if timings:
+        results['timings'] = rounded(stages)
+    return results
+
+
+def _search_jobs(query, n_results: int, mode: str, filters: dict, fuse: bool) -> dict:
+    error = request_error(query, n_results, mode, filters)
+    if error:
+        return {"error": error, "jobs": []}
+
+    batch = not isinstance(query, str)
+    queries = list(query) if batch else [query]
+    mode = mode or DEFAULT_SEARCH_MODE
+    filters = normalize_filters(filters)
+
+    # Le mode lexical n'appelle jamais le fournisseur d'embeddings
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if mode != "lexical" and requires_api_key(EMBEDDING_SPEC) and not api_key:
         return {"error": "OPENAI_API_KEY manquante", "jobs": []}
 
-    # Initialiser les embeddings OpenAI
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-small",
-        openai_api_key=api_key,
-    )
-
-    # Connecter à ChromaDB existant
-    chroma_dir = "data/chroma_db"
-    if not Path(chroma_dir).exists():
-        return {"error": "Base ChromaDB introuvable. Lancez setup_rag.py d'abord.", "jobs": []}
-
-    vectorstore = Chroma(
-        persist_directory=chroma_dir,
-        embedding_function=embeddings,
-        collection_name="jobs",
-    )
-
-    # Recherche avec score de similarité
-    results_with_scores = vectorstore.similarity_search_with_relevance_scores(
-        query,
-        k=n_results,
-    )
-
-    # Dédupliquer par titre (un même métier peut avoir plusieurs chunks)
-    seen_titles = set()
-    jobs = []
-
-    for doc, score in results_with_scores:
-        title = doc.metadata.get('title', '')
-        if title in seen_titles:
-            continue
-        seen_titles.add(title)
-
-        jobs.append({
-            'title': title,
-            'sector': doc.metadata.get('sector', ''),
-            'salary_min': doc.metadata.get('salary_min', ''),
-            'salary_max': doc.metadata.get('salary_max', ''),
-            'slug': doc.metadata.get('slug', ''),
-            'url': doc.metadata.get('url', ''),
-            'relevance_score': round(score, 4),
-            'excerpt': doc.page_content[:300],
-        })
+    # Plus de candidats par requête quand les classements sont fusionnés ensuite
+    depth = fused_candidates(n_results) if batch and fuse else n_results
+
+    # Index ouverts une seule fois puis réutilisés entre les appels
+    try:
+        if mode == "lexical":
+            per_query = [lexical_jobs(q, depth, filters) for q in queries]
+            per_query = None if per_query[0] is None else per_query
+        elif mode == "hybrid":
+            per_query = hybrid_jobs(queries, depth, api_key, filters)
+        else:
+            per_query = vector_jobs(queries, depth, api_key, filters)
+    except ValueError as e:
+        return {"error": str(e), "jobs": []}
+
+    if per_query is None:
+        return {"error": "Index de recherche introuvable. Lancez setup_rag.py d'abord.", "jobs": []}
+
+    if not batch:
+        return {
+            'query': query,
+            'mode': mode,
+            'filters': dict(filters),
+            'n_results': len(per_query[0]),
+            'jobs': per_query[0],
+        }
+
+    if fuse:
+        with stage("fuse"):
+            jobs = fuse_rankings(per_query, n_results)
+        return {
+            'queries': queries,
+            'mode': mode,
+            'filters': dict(filters),
+            'fused': True,
+            'n_results': len(jobs),
+            'jobs': jobs,
+        }
 
     return {
-        'query': query,
-        'n_results': len(jobs),
-        'jobs': jobs,
+        'queries': queries,
+        'mode': mode,
+        'filters': dict(filters),
+        'results': [
+            {'query': q, 'n_results': len(jobs), 'jobs': jobs}
+            for q, jobs in zip(queries, per_query)
+        ],
     }
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: python search_jobs.py <query> [n_results]"}))
+    # Requête invalide : même sortie que les erreurs d'usage (code 1)
+    error = request_error(CLI_ARGS['query'], CLI_ARGS['n_results'], CLI_ARGS['mode'], CLI_ARGS['filters'])
+    if error:
+        print(json.dumps({"error": error, "jobs": []}))
         sys.exit(1)
 
-    query = sys.argv[1]
-    n_results = int(sys.argv[2]) if len(sys.argv) > 2 else 5
-
-    results = search_jobs(query, n_results)
-    print(json.dumps(results, ensure_ascii=False, indent=2))
+    results = search_jobs(CLI_ARGS['query'], CLI_ARGS['n_results'], CLI_ARGS['mode'], CLI_ARGS['filters'],
+                          fuse=CLI_ARGS['fuse'], timings=CLI_ARGS['timings'])
+    if CLI_ARGS['timings']:
+        # Un processus par recherche : démarrage et imports font partie de la réponse
+        results['timings'].update(process_timings())
+    embedding_cache.save()
+    print(serialize(results, ensure_ascii=False, indent=2))
+    if CLI_ARGS['metrics']:
+        print(REGISTRY.prometheus_text(), file=sys.stderr, end="")
+    # Un seul appel par processus : sortie sans libérer les index (cache déjà enregistré)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Mesure de la latence de chaque étape de la recherche
+
+    startup       lancement de python -> premier import du projet (subprocess uniquement)
+    imports       imports de search_jobs.py (modules légers, voir import_budget.py)
+    open_index    ouverture des index (NumPy, HNSW, ChromaDB, BM25, catalogue) et import
+                  des bibliothèques lourdes, une fois par processus
+    filters       résolution des filtres sur le catalogue SQLite
+    embed         embedding des requêtes (cache compris)
+    vector_search scoring vectoriel (NumPy, HNSW ou ChromaDB)
+    lexical_search scoring BM25
+    fuse          fusion RRF des classements
+    search        search_jobs() de bout en bout
+    serialize     sérialisation JSON de la réponse (ajoutée au bloc "timings" après coup)
+
+Chaque étape alimente un histogramme par processus (export texte au format
+Prometheus : GET /metrics de search_server.py, --metrics de search_jobs.py) ;
+les durées de la recherche en cours peuvent aussi être renvoyées dans le bloc
+"timings" de la réponse.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Premier module du projet importé par search_jobs.py : repère du début des imports
+_IMPORTS_START = time.perf_counter()
+_IMPORTS_START_WALL = time.time()
+
+METRIC_NAME = "declic_search_stage_seconds"
+
+# Bornes des histogrammes (secondes)
+LATENCY_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Durées de la recherche en cours (None : aucune collecte demandée)
+_current_timings = contextvars.ContextVar("search_timings", default=None)
+
+
+class StageHistogram:
+    """Histogramme cumulatif d'une étape (compteurs par borne, somme, nombre)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_S):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total_s = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.total_s += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histogrammes des étapes et durées uniques du processus (démarrage, imports)"""
+
+    def __init__(self):
+        self.stages = {}
+        self.process = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = StageHistogram()
+            self.stages[stage].observe(seconds)
+
+    def set_process_timing(self, name: str, seconds: float):
+        with self._lock:
+            self.process[name] = seconds
+
+    def snapshot(self) -> dict:
+        """{étape: {count, mean_ms}} et durées du processus, pour /stats"""
+        with self._lock:
+            return {
+                'stages': {
+                    stage: {'count': h.count, 'mean_ms': round(h.total_s * 1000 / h.count, 3) if h.count else 0.0}
+                    for stage, h in sorted(self.stages.items())
+                },
+                'process_ms': {name: round(s * 1000, 3) for name, s in self.process.items()},
+            }
+
+    def prometheus_text(self) -> str:
+        """Export texte au format d'exposition Prometheus"""
+        lines = [
+            f"# HELP {METRIC_NAME} Durée des étapes de la recherche de métiers",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self.stages.items()):
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {h.total_s:.6f}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {h.count}')
+
+            lines.append("# HELP declic_process_stage_seconds Durées uniques du processus (démarrage, imports)")
+            lines.append("# TYPE declic_process_stage_seconds gauge")
+            for name, seconds in sorted(self.process.items()):
+                lines.append(f'declic_process_stage_seconds{{stage="{name}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def stage(name: str):
+    """Chronomètre un bloc : histogramme du processus + durées de la recherche en cours"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe(name, elapsed)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed * 1000
+
+
+@contextmanager
+def collect_timings():
+    """Collecte les durées des étapes exécutées dans le bloc : {étape: ms}"""
+    timings = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def serialize(response: dict, **dumps_kwargs) -> str:
+    """
+    JSON de la réponse, étape "serialize" chronométrée
+
+    Si la réponse porte un bloc "timings", la durée de l'encodage y est ajoutée
+    puis la réponse est ré-encodée (ce second encodage n'est pas compté).
+    """
+    start = time.perf_counter()
+    with stage("serialize"):
+        text = json.dumps(response, **dumps_kwargs)
+    timings = response.get('timings') if isinstance(response, dict) else None
+    if isinstance(timings, dict):
+        timings['serialize'] = round((time.perf_counter() - start) * 1000, 3)
+        text = json.dumps(response, **dumps_kwargs)
+    return text
+
+
+def rounded(timings: dict) -> dict:
+    return {name: round(ms, 3) for name, ms in timings.items()}
+
+
+def record_imports():
+    """
+    Durée des imports depuis celui de ce module, et du démarrage si le
+    processus parent a fourni l'heure du lancement (DECLIC_SPAWN_TS_MS)
+    """
+    REGISTRY.set_process_timing('imports', time.perf_counter() - _IMPORTS_START)
+    spawned_ms = os.getenv("DECLIC_SPAWN_TS_MS")
+    if spawned_ms:
+        try:
+            REGISTRY.set_process_timing('startup', max(0.0, _IMPORTS_START_WALL - float(spawned_ms) / 1000))
+        except ValueError:
+            pass
+
+
+def process_timings() -> dict:
+    """{startup, imports} en ms (subprocess : une seule recherche par processus)"""
+    return {name: round(seconds * 1000, 3) for name, seconds in REGISTRY.process.items()}
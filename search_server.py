@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Serveur de recherche persistant autour de search_jobs.search_jobs()
+Charge le vectorstore une seule fois et répond en JSON via HTTP local
+
+Protocole:
+    POST /search   Body: { "query": str, "n_results"?: int, "mode"?: "vector" | "lexical" | "hybrid",
+                           "filters"?: { "sectors"?: [str], "salary_min"?: int, "salary_max"?: int,
+                                         "max_education"?: str, "remote_possible"?: bool } }
+                   ou { "queries": [str], "fuse"?: bool, ... } : plusieurs requêtes en un appel
+                   (un seul lot d'embeddings ; "fuse" fusionne les classements)
+                   "timings": true ajoute la durée de chaque étape (ms) à la réponse
+    POST /recommendations   Body: { "riasec"?: str, "mbti"?: str, "enneagram"?: int, "n_results"?: int,
+                                    "strategy"?: "semantic" | "profile" }
+                   semantic : classement précalculé du profil (recherche fusionnée à défaut)
+                   profile : correspondance riasec_codes/mbti_fit/enneagram_fit, sans réseau
+    GET  /health   État du serveur (vectorstore chargé, requêtes servies)
+    GET  /stats    Compteurs du cache d'embeddings (hits, misses, taille), latence moyenne par étape
+    GET  /metrics  Histogrammes de latence par étape (format texte Prometheus)
+
+Usage:
+    python search_server.py [--host 127.0.0.1] [--port 8765] [--max-concurrency 8]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import profile_matching
+import recommendation_tables
+import search_jobs
+from search_metrics import REGISTRY, serialize
+
+DEFAULT_HOST = os.getenv("SEARCH_SERVER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("SEARCH_SERVER_PORT", "8765"))
+MAX_BODY_BYTES = 64 * 1024
+CACHE_SAVE_INTERVAL_S = 60
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP : une requête JSON -> un appel à search_jobs()"""
+
+    server_version = "DeclicSearch/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.server.health())
+        elif self.path == "/stats":
+            self._send_json(200, {"embedding_cache": search_jobs.embedding_cache.stats(),
+                                  "search_stages": REGISTRY.snapshot()})
+        elif self.path == "/metrics":
+            self._send_text(200, REGISTRY.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": f"Route inconnue: {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/recommendations":
+            self._recommendations()
+            return
+        if self.path != "/search":
+            self._send_json(404, {"error": f"Route inconnue: {self.path}"})
+            return
+
+        payload = self._read_json()
+        if payload is None:
+            return
+
+        if "queries" in payload:
+            query = payload["queries"]
+            if (not isinstance(query, list) or not query
+                    or not all(isinstance(q, str) and q for q in query)):
+                self._send_json(400, {"error": "queries doit être une liste de chaînes non vides", "jobs": []})
+                return
+            if len(query) > search_jobs.MAX_BATCH_QUERIES:
+                self._send_json(400, {"error": f"Au plus {search_jobs.MAX_BATCH_QUERIES} requêtes par appel",
+                                      "jobs": []})
+                return
+        else:
+            query = payload.get("query")
+            if not query or not isinstance(query, str):
+                self._send_json(400, {"error": "query est requis et doit être une chaîne", "jobs": []})
+                return
+
+        try:
+            n_results = int(payload.get("n_results", 5))
+        except (TypeError, ValueError):
+            self._send_json(400, {"error": "n_results doit être un entier", "jobs": []})
+            return
+
+        mode = payload.get("mode")
+        error = search_jobs.request_error(query, n_results, mode, payload.get("filters"))
+        if error:
+            self._send_json(400, {"error": error, "jobs": []})
+            return
+
+        # Limiter le nombre de recherches simultanées (embeddings + index)
+        with self.server.search_slots:
+            try:
+                results = search_jobs.search_jobs(query, n_results, mode, payload.get("filters"),
+                                                  fuse=bool(payload.get("fuse")),
+                                                  timings=bool(payload.get("timings")))
+            except Exception as e:
+                self._send_json(500, {"error": f"Recherche échouée: {e}", "jobs": []})
+                return
+
+        self.server.record_request()
+        status = 200 if "error" not in results else 503
+        self._send_json(status, results)
+
+    def _recommendations(self):
+        payload = self._read_json()
+        if payload is None:
+            return
+
+        riasec = payload.get("riasec") or ""
+        mbti = payload.get("mbti") or ""
+        if not isinstance(riasec, str) or not isinstance(mbti, str):
+            self._send_json(400, {"error": "riasec et mbti doivent être des chaînes", "jobs": []})
+            return
+
+        try:
+            n_results = int(payload.get("n_results", 5))
+        except (TypeError, ValueError):
+            self._send_json(400, {"error": "n_results doit être un entier", "jobs": []})
+            return
+        error = search_jobs.n_results_error(n_results)
+        if error:
+            self._send_json(400, {"error": error, "jobs": []})
+            return
+
+        strategy = payload.get("strategy") or "semantic"
+        if strategy == "profile":
+            try:
+                results = profile_matching.profile_recommendations(riasec, mbti, payload.get("enneagram"), n_results)
+            except ValueError as e:
+                self._send_json(400, {"error": str(e), "jobs": []})
+                return
+            self.server.record_request()
+            # Profil vide : recherche de repli, qui peut échouer (index, clé API)
+            self._send_json(200 if "error" not in results else 503, results)
+            return
+        if strategy != "semantic":
+            self._send_json(400, {"error": "strategy doit être semantic ou profile", "jobs": []})
+            return
+
+        # Lecture de table en O(1) ; seule la recherche de repli occupe un créneau
+        results = recommendation_tables.table_recommendations(riasec, mbti, n_results)
+        if results is None:
+            with self.server.search_slots:
+                try:
+                    results = recommendation_tables.recommend_jobs(riasec, mbti, n_results)
+                except Exception as e:
+                    self._send_json(500, {"error": f"Recherche échouée: {e}", "jobs": []})
+                    return
+
+        self.server.record_request()
+        status = 200 if "error" not in results else 503
+        self._send_json(status, results)
+
+    def _read_json(self):
+        """Lit le body JSON, répond 400/413 et retourne None en cas d'erreur"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Requête trop volumineuse", "jobs": []})
+            return None
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "Body JSON invalide", "jobs": []})
+            return None
+
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "Le body doit être un objet JSON", "jobs": []})
+            return None
+
+        return payload
+
+    def _send_json(self, status: int, data: dict):
+        self._send_text(status, serialize(data, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _send_text(self, status: int, text: str, content_type: str):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Logs HTTP silencieux : la sortie standard reste lisible
+        pass
+
+
+class SearchServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread qui garde le vectorstore chaud"""
+
+    daemon_threads = True
+
+    def __init__(self, address, max_concurrency: int = 8):
+        super().__init__(address, SearchRequestHandler)
+        self.search_slots = threading.BoundedSemaphore(max_concurrency)
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._counter_lock = threading.Lock()
+
+    def record_request(self):
+        with self._counter_lock:
+            self.requests_served += 1
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "vectorstore_loaded": search_jobs._vectorstore is not None or search_jobs._vector_index is not None,
+            "backend": "numpy" if search_jobs.use_vector_index() else "chroma",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "embedding_cache": search_jobs.embedding_cache.stats(),
+        }
+
+
+def persist_cache_periodically(stop_event: threading.Event):
+    """Sauvegarde le cache d'embeddings sur disque à intervalle régulier"""
+    while not stop_event.wait(CACHE_SAVE_INTERVAL_S):
+        try:
+            search_jobs.embedding_cache.save()
+        except OSError as e:
+            print(f"⚠️  Sauvegarde du cache impossible: {e}")
+
+
+def warm_up() -> bool:
+    """Ouvre l'index et les embeddings avant la première requête"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if search_jobs.requires_api_key(search_jobs.EMBEDDING_SPEC) and not api_key:
+        print("⚠️  OPENAI_API_KEY manquante : les recherches échoueront")
+        return False
+
+    if search_jobs.get_index(api_key) is None:
+        print("⚠️  Index de recherche introuvable. Lancez setup_rag.py d'abord.")
+        return False
+    search_jobs.get_query_embeddings(api_key)
+    search_jobs.get_ann_index()
+    search_jobs.get_lexical_index()
+    search_jobs.get_catalog()
+    if recommendation_tables.get_tables() is None:
+        print("⚠️  Pas de table de recommandations à jour : /recommendations fera des recherches")
+    profile_matching.get_matcher()
+
+    backend = "index NumPy" if search_jobs.use_vector_index() else "ChromaDB"
+    print(f"✓ {backend} chargé (embeddings {search_jobs.spec_id(search_jobs.EMBEDDING_SPEC)})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de recherche de métiers DÉCLIC")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-concurrency", type=int, default=8,
+                        help="Nombre maximum de recherches simultanées")
+    args = parser.parse_args()
+
+    print("🚀 SERVEUR DE RECHERCHE DÉCLIC")
+    print("=" * 70)
+    warm_up()
+
+    server = SearchServer((args.host, args.port), max_concurrency=args.max_concurrency)
+    print(f"✓ En écoute sur http://{args.host}:{args.port}")
+
+    stop_event = threading.Event()
+    threading.Thread(target=persist_cache_periodically, args=(stop_event,), daemon=True).start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n❌ Interruption utilisateur")
+    finally:
+        stop_event.set()
+        search_jobs.embedding_cache.save()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,32 @@
 #!/usr/bin/env python3
 """
 Script pour créer la base de données RAG pour les métiers DÉCLIC
-Utilise LangChain + OpenAI Embeddings + ChromaDB
+Utilise LangChain + ChromaDB, embeddings OpenAI ou locaux (voir embedding_providers.py)
 """
 
+import argparse
+import hashlib
 import json
 import os
 import shutil
 from pathlib import Path
 from dotenv import load_dotenv
 
+from columnar_catalog import read_jobs
+from embedding_pipeline import pipeline_from_env
+from embedding_providers import PROVIDERS, embedding_spec, get_embeddings, requires_api_key, spec_from_manifest, spec_id
+from index_manifest import MANIFEST_FILE, load_manifest, save_manifest
+from job_catalog import CATALOG_FILE, JobCatalog
+from lexical_index import LEXICAL_INDEX_FILE, LexicalIndex, alias_titles
+from near_duplicates import DEDUP_THRESHOLD, dedupe_jobs
+from recommendation_tables import RECOMMENDATIONS_FILE, refresh_tables
+from hnsw_index import HNSW_MAX_DELETED_FRACTION, HNSWIndex, hnswlib, remove_hnsw_index
+from vector_index import PRECISIONS, VECTOR_INDEX_DIR, VectorIndex, write_vector_index
+
 # Charger les variables d'environnement
 load_dotenv(".env.local")
 
 try:
-    from langchain_openai import OpenAIEmbeddings
     from langchain_community.vectorstores import Chroma
     from langchain_core.documents import Document
     from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -25,28 +37,87 @@ except ImportError as e:
     exit(1)
 
 
-def setup_rag_database():
-    """Configure la base de données RAG avec les métiers DÉCLIC"""
+CHROMA_DIR = "data/chroma_db"
+COLLECTION_NAME = "jobs"
+CHECKPOINT_FILE = "data/embedding_checkpoint.jsonl"
+CHROMA_WRITE_BATCH = 1000
+
+# Stockage de l'index NumPy (voir vector_index.quantize)
+INDEX_PRECISION = os.getenv("DECLIC_INDEX_PRECISION", "float32")
+INDEX_DIMENSIONS = int(os.getenv("DECLIC_INDEX_DIMENSIONS", "0")) or None
+INDEX_RESCORE = os.getenv("DECLIC_INDEX_RESCORE", "0") == "1"
+
+# Index approché construit à côté de l'index NumPy : none ou hnsw
+ANN_BACKENDS = ("none", "hnsw")
+ANN_BACKEND = os.getenv("DECLIC_ANN_INDEX", "none")
+
+
+def job_key(doc) -> str:
+    """Clé stable d'un métier dans l'index (slug, sinon titre)"""
+    return doc.metadata.get('slug') or doc.metadata.get('title', '')
+
+
+def document_hash(doc) -> str:
+    """Empreinte SHA-256 du contenu et des métadonnées d'un document métier"""
+    payload = json.dumps(
+        {'content': doc.page_content, 'metadata': doc.metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def setup_rag_database(incremental: bool = False, provider: str = None, precision: str = None,
+                       dimensions: int = None, rescore: bool = None, ann: str = None,
+                       dedup_threshold: float = None):
+    """
+    Configure la base de données RAG avec les métiers DÉCLIC
+
+    Args:
+        incremental: Ne ré-embedder que les métiers nouveaux ou modifiés et
+            supprimer ceux qui ont disparu, au lieu de reconstruire la base
+        provider: Fournisseur d'embeddings (openai, sentence-transformers,
+            hashing) ; par défaut DECLIC_EMBEDDINGS ou openai
+        precision: Stockage des vecteurs de l'index NumPy (float32, float16, int8) ;
+            par défaut DECLIC_INDEX_PRECISION ou float32
+        dimensions: Troncature aux premières dimensions (DECLIC_INDEX_DIMENSIONS, 0 = aucune)
+        rescore: Garder les vecteurs float32 complets pour re-scorer les candidats
+            (DECLIC_INDEX_RESCORE=1)
+        ann: Index approché des grands catalogues (none, hnsw) ; par défaut
+            DECLIC_ANN_INDEX ou none
+        dedup_threshold: Similarité à partir de laquelle deux fiches sont fusionnées
+            avant l'indexation (DECLIC_DEDUP_THRESHOLD, défaut 0 = aucune fusion)
+    """
+    precision = precision or INDEX_PRECISION
+    dimensions = INDEX_DIMENSIONS if dimensions is None else (dimensions or None)
+    rescore = INDEX_RESCORE if rescore is None else rescore
+    ann = ann or ANN_BACKEND
+    dedup_threshold = DEDUP_THRESHOLD if dedup_threshold is None else dedup_threshold
 
     print("🚀 CRÉATION DE LA BASE DE DONNÉES RAG")
     print("=" * 70)
 
     # ──────────────────────────────────────────────────────────────────────────
-    # ÉTAPE 1: Vérifier la clé API
+    # ÉTAPE 1: Vérifier la clé API (embeddings OpenAI uniquement)
     # ──────────────────────────────────────────────────────────────────────────
+    spec = embedding_spec(provider)
     api_key = os.getenv("OPENAI_API_KEY")
-    
-    if not api_key:
-        print("❌ ERREUR: OPENAI_API_KEY manquante dans .env.local")
-        print("\n📋 Créez un fichier .env.local à la racine avec:")
-        print("OPENAI_API_KEY=sk-proj-votre-clé-ici")
-        exit(1)
-    
-    if api_key in ("sk-your-key-here", "sk-proj-votre-clé-ici"):
-        print("❌ ERREUR: Remplacez la clé placeholder par votre vraie clé OpenAI!")
-        exit(1)
 
-    print("✓ Clé OpenAI trouvée")
+    if requires_api_key(spec):
+        if not api_key:
+            print("❌ ERREUR: OPENAI_API_KEY manquante dans .env.local")
+            print("\n📋 Créez un fichier .env.local à la racine avec:")
+            print("OPENAI_API_KEY=sk-proj-votre-clé-ici")
+            print("   (ou utilisez des embeddings locaux: --embeddings hashing)")
+            exit(1)
+
+        if api_key in ("sk-your-key-here", "sk-proj-votre-clé-ici"):
+            print("❌ ERREUR: Remplacez la clé placeholder par votre vraie clé OpenAI!")
+            exit(1)
+
+        print("✓ Clé OpenAI trouvée")
+    else:
+        print(f"✓ Embeddings locaux: {spec_id(spec)} (pas de clé API requise)")
 
     # ──────────────────────────────────────────────────────────────────────────
     # ÉTAPE 2: Charger les données métiers
@@ -75,9 +146,8 @@ def setup_rag_database():
         exit(1)
     
     try:
-        with open(jobs_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        jobs = data.get('jobs', [])
+        # Catalogue colonnaire (memory-map) s'il est à jour, sinon le JSON
+        jobs = read_jobs(jobs_file)
         print(f"✓ {len(jobs)} métiers chargés depuis {jobs_file}")
     except json.JSONDecodeError:
         print(f"❌ ERREUR: {jobs_file} n'est pas un JSON valide")
@@ -90,6 +160,12 @@ def setup_rag_database():
         print("❌ ERREUR: Aucun métier trouvé dans le fichier!")
         exit(1)
 
+    # Quasi-doublons (même métier sous un autre titre ou slug) : fusionnés avant l'embedding
+    jobs, clusters = dedupe_jobs(jobs, dedup_threshold)
+    if clusters:
+        print(f"✓ {len(clusters)} groupes de quasi-doublons fusionnés -> {len(jobs)} métiers "
+              f"(seuil {dedup_threshold})")
+
     # ──────────────────────────────────────────────────────────────────────────
     # ÉTAPE 3: Construire les Documents LangChain
     # ──────────────────────────────────────────────────────────────────────────
@@ -106,14 +182,23 @@ Description: {job.get('description', 'N/A')}
 Compétences: {', '.join(job.get('required_skills', [])[:5])}
 Formation: {', '.join(job.get('required_education', []))}
 Salaire: {job.get('salary', {}).get('min', 'N/A')}-{job.get('salary', {}).get('max', 'N/A')} EUR"""
+            # Titres des quasi-doublons fusionnés (near_duplicates.py) : recherche par ces noms
+            aliases = alias_titles(job)
+            if aliases:
+                content += f"\nAussi appelé: {', '.join(aliases)}"
 
+            # Métadonnées typées : salaires entiers (filtres côté index)
             metadata = {
                 'title': job.get('title', 'N/A'),
                 'sector': job.get('sector', 'N/A'),
-                'salary_min': str(job.get('salary', {}).get('min', 0)),
-                'salary_max': str(job.get('salary', {}).get('max', 0)),
+                'salary_min': int(job.get('salary', {}).get('min') or 0),
+                'salary_max': int(job.get('salary', {}).get('max') or 0),
                 'slug': job.get('slug', ''),
+                'url': job.get('url', ''),
             }
+            if aliases:
+                # Métadonnées Chroma scalaires
+                metadata['aliases'] = " | ".join(aliases)
 
             raw_documents.append(Document(page_content=content, metadata=metadata))
         except Exception as e:
@@ -137,26 +222,31 @@ Salaire: {job.get('salary', {}).get('min', 'N/A')}-{job.get('salary', {}).get('m
             chunk_overlap=50,
             separators=["\n\n", "\n", " ", ""],
         )
-        split_docs = splitter.split_documents(raw_documents)
+        # Découpage par métier pour pouvoir identifier les chunks de chacun
+        chunks_by_job = {}
+        for doc in raw_documents:
+            chunks = splitter.split_documents([doc])
+            chunk_ids = [f"{job_key(doc)}::{i}" for i in range(len(chunks))]
+            chunks_by_job[job_key(doc)] = (document_hash(doc), chunks, chunk_ids)
+
+        split_docs = [chunk for _, chunks, _ in chunks_by_job.values() for chunk in chunks]
         print(f"✓ {len(split_docs)} chunks créés")
     except Exception as e:
         print(f"❌ ERREUR lors du découpage: {e}")
         exit(1)
 
     # ──────────────────────────────────────────────────────────────────────────
-    # ÉTAPE 5: Initialiser OpenAI Embeddings
+    # ÉTAPE 5: Initialiser les embeddings
     # ──────────────────────────────────────────────────────────────────────────
-    print("\n🧠 Initialisation des embeddings OpenAI...")
-    
+    print(f"\n🧠 Initialisation des embeddings {spec_id(spec)}...")
+
     try:
-        embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=api_key,
-        )
-        print("✓ Embeddings OpenAI prêts")
+        embeddings = get_embeddings(spec, api_key=api_key)
+        print("✓ Embeddings prêts")
     except Exception as e:
-        print(f"❌ ERREUR OpenAI: {e}")
-        print("   Vérifiez votre clé API")
+        print(f"❌ ERREUR embeddings: {e}")
+        if requires_api_key(spec):
+            print("   Vérifiez votre clé API")
         exit(1)
 
     # ──────────────────────────────────────────────────────────────────────────
@@ -164,26 +254,164 @@ Salaire: {job.get('salary', {}).get('min', 'N/A')}-{job.get('salary', {}).get('m
     # ──────────────────────────────────────────────────────────────────────────
     print("\n💾 Initialisation de ChromaDB...")
     
-    chroma_dir = "data/chroma_db"
-    
-    # Supprimer l'ancienne base
-    if Path(chroma_dir).exists():
-        shutil.rmtree(chroma_dir)
-        print(f"✓ Ancienne base supprimée")
-    
+    chroma_dir = CHROMA_DIR
+
+    manifest = load_manifest(chroma_dir) if incremental else None
+    if incremental and manifest is None:
+        print("⚠️  Aucun manifeste d'index trouvé : reconstruction complète")
+    elif manifest and spec_from_manifest(manifest) != spec:
+        print(f"⚠️  Embeddings différents ({spec_id(spec_from_manifest(manifest))}) : reconstruction complète")
+        manifest = None
+
+    if manifest is None:
+        changed = list(chunks_by_job)
+        stale_ids = []
+    else:
+        indexed_jobs = manifest.get('jobs', {})
+
+        changed = [key for key, (doc_hash, _, _) in chunks_by_job.items()
+                   if indexed_jobs.get(key, {}).get('hash') != doc_hash]
+        removed = [key for key in indexed_jobs if key not in chunks_by_job]
+        stale_ids = [chunk_id
+                     for key in removed + [key for key in changed if key in indexed_jobs]
+                     for chunk_id in indexed_jobs[key].get('chunk_ids', [])]
+
+        print(f"✓ Mise à jour incrémentale: {len(changed)} métiers nouveaux/modifiés, "
+              f"{len(removed)} supprimés, {len(chunks_by_job) - len(changed)} inchangés")
+
+    new_docs = [chunk for key in changed for chunk in chunks_by_job[key][1]]
+    new_ids = [chunk_id for key in changed for chunk_id in chunks_by_job[key][2]]
+
+    # Embeddings calculés avant de toucher à la base : un échec laisse l'index
+    # existant intact, et les lots terminés sont repris au prochain lancement
+    pipeline = pipeline_from_env(embeddings, checkpoint_path=CHECKPOINT_FILE, namespace=spec_id(spec))
     try:
-        print("⏳ Création des embeddings (peut prendre 1-2 minutes)...")
-        vectorstore = Chroma.from_documents(
-            documents=split_docs,
-            embedding=embeddings,
+        print(f"⏳ Embedding de {len(new_docs)} chunks "
+              f"(lots de {pipeline.batch_size}, {pipeline.max_in_flight} requêtes en parallèle)...")
+        new_vectors = pipeline.embed([doc.page_content for doc in new_docs])
+        embedded_chunks = len(new_docs)
+        print(f"✓ {embedded_chunks} chunks embeddés "
+              f"({pipeline.stats['resumed_batches']} lots repris, {pipeline.stats['retries']} retries)")
+    except Exception as e:
+        print(f"❌ ERREUR embeddings: {e}")
+        print(f"   Les lots terminés sont conservés dans {CHECKPOINT_FILE} : relancez pour reprendre")
+        exit(1)
+
+    try:
+        if manifest is None and Path(chroma_dir).exists():
+            # Supprimer l'ancienne base
+            shutil.rmtree(chroma_dir)
+            print(f"✓ Ancienne base supprimée")
+
+        vectorstore = Chroma(
             persist_directory=chroma_dir,
-            collection_name="jobs",
+            embedding_function=embeddings,
+            collection_name=COLLECTION_NAME,
         )
-        print(f"✓ ChromaDB créée avec {len(split_docs)} chunks")
+
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+            print(f"✓ {len(stale_ids)} anciens chunks supprimés")
+
+        # Écriture des vecteurs déjà calculés, par tranches acceptées par Chroma
+        for i in range(0, len(new_docs), CHROMA_WRITE_BATCH):
+            batch = slice(i, i + CHROMA_WRITE_BATCH)
+            vectorstore._collection.upsert(
+                ids=new_ids[batch],
+                embeddings=new_vectors[batch],
+                metadatas=[doc.metadata for doc in new_docs[batch]],
+                documents=[doc.page_content for doc in new_docs[batch]],
+            )
+        print(f"✓ ChromaDB à jour ({len(split_docs)} chunks au total)")
     except Exception as e:
         print(f"❌ ERREUR ChromaDB: {e}")
         exit(1)
 
+    # Index NumPy (lu par search_jobs.py sans ouvrir ChromaDB) : réécrit en
+    # entier, les vecteurs des chunks inchangés sont repris de l'index précédent
+    try:
+        vectors_by_id = dict(zip(new_ids, new_vectors))
+        all_ids = [chunk_id for _, _, chunk_ids in chunks_by_job.values() for chunk_id in chunk_ids]
+        missing = {chunk_id for chunk_id in all_ids if chunk_id not in vectors_by_id}
+
+        if missing:
+            previous = VectorIndex.load(VECTOR_INDEX_DIR)
+            if previous is not None and previous.embedding == spec:
+                vectors_by_id.update((chunk_id, vector) for chunk_id, vector in previous.vectors_by_id().items()
+                                     if chunk_id in missing)
+            missing -= vectors_by_id.keys()
+        if missing:
+            stored = vectorstore._collection.get(ids=sorted(missing), include=['embeddings'])
+            vectors_by_id.update(zip(stored['ids'], stored['embeddings']))
+
+        write_vector_index(
+            VECTOR_INDEX_DIR,
+            ids=all_ids,
+            vectors=[vectors_by_id[chunk_id] for chunk_id in all_ids],
+            metadatas=[doc.metadata for doc in split_docs],
+            documents=[doc.page_content for doc in split_docs],
+            embedding=spec,
+            precision=precision,
+            dimensions=dimensions,
+            rescore=rescore,
+        )
+        stored = f"{precision}" + (f", {dimensions} dimensions" if dimensions else "") + (", rescoring" if rescore else "")
+        print(f"✓ Index NumPy écrit dans {VECTOR_INDEX_DIR} ({len(all_ids)} vecteurs, {stored})")
+    except Exception as e:
+        print(f"❌ ERREUR index NumPy: {e}")
+        exit(1)
+
+    # Graphe HNSW (grands catalogues) : mis à jour en place quand c'est possible
+    if ann == "hnsw" and hnswlib is None:
+        print("⚠️  hnswlib manquant (pip install hnswlib) : pas de graphe HNSW, recherche exacte")
+        remove_hnsw_index(VECTOR_INDEX_DIR)
+    elif ann == "hnsw":
+        try:
+            graph = HNSWIndex.load(VECTOR_INDEX_DIR) if manifest is not None else None
+            if graph is not None and graph.embedding == spec:
+                graph.update(dict(zip(new_ids, new_vectors)), stale_ids)
+                action = f"mis à jour (+{len(new_ids)} / -{len(stale_ids)} chunks)"
+            if (graph is None or graph.embedding != spec or set(graph.labels) != set(all_ids)
+                    or graph.deleted_fraction() > HNSW_MAX_DELETED_FRACTION):
+                # Nœuds supprimés au-delà du seuil : ils restent parcourus à chaque recherche
+                graph = HNSWIndex.build(all_ids, [vectors_by_id[chunk_id] for chunk_id in all_ids], spec)
+                action = "construit"
+            graph.save(VECTOR_INDEX_DIR)
+            print(f"✓ Graphe HNSW {action} (M={graph.graph.M}, ef_construction={graph.graph.ef_construction})")
+        except Exception as e:
+            print(f"❌ ERREUR graphe HNSW: {e}")
+            exit(1)
+    else:
+        remove_hnsw_index(VECTOR_INDEX_DIR)
+
+    save_manifest(chroma_dir, {
+        'embedding': spec,
+        'collection_name': COLLECTION_NAME,
+        'jobs': {
+            key: {'hash': doc_hash, 'chunk_ids': chunk_ids}
+            for key, (doc_hash, _, chunk_ids) in chunks_by_job.items()
+        },
+    })
+    print(f"✓ Manifeste d'index enregistré ({MANIFEST_FILE})")
+
+    # Index lexical BM25 (mode lexical/hybride de search_jobs.py), sans embeddings
+    lexical_index = LexicalIndex.build(jobs)
+    lexical_index.save(LEXICAL_INDEX_FILE)
+    print(f"✓ Index lexical écrit dans {LEXICAL_INDEX_FILE} ({len(lexical_index.postings)} termes)")
+
+    # Catalogue typé (SQLite) sur lequel search_jobs.py résout les filtres
+    catalog = JobCatalog.build(jobs, CATALOG_FILE)
+    print(f"✓ Catalogue des métiers écrit dans {CATALOG_FILE} ({len(catalog)} métiers)")
+
+    # Classements précalculés de /recommendations, alignés sur le nouvel index
+    try:
+        tables = refresh_tables()
+        print(f"✓ Recommandations précalculées dans {RECOMMENDATIONS_FILE} "
+              f"({len(tables)} profils, mode {tables.mode})")
+    except Exception as e:
+        # L'index est déjà écrit : une table manquante se rabat sur la recherche en direct
+        print(f"⚠️  Tables de recommandations non régénérées: {e}")
+
     # ──────────────────────────────────────────────────────────────────────────
     # ÉTAPE 7: Test de recherche
     # ──────────────────────────────────────────────────────────────────────────
@@ -214,10 +442,10 @@ Salaire: {job.get('salary', {}).get('min', 'N/A')}-{job.get('salary', {}).get('m
     print("✅ BASE DE DONNÉES RAG CRÉÉE AVEC SUCCÈS!")
     print("=" * 70)
     print(f"📊 Métiers source     : {len(jobs)}")
-    print(f"📊 Chunks vectorisés  : {len(split_docs)}")
+    print(f"📊 Chunks vectorisés  : {len(split_docs)} ({embedded_chunks} embeddés ce run)")
     print(f"📁 Emplacement        : {chroma_dir}")
-    print(f"🔑 Embeddings         : text-embedding-3-small (OpenAI)")
-    print(f"💾 Base de données    : ChromaDB")
+    print(f"🔑 Embeddings         : {spec_id(spec)}")
+    print(f"💾 Base de données    : ChromaDB + index NumPy ({VECTOR_INDEX_DIR})")
     print("=" * 70)
     print("\n✨ Vous pouvez maintenant utiliser la RAG dans votre chatbot!")
 
@@ -225,8 +453,56 @@ Salaire: {job.get('salary', {}).get('min', 'N/A')}-{job.get('salary', {}).get('m
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Création de la base RAG DÉCLIC")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Ne ré-embedder que les métiers nouveaux ou modifiés (garde la base existante)",
+    )
+    parser.add_argument(
+        "--embeddings",
+        choices=PROVIDERS,
+        default=None,
+        help="Fournisseur d'embeddings (défaut: DECLIC_EMBEDDINGS ou openai), enregistré dans le manifeste",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default=None,
+        help="Stockage des vecteurs de l'index NumPy (défaut: DECLIC_INDEX_PRECISION ou float32)",
+    )
+    parser.add_argument(
+        "--dimensions",
+        type=int,
+        default=None,
+        help="Ne garder que les N premières dimensions (défaut: DECLIC_INDEX_DIMENSIONS, 0 = toutes)",
+    )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        default=None,
+        help="Garder les vecteurs float32 complets pour re-scorer les meilleurs candidats",
+    )
+    parser.add_argument(
+        "--ann",
+        choices=ANN_BACKENDS,
+        default=None,
+        help="Index approché pour les grands catalogues (défaut: DECLIC_ANN_INDEX ou none)",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Fusionner les fiches de similarité >= seuil avant l'indexation "
+             "(défaut: DECLIC_DEDUP_THRESHOLD ou 0 = désactivé ; vérifier les groupes "
+             "avec near_duplicates.py avant d'activer)",
+    )
+    args = parser.parse_args()
+
     try:
-        setup_rag_database()
+        setup_rag_database(incremental=args.incremental, provider=args.embeddings, precision=args.precision,
+                           dimensions=args.dimensions, rescore=args.rescore, ann=args.ann,
+                           dedup_threshold=args.dedup_threshold)
     except KeyboardInterrupt:
         print("\n❌ Interruption utilisateur")
     except Exception as e:
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Index vectoriel exact en mémoire partagée (alternative légère à ChromaDB)
+
+    data/vector_index/vectors.npy        matrice (chunks × dimension), lignes normalisées
+    data/vector_index/chunks.json        id, métadonnées, texte de chaque ligne et format de stockage
+    data/vector_index/scales.npy         échelle de chaque ligne (stockage int8)
+    data/vector_index/vectors_full.npy   matrice float32 complète (rescoring exact)
+
+La matrice est ouverte en memory-map : le chargement est quasi instantané et
+les pages sont partagées entre processus via le cache du système. Une
+recherche est un produit matrice-vecteur (matrice-matrice pour un lot de
+requêtes) suivi d'un argpartition (top-k exact, score = similarité cosinus).
+
+Stockage compact (optionnel) : float16, ou int8 avec une échelle par ligne,
+et troncature aux premières dimensions (embeddings de type Matryoshka comme
+text-embedding-3). Les scores sont alors approchés ; avec le rescoring, les
+meilleurs candidats sont re-scorés sur la matrice float32 complète, dont seules
+les lignes candidates sont lues.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+VECTOR_INDEX_DIR = "data/vector_index"
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+SCALES_FILE = "scales.npy"
+FULL_VECTORS_FILE = "vectors_full.npy"
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Candidats re-scorés en float32 par résultat demandé
+RESCORE_FACTOR = 4
+
+# Lignes converties en float32 à la fois (stockage float16/int8)
+SCORE_BLOCK_ROWS = 65536
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Matrice float32 aux lignes de norme 1 (les lignes nulles restent nulles)"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(matrix: np.ndarray, precision: str = "float32", dimensions: int = None) -> tuple:
+    """
+    Matrice stockée pour une précision et une troncature données
+
+    Args:
+        matrix: Matrice float32 aux lignes normalisées
+        precision: float32, float16 ou int8
+        dimensions: Nombre de premières dimensions conservées (toutes si None)
+
+    Returns:
+        tuple: (matrice stockée, échelles par ligne pour int8 sinon None) ;
+            les lignes tronquées sont renormalisées avant quantification
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue: {precision} ({', '.join(PRECISIONS)})")
+    if dimensions and dimensions < matrix.shape[1]:
+        matrix = normalize_rows(matrix[:, :dimensions])
+
+    if precision == "float16":
+        return matrix.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    return np.ascontiguousarray(matrix, dtype=np.float32), None
+
+
+def _save_npy(path: Path, array: np.ndarray):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def write_vector_index(index_dir: str, ids, vectors, metadatas, documents, embedding: dict,
+                       precision: str = "float32", dimensions: int = None, rescore: bool = False):
+    """
+    Écrit l'index (matrice + sidecar) via des fichiers temporaires
+
+    Args:
+        index_dir: Dossier de l'index
+        ids: Identifiants des chunks (ex: "<slug>::0")
+        vectors: Embeddings des chunks, dans le même ordre
+        metadatas: Métadonnées de chaque chunk
+        documents: Texte de chaque chunk
+        embedding: Spécification du fournisseur d'embeddings (manifeste)
+        precision: Stockage des vecteurs (float32, float16 ou int8)
+        dimensions: Troncature aux premières dimensions (None : dimension complète)
+        rescore: Garder la matrice float32 complète pour re-scorer les candidats
+    """
+    root = Path(index_dir)
+    root.mkdir(parents=True, exist_ok=True)
+
+    full = normalize_rows(vectors) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+    matrix, scales = quantize(full, precision, dimensions)
+    lossless = matrix.dtype == np.float32 and matrix.shape[1] == full.shape[1]
+    rescore = bool(rescore) and not lossless
+
+    sidecar = {
+        'embedding': embedding,
+        'dimension': int(matrix.shape[1]),
+        'storage': {
+            'precision': precision,
+            'full_dimension': int(full.shape[1]),
+            'rescore': rescore,
+        },
+        'chunks': [
+            {'id': chunk_id, 'metadata': metadata, 'text': text}
+            for chunk_id, metadata, text in zip(ids, metadatas, documents)
+        ],
+    }
+
+    # Les matrices d'abord : un lecteur ne voit jamais un sidecar plus récent qu'elles
+    for name, array in ((SCALES_FILE, scales), (FULL_VECTORS_FILE, full if rescore else None)):
+        if array is not None:
+            _save_npy(root / name, array)
+        elif (root / name).exists():
+            (root / name).unlink()
+    _save_npy(root / VECTORS_FILE, matrix)
+
+    tmp_chunks = root / f"{CHUNKS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_chunks, 'w', encoding='utf-8') as f:
+        json.dump(sidecar, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_chunks, root / CHUNKS_FILE)
+
+
+class VectorIndex:
+    """
+    Index ouvert en lecture seule
+
+    Attributes:
+        vectors: Matrice memory-mappée (chunks × dimension), float32, float16 ou int8
+        chunks: Liste de {id, metadata, text}, alignée sur les lignes
+        embedding: Spécification du fournisseur qui a construit l'index
+        scales: Échelle de chaque ligne (int8), sinon None
+        full_vectors: Matrice float32 complète pour le rescoring, sinon None
+        full_dimension: Dimension des embeddings avant troncature
+    """
+
+    def __init__(self, vectors: np.ndarray, chunks: list, embedding: dict = None,
+                 scales: np.ndarray = None, full_vectors: np.ndarray = None, full_dimension: int = None):
+        if len(chunks) != vectors.shape[0]:
+            raise ValueError(f"Index incohérent: {vectors.shape[0]} vecteurs pour {len(chunks)} chunks")
+        self.vectors = vectors
+        self.chunks = chunks
+        self.embedding = embedding
+        self.scales = scales
+        self.full_vectors = full_vectors
+        self.full_dimension = full_dimension or vectors.shape[1]
+        self._job_rows = None
+        self._job_layout = None
+
+    @classmethod
+    def load(cls, index_dir: str = VECTOR_INDEX_DIR):
+        """Ouvre l'index, None s'il est absent"""
+        root = Path(index_dir)
+        if not (root / VECTORS_FILE).exists() or not (root / CHUNKS_FILE).exists():
+            return None
+
+        with open(root / CHUNKS_FILE, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        storage = sidecar.get('storage', {})
+        vectors = np.load(root / VECTORS_FILE, mmap_mode='r')
+        scales = np.load(root / SCALES_FILE) if storage.get('precision') == "int8" else None
+        full_vectors = np.load(root / FULL_VECTORS_FILE, mmap_mode='r') if storage.get('rescore') else None
+        return cls(vectors, sidecar['chunks'], sidecar.get('embedding'), scales, full_vectors,
+                   storage.get('full_dimension'))
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def lossless(self) -> bool:
+        """Vecteurs stockés en float32 sans troncature (scores exacts)"""
+        return self.vectors.dtype == np.float32 and self.vectors.shape[1] == self.full_dimension
+
+    def vectors_by_id(self) -> dict:
+        """
+        id de chunk -> vecteur complet (pour réutiliser les chunks inchangés)
+
+        Vide si l'index ne garde que des vecteurs quantifiés ou tronqués : les
+        vecteurs d'origine doivent alors être relus dans ChromaDB.
+        """
+        if self.full_vectors is not None:
+            matrix = self.full_vectors
+        elif self.lossless:
+            matrix = self.vectors
+        else:
+            return {}
+        return {chunk['id']: matrix[row] for row, chunk in enumerate(self.chunks)}
+
+    def job_rows(self) -> dict:
+        """Clé du métier (slug, sinon titre) -> lignes de ses chunks"""
+        if self._job_rows is None:
+            job_rows = {}
+            for row, chunk in enumerate(self.chunks):
+                metadata = chunk['metadata']
+                job_rows.setdefault(metadata.get('slug') or metadata.get('title', ''), []).append(row)
+            self._job_rows = job_rows
+        return self._job_rows
+
+    def job_layout(self) -> np.ndarray:
+        """
+        Lignes des chunks de chaque métier, complétées jusqu'au métier le plus découpé
+
+        Returns:
+            np.ndarray: (métiers × chunks max) ; le bouchage pointe sur la ligne
+                fictive len(self), de score -inf
+        """
+        if self._job_layout is None:
+            groups = list(self.job_rows().values())
+            width = max((len(rows) for rows in groups), default=1)
+            layout = np.full((len(groups), width), len(self), dtype=np.int64)
+            for job, rows in enumerate(groups):
+                layout[job, :len(rows)] = rows
+            self._job_layout = layout
+        return self._job_layout
+
+    def rows_for(self, job_keys) -> np.ndarray:
+        """Lignes des chunks des métiers donnés (triées, pour un accès séquentiel)"""
+        job_rows = self.job_rows()
+        return np.array(sorted(row for key in job_keys for row in job_rows.get(key, ())), dtype=np.int64)
+
+    def _queries(self, query_vectors) -> tuple:
+        """(requêtes tronquées à la dimension stockée, requêtes complètes), normalisées"""
+        full = normalize_rows(query_vectors)
+        dimension = self.vectors.shape[1]
+        truncated = normalize_rows(full[:, :dimension]) if full.shape[1] > dimension else full
+        return truncated, full
+
+    def _scores(self, queries: np.ndarray, rows: np.ndarray = None) -> np.ndarray:
+        """Scores (lignes × requêtes) sur la matrice stockée, convertie en float32 par blocs"""
+        if self.vectors.dtype == np.float32:
+            matrix = self.vectors if rows is None else self.vectors[rows]
+            return matrix @ queries.T
+
+        n_rows = len(self) if rows is None else len(rows)
+        scores = np.empty((n_rows, len(queries)), dtype=np.float32)
+        for start in range(0, n_rows, SCORE_BLOCK_ROWS):
+            block_rows = slice(start, start + SCORE_BLOCK_ROWS) if rows is None else rows[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + SCORE_BLOCK_ROWS] = self.vectors[block_rows].astype(np.float32) @ queries.T
+            if self.scales is not None:
+                scores[start:start + SCORE_BLOCK_ROWS] *= self.scales[block_rows][:, None]
+        return scores
+
+    def _rescoring(self) -> bool:
+        return self.full_vectors is not None and not self.lossless
+
+    def search(self, query_vector, k: int = 5, rows: np.ndarray = None) -> list:
+        """
+        Top-k exact par similarité cosinus
+
+        Args:
+            query_vector: Embedding de la requête
+            k: Nombre de chunks à retourner
+            rows: Lignes candidates (filtres) ; seules celles-ci sont scorées
+
+        Returns:
+            list: [(ligne, score)] triés par score décroissant
+        """
+        return self.search_many([query_vector], k, rows)[0]
+
+    def search_many(self, query_vectors, k: int = 5, rows: np.ndarray = None) -> list:
+        """
+        Top-k pour plusieurs requêtes en un seul produit matrice-matrice
+
+        Exact en float32 ; en stockage compact, les RESCORE_FACTOR × k meilleurs
+        candidats sont re-scorés en float32 si la matrice complète est gardée.
+
+        Returns:
+            list: Pour chaque requête, [(ligne, score)] triés par score décroissant
+        """
+        n_queries = len(query_vectors)
+        if len(self) == 0 or k <= 0 or n_queries == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(n_queries)]
+
+        queries, full_queries = self._queries(query_vectors)
+        scores = self._scores(queries, rows)
+        rescoring = self._rescoring()
+
+        k = min(k, scores.shape[0])
+        candidates_k = min(k * RESCORE_FACTOR, scores.shape[0]) if rescoring else k
+        if candidates_k < scores.shape[0]:
+            top = np.argpartition(scores, -candidates_k, axis=0)[-candidates_k:]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+
+        results = []
+        for column in range(n_queries):
+            candidates = top[:, column]
+            row_ids = candidates if rows is None else rows[candidates]
+            if rescoring:
+                column_scores = self.full_vectors[np.sort(row_ids)] @ full_queries[column]
+                row_ids = np.sort(row_ids)
+            else:
+                column_scores = scores[candidates, column]
+            order = np.argsort(-column_scores, kind='stable')[:k]
+            results.append([(int(row_ids[i]), float(column_scores[i])) for i in order])
+        return results
+
+    @staticmethod
+    def _aggregate(job_scores: np.ndarray, aggregate: str, top_chunks: int) -> np.ndarray:
+        """Score des métiers depuis leurs chunks triés du meilleur au moins bon (axe 1)"""
+        if aggregate == "sum_top":
+            top = job_scores[:, :top_chunks]
+            totals = np.where(np.isfinite(top), top, 0.0).sum(axis=1) / top_chunks
+            return np.where(np.isfinite(job_scores[:, 0]), totals, -np.inf)
+        return job_scores[:, 0]
+
+    def search_jobs_many(self, query_vectors, n_jobs: int = 5, rows: np.ndarray = None,
+                         aggregate: str = "max", top_chunks: int = 2) -> list:
+        """
+        Les n_jobs meilleurs métiers distincts pour chaque requête, en une passe
+
+        Les scores des chunks sont agrégés par métier pendant le scan : "max"
+        (meilleur chunk) ou "sum_top" (somme des top_chunks meilleurs chunks,
+        divisée par top_chunks pour rester entre -1 et 1). En stockage compact
+        avec rescoring, les RESCORE_FACTOR × n_jobs meilleurs métiers sont
+        ré-agrégés sur les scores float32 de leurs chunks.
+
+        Returns:
+            list: Pour chaque requête, [(ligne du meilleur chunk, score du métier)]
+                triés par score décroissant
+        """
+        n_queries = len(query_vectors)
+        if len(self) == 0 or n_jobs <= 0 or n_queries == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(n_queries)]
+
+        queries, full_queries = self._queries(query_vectors)
+
+        # Scores de toutes les lignes (+ ligne fictive) : -inf hors filtres
+        scores = np.full((len(self) + 1, n_queries), -np.inf, dtype=np.float32)
+        if rows is None:
+            scores[:-1] = self._scores(queries)
+        else:
+            scores[rows] = self._scores(queries, rows)
+
+        layout = self.job_layout()
+        # (métiers × chunks × requêtes), chunks triés du meilleur au moins bon
+        job_scores = scores[layout]
+        order = np.argsort(-job_scores, axis=1, kind='stable')
+        job_scores = np.take_along_axis(job_scores, order, axis=1)
+        best_rows = np.take_along_axis(np.broadcast_to(layout[:, :, None], job_scores.shape), order, axis=1)[:, 0]
+        aggregated = self._aggregate(job_scores, aggregate, top_chunks)
+        rescoring = self._rescoring()
+
+        results = []
+        for column in range(n_queries):
+            column_scores = aggregated[:, column]
+            available = int(np.isfinite(column_scores).sum())
+            k = min(n_jobs * RESCORE_FACTOR if rescoring else n_jobs, available)
+            if k == 0:
+                results.append([])
+                continue
+            if k < len(column_scores):
+                top_jobs = np.argpartition(column_scores, -k)[-k:]
+            else:
+                top_jobs = np.arange(len(column_scores))
+
+            if rescoring:
+                # Chunks des métiers candidats re-scorés en float32 (hors filtres : -inf)
+                candidate_rows = layout[top_jobs]
+                valid = np.isfinite(scores[candidate_rows, column])
+                exact = np.full(candidate_rows.shape, -np.inf, dtype=np.float32)
+                unique_rows, inverse = np.unique(candidate_rows[valid], return_inverse=True)
+                exact[valid] = (self.full_vectors[unique_rows] @ full_queries[column])[inverse]
+                exact_order = np.argsort(-exact, axis=1, kind='stable')
+                exact = np.take_along_axis(exact, exact_order, axis=1)
+                candidate_best = np.take_along_axis(candidate_rows, exact_order, axis=1)[:, 0]
+                candidate_scores = self._aggregate(exact[:, :, None], aggregate, top_chunks)[:, 0]
+                ranked = np.argsort(-candidate_scores, kind='stable')[:n_jobs]
+                results.append([(int(candidate_best[i]), float(candidate_scores[i])) for i in ranked])
+                continue
+
+            top_jobs = top_jobs[np.argsort(-column_scores[top_jobs], kind='stable')]
+            results.append([(int(best_rows[job, column]), float(column_scores[job])) for job in top_jobs])
+        return results
+
+
+def storage_report(index: VectorIndex, variants, k: int = 10, n_queries: int = 200,
+                   noise: float = 0.05, seed: int = 0) -> list:
+    """
+    Mémoire, latence et recall@k de formats de stockage face à l'index float32 complet
+
+    Les requêtes sont simulées : des lignes de l'index tirées au hasard et
+    bruitées (bruit gaussien d'écart-type noise par composante avant normalisation).
+
+    Args:
+        index: Index de référence (float32 complet, ou avec vectors_full.npy)
+        variants: [(précision, dimensions, rescoring)]
+        k: Profondeur du recall (métiers distincts)
+
+    Returns:
+        list: Un dict par format (le premier est la référence float32)
+    """
+    import time
+
+    if index.full_vectors is not None:
+        full = np.asarray(index.full_vectors, dtype=np.float32)
+    elif index.lossless:
+        full = np.asarray(index.vectors, dtype=np.float32)
+    else:
+        raise ValueError("Index de référence sans vecteurs float32 complets (reconstruire avec rescoring)")
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(index), size=min(n_queries, len(index)), replace=False)
+    queries = normalize_rows(full[sample] + rng.normal(0.0, noise, size=(len(sample), full.shape[1])))
+
+    def measure(candidate: VectorIndex):
+        candidate._job_layout = index.job_layout()
+        latencies = []
+        results = []
+        for query in queries:
+            start = time.perf_counter()
+            results.append(candidate.search_jobs_many([query], k)[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, float(np.percentile(latencies, 50))
+
+    reference = VectorIndex(full, index.chunks, index.embedding)
+    reference_results, reference_ms = measure(reference)
+    reference_sets = [{row for row, _ in result} for result in reference_results]
+    reference_bytes = full.nbytes
+
+    report = [{
+        'format': f"float32/{full.shape[1]}", 'bytes': reference_bytes, 'memory_saved': 0.0,
+        'p50_ms': round(reference_ms, 3), f'recall@{k}': 1.0,
+    }]
+    for precision, dimensions, rescore in variants:
+        matrix, scales = quantize(full, precision, dimensions)
+        candidate = VectorIndex(matrix, index.chunks, index.embedding, scales,
+                                full if rescore else None, full.shape[1])
+        results, p50_ms = measure(candidate)
+        # Même métier = même meilleur chunk ou non : on compare les métiers
+        job_of = {row: key for key, rows in index.job_rows().items() for row in rows}
+        recall = np.mean([
+            len({job_of[row] for row, _ in result} & {job_of[row] for row in expected}) / max(len(expected), 1)
+            for result, expected in zip(results, reference_sets)
+        ])
+        stored_bytes = matrix.nbytes + (scales.nbytes if scales is not None else 0)
+        report.append({
+            'format': f"{precision}/{matrix.shape[1]}" + ("+rescore" if rescore else ""),
+            'bytes': stored_bytes,
+            'memory_saved': round(1 - stored_bytes / reference_bytes, 4),
+            'p50_ms': round(p50_ms, 3),
+            f'recall@{k}': round(float(recall), 4),
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rapport mémoire / latence / recall des formats de stockage")
+    parser.add_argument("--index-dir", default=VECTOR_INDEX_DIR)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, nargs="*", default=[0, 256],
+                        help="Troncatures testées, 0 = dimension complète (défaut: 0 256)")
+    args = parser.parse_args()
+
+    index = VectorIndex.load(args.index_dir)
+    if index is None:
+        print(f"❌ Index introuvable dans {args.index_dir}. Lancez setup_rag.py d'abord.")
+        exit(1)
+
+    variants = [
+        (precision, dimensions, rescore)
+        for dimensions in args.dimensions
+        for precision in PRECISIONS
+        for rescore in (False, True)
+        # float32 complet = la référence
+        if precision != "float32" or dimensions
+    ]
+    try:
+        rows = storage_report(index, variants, args.k, args.queries)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    print(f"📊 {len(index)} vecteurs, {args.queries} requêtes simulées, recall@{args.k} (métiers)")
+    print(f"{'format':<24}{'mémoire':>12}{'gain':>8}{'p50 (ms)':>10}{'recall':>9}")
+    for row in rows:
+        print(f"{row['format']:<24}{row['bytes'] / 1024:>10.1f}Ko{row['memory_saved']:>8.0%}"
+              f"{row['p50_ms']:>10.3f}{row[f'recall@{args.k}']:>9.3f}")